@@ -9,9 +9,45 @@ class BacktestBAL:
     def save_backtest(self, bto: BacktestBTO, executed_trades: List[dict]) -> BacktestBTO:
         return self.service.save_backtest(bto, executed_trades)
 
+    def save_backtest_from_preview(self, preview_token: str, user_id: int, name: Optional[str] = None) -> BacktestBTO:
+        return self.service.save_backtest_from_preview(preview_token, user_id, name)
+
     def run_backtest_preview(self, bto: BacktestBTO) -> dict:
         return self.service.run_backtest_preview(bto)
 
+    def run_portfolio_preview(self, leg_btos: List[BacktestBTO], leg_parameters: List[dict]) -> dict:
+        return self.service.run_portfolio_preview(leg_btos, leg_parameters)
+
+    def run_backtest_optimization(self, bto: BacktestBTO, optimization: dict) -> dict:
+        return self.service.run_backtest_optimization(bto, optimization)
+
+    def run_walk_forward(self, bto: BacktestBTO, walk_forward: dict) -> dict:
+        return self.service.run_walk_forward(bto, walk_forward)
+
+    def submit_backtest_job(self, user_id: int, kind: str, args: tuple) -> dict:
+        return self.service.submit_backtest_job(user_id, kind, args)
+
+    def get_backtest_job(self, job_id: str) -> Optional[dict]:
+        return self.service.get_backtest_job(job_id)
+
+    def get_backtest_job_result(self, job_id: str) -> Optional[dict]:
+        return self.service.get_backtest_job_result(job_id)
+
+    def get_backtest_jobs_by_user(self, user_id: int) -> List[dict]:
+        return self.service.get_backtest_jobs_by_user(user_id)
+
+    def cancel_backtest_job(self, job_id: str) -> Optional[dict]:
+        return self.service.cancel_backtest_job(job_id)
+
+    def get_cache_stats(self) -> dict:
+        return self.service.get_cache_stats()
+
+    def run_monte_carlo(self, backtest_id: int, options: dict) -> Optional[dict]:
+        return self.service.run_monte_carlo(backtest_id, options)
+
+    def run_monte_carlo_preview(self, executed_trades: List[dict], initial_balance: float, options: dict) -> dict:
+        return self.service.run_monte_carlo_preview(executed_trades, initial_balance, options)
+
     def get_backtest_by_id(self, backtest_id: int) -> Optional[BacktestBTO]:
         return self.service.get_backtest_by_id(backtest_id)
 
@@ -27,6 +63,9 @@ class BacktestBAL:
     def get_backtest_metrics(self, backtest_id: int) -> Optional[dict]:
         return self.service.get_backtest_metrics(backtest_id)
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[dict]:
+        return self.service.get_balance_curve(backtest_id, resolution)
+
     def delete_backtest(self, backtest_id: int) -> bool:
         return self.service.delete_backtest(backtest_id)
 
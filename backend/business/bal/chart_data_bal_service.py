@@ -7,3 +7,6 @@ class ChartDataBAL:
 
     def get_chart_data(self, data: Dict) -> Dict:
         return self.bao_service.get_chart_data(data)
+
+    def get_store_stats(self) -> Dict:
+        return self.bao_service.get_store_stats()
@@ -25,3 +25,6 @@ class StatisticBAL:
 
     def generate_statistics(self, bto: StatisticBTO) -> dict:
         return self.service.generate_statistics(bto)
+
+    def get_cache_stats(self) -> dict:
+        return self.service.get_cache_stats()
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy.engine import Row
 
 from business.bto.trade_bto import TradeBTO
 from business.bao.services.trade_bao_service import TradeBAOService
@@ -26,3 +27,14 @@ class TradeBAL:
 
     def get_trades_by_backtest(self, backtest_id: int) -> List[TradeBTO]:
         return self.bao.get_trades_by_backtest(backtest_id)
+
+    def get_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None, **filters) -> List[Row]:
+        return self.bao.get_trade_rows(user_id, source, **filters)
+
+    def get_trades_page(self, user_id: Optional[int], limit: int, cursor: Optional[str] = None,
+                        source: Optional[SourceType] = None, **filters) -> Tuple[List[Row], Optional[str]]:
+        return self.bao.get_trades_page(user_id, limit, cursor, source, **filters)
+
+    def stream_trades(self, user_id: Optional[int], source: Optional[SourceType] = None,
+                      **filters) -> Iterator[Row]:
+        return self.bao.stream_trades(user_id, source, **filters)
@@ -1,11 +1,50 @@
 from typing import List, Optional
 from business.bto.backtest_bto import BacktestBTO
+from business.utils.job_manager import JobContext, NO_PROGRESS
 
 class BacktestBAOInterface:
     def save_backtest(self, bto: BacktestBTO, executed_trades: List[dict]) -> BacktestBTO:
         pass
 
-    def run_backtest_preview(self, bto: BacktestBTO) -> dict:
+    def save_backtest_from_preview(self, preview_token: str, user_id: int, name: Optional[str] = None) -> BacktestBTO:
+        pass
+
+    def run_backtest_preview(self, bto: BacktestBTO, progress: JobContext = NO_PROGRESS) -> dict:
+        pass
+
+    def run_portfolio_preview(self, leg_btos: List[BacktestBTO], leg_parameters: List[dict],
+                              progress: JobContext = NO_PROGRESS) -> dict:
+        pass
+
+    def run_backtest_optimization(self, bto: BacktestBTO, optimization: dict,
+                                  progress: JobContext = NO_PROGRESS) -> dict:
+        pass
+
+    def run_walk_forward(self, bto: BacktestBTO, walk_forward: dict, progress: JobContext = NO_PROGRESS) -> dict:
+        pass
+
+    def submit_backtest_job(self, user_id: int, kind: str, args: tuple) -> dict:
+        pass
+
+    def get_backtest_job(self, job_id: str) -> Optional[dict]:
+        pass
+
+    def get_backtest_job_result(self, job_id: str) -> Optional[dict]:
+        pass
+
+    def get_backtest_jobs_by_user(self, user_id: int) -> List[dict]:
+        pass
+
+    def cancel_backtest_job(self, job_id: str) -> Optional[dict]:
+        pass
+
+    def get_cache_stats(self) -> dict:
+        pass
+
+    def run_monte_carlo(self, backtest_id: int, options: dict) -> Optional[dict]:
+        pass
+
+    def run_monte_carlo_preview(self, executed_trades: List[dict], initial_balance: float, options: dict) -> dict:
         pass
 
     def delete_backtest(self, backtest_id: int) -> bool:
@@ -23,6 +62,9 @@ class BacktestBAOInterface:
     def get_backtest_metrics(self, backtest_id: int) -> Optional[dict]:
         pass
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[dict]:
+        pass
+
     def update_backtest(self, backtest_id: int, updated_bto: BacktestBTO) -> Optional[BacktestBTO]:
         pass
 
@@ -1,5 +1,13 @@
 from typing import Dict, List
 
+from business.utils.candle_series import CandleSeries
+
 class ChartDataBAOInterface:
     def get_chart_data(self, data: Dict) -> Dict:
         pass
+
+    def get_candle_series(self, data: Dict) -> CandleSeries:
+        pass
+
+    def get_store_stats(self) -> Dict:
+        pass
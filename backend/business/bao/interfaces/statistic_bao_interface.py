@@ -21,5 +21,8 @@ class StatisticBAOInterface:
     def generate_statistics(self, bto: StatisticBTO) -> dict:
         pass
 
+    def get_cache_stats(self) -> dict:
+        pass
+
     def update_statistic(self, statistic_id: int, updated_bto: StatisticBTO) -> Optional[StatisticBTO]:
         pass
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.engine import Row
 
 from business.bto.trade_bto import TradeBTO
 from persistence.entities.utils_entity import SourceType
@@ -14,6 +15,9 @@ class TradeBAOInterface:
     def delete_trade(self, trade_id: int) -> bool:
         pass
 
+    def prepare_backtest_trades(self, market: str, executed_trades: List[dict]) -> List[Dict]:
+        pass
+
     def get_trades_by_field(self, user_id: int, source: Optional[SourceType] = None, **filters) -> List[TradeBTO]:
         pass
 
@@ -21,4 +25,33 @@ class TradeBAOInterface:
         pass
 
     def get_trades_by_backtest(self, backtest_id: int) -> List[TradeBTO]:
-        pass
\ No newline at end of file
+        pass
+
+    def get_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None, **filters) -> List[Row]:
+        pass
+
+    def get_trades_page(self, user_id: Optional[int], limit: int, cursor: Optional[str] = None,
+                        source: Optional[SourceType] = None, **filters) -> Tuple[List[Row], Optional[str]]:
+        pass
+
+    def stream_trades(self, user_id: Optional[int], source: Optional[SourceType] = None,
+                      **filters) -> Iterator[Row]:
+        pass
+
+    def get_trade_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                             source: Optional[SourceType] = None, **filters) -> Dict:
+        pass
+
+    def get_summary_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                               source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        pass
+
+    def get_trade_columns(self, user_id: int, source: Optional[SourceType] = None, **filters) -> Dict[str, list]:
+        pass
+
+    def has_trade_columns(self, backtest_id: int) -> bool:
+        pass
+
+    def stream_trade_profits(self, user_id: int, source: Optional[SourceType] = None,
+                             **filters) -> Iterator[Optional[float]]:
+        pass
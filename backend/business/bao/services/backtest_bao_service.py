@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -5,7 +7,6 @@ from datetime import datetime
 from business.bao.interfaces.backtest_bao_interface import BacktestBAOInterface
 from business.bao.services.trade_bao_service import TradeBAOService
 from business.bto.backtest_bto import BacktestBTO
-from business.bto.trade_bto import TradeBTO
 from business.mappers.backtest_mapper import BacktestMapper
 from persistence.dal.backtest_dal import BacktestDAL
 from business.utils.backtest.backtest_executor import BacktestExecutor
@@ -14,8 +15,32 @@ from business.bao.services.chart_data_bao_service import ChartDataBAOService
 from business.bao.services.strategy_bao_service import StrategyBAOService
 from persistence.dal.strategy_dal import StrategyDAL
 from persistence.dal.trade_dal import TradeDAL
-from persistence.entities.utils_entity import SourceType, SessionType
-from business.utils.backtest.backtest_executor import map_action_to_trade_type
+from business.utils.backtest.optimizer import build_parameter_grid, sample_parameters, run_parameter_sweep, \
+    rank_results, RANKING_METRICS
+from business.utils.backtest.walk_forward import build_folds, run_walk_forward, summarize_folds
+from business.utils.backtest.monte_carlo import run_monte_carlo
+from business.utils.backtest.portfolio_executor import PortfolioExecutor, PortfolioLeg
+from business.utils.backtest.preview_store import preview_store
+from business.utils.backtest.result_cache import backtest_result_cache, make_cache_key, candle_data_version
+from business.utils.job_manager import job_manager, JobContext, JobStatus, NO_PROGRESS
+from business.utils.statistic_cache import statistic_result_cache
+from database import SessionLocal
+from business.bto.strategy_bto import StrategyBTO
+from business.utils.candle_series import CandleSeries
+from persistence.entities.utils_entity import SourceType
+from persistence.utils.balance_curve import RESOLUTIONS
+
+# "rows" saves a backtest's trades as rows of the trades table, "columnar" as one compressed blob on the backtest
+BACKTEST_TRADE_STORAGE = os.getenv("BACKTEST_TRADE_STORAGE", "rows")
+# candle downloads of a portfolio's legs running at the same time
+PORTFOLIO_MAX_CONCURRENT_LOADS = int(os.getenv("PORTFOLIO_MAX_CONCURRENT_LOADS", 4))
+
+JOB_KINDS = {
+    "preview": "run_backtest_preview",
+    "portfolio": "run_portfolio_preview",
+    "optimize": "run_backtest_optimization",
+    "walk-forward": "run_walk_forward",
+}
 
 class BacktestBAOService(BacktestBAOInterface):
     def __init__(self, db: Session, backtest_dal: BacktestDAL):
@@ -28,73 +53,109 @@ class BacktestBAOService(BacktestBAOInterface):
         strategy_bao = StrategyBAOService(self.db, strategy_dal)
         strategy_bto = strategy_bao.get_strategy_by_id(bto.strategy_id)
 
-        # Generate backtest name
-        bto.name = f"{strategy_bto.name}_${bto.initial_balance}_{bto.risk_per_trade}%_{bto.risk_reward_ratio}_{bto.start_date}_{bto.end_date}"
+        # Generate backtest name, unless the user gave one
+        if not bto.name:
+            bto.name = f"{strategy_bto.name}_${bto.initial_balance}_{bto.risk_per_trade}%_{bto.risk_reward_ratio}_{bto.start_date}_{bto.end_date}"
         bto.created_at = datetime.utcnow()
 
-        # Save backtest
+        # Validate and prepare all trades up front, then save the backtest and its trades in one transaction
+        trade_bao = TradeBAOService(TradeDAL(self.db))
+        trade_rows = trade_bao.prepare_backtest_trades(bto.symbol, executed_trades)
+
         dto = BacktestMapper.bto_to_dto(bto)
-        saved_dto = self.dal.add_backtest(dto, user_id=bto.user_id)
+        if BACKTEST_TRADE_STORAGE == "columnar":
+            saved_dto = self.dal.add_backtest_with_trade_columns(dto, bto.user_id, trade_rows)
+        else:
+            saved_dto = self.dal.add_backtest_with_trades(dto, bto.user_id, trade_rows)
+        statistic_result_cache.invalidate_user(bto.user_id)
         saved_backtest = BacktestMapper.dto_to_bto(saved_dto)
 
-        # Save executed trades
-        trade_dal = TradeDAL(self.db)
-        trade_bao = TradeBAOService(trade_dal)
+        return saved_backtest
 
-        for t in executed_trades:
-            try:
-                trade_bto = TradeBTO(
-                    id=None,
-                    user_id=bto.user_id,
-                    backtest_id=saved_backtest.id,
-                    market=bto.symbol,
-                    volume=1,
-                    type=map_action_to_trade_type(t["entry_action"]),
-                    open_date=datetime.fromtimestamp(t["open_timestamp"]).date(),
-                    open_time=datetime.fromtimestamp(t["open_timestamp"]).time(),
-                    close_date=datetime.fromtimestamp(t["close_timestamp"]).date(),
-                    close_time=datetime.fromtimestamp(t["close_timestamp"]).time(),
-                    session=SessionType.UNKNOWN,
-                    open_price=t["entry_price"],
-                    close_price=t["exit_price"],
-                    sl_price=t["sl_price"],
-                    tp_price=t["tp_price"],
-                    swap=0,
-                    commission=0,
-                    profit=t["profit"],
-                    pips=t["pips"],
-                    link_photo=None,
-                    source_type=SourceType.BACKTEST
-                )
-                trade_bao.add_trade(trade_bto)
-            except Exception as e:
-                print("ERROR inserting trade:", t, str(e))
-                raise
+    def save_backtest_from_preview(self, preview_token: str, user_id: int, name: Optional[str] = None) -> BacktestBTO:
+        entry = preview_store.pop(preview_token, user_id)
+        if entry is None:
+            raise ValueError("Preview token is invalid or has expired.")
 
-        return saved_backtest
+        request, result = entry["request"], entry["result"]
+        metrics = result["metrics"]
+        bto = BacktestBTO(
+            id=None,
+            **request,
+            total_profit=metrics["total_profit"],
+            drawdown_max=metrics["drawdown_max"],
+            winrate=metrics["winrate"],
+            nr_trades=metrics["nr_trades"],
+            profit_factor=metrics["profit_factor"],
+            expectancy=metrics["expectancy"],
+            balance_curve=metrics["balance_curve"],
+            name=name
+        )
 
-    def run_backtest_preview(self, bto: BacktestBTO) -> dict:
-        # Load candle data
+        try:
+            return self.save_backtest(bto, result["executed_trades"])
+        except Exception:
+            # let the user retry with the same token
+            preview_store.restore(preview_token, entry)
+            raise
+
+    def _date_str(self, value) -> str:
+        return value.strftime("%Y-%m-%d") if isinstance(value, datetime) else value
+
+    def _load_candles(self, bto: BacktestBTO) -> CandleSeries:
         chart_bao = ChartDataBAOService()
-        chart_data = chart_bao.get_chart_data({
+        return chart_bao.get_candle_series({
             "symbol": bto.symbol,
             "time_frame": bto.time_frame,
-            "start_date": bto.start_date.strftime("%Y-%m-%d") if isinstance(bto.start_date,
-                                                                            datetime) else bto.start_date,
-            "end_date": bto.end_date.strftime("%Y-%m-%d") if isinstance(bto.end_date, datetime) else bto.end_date
+            "start_date": self._date_str(bto.start_date),
+            "end_date": self._date_str(bto.end_date)
         })
-        candles = chart_data.get("candles", [])
 
-        #Load strategy
+    def _load_strategy(self, strategy_id: int) -> StrategyBTO:
         strategy_dal = StrategyDAL(self.db)
         strategy_bao = StrategyBAOService(self.db, strategy_dal)
-        strategy_bto = strategy_bao.get_strategy_by_id(int(bto.strategy_id))
+        strategy_bto = strategy_bao.get_strategy_by_id(int(strategy_id))
+        if not strategy_bto:
+            raise ValueError(f"Strategy {strategy_id} not found.")
+        return strategy_bto
+
+    def _preview_cache_key(self, bto: BacktestBTO, strategy_bto: StrategyBTO) -> str:
+        end_date = self._date_str(bto.end_date)
+        return make_cache_key({
+            "symbol": bto.symbol,
+            "time_frame": bto.time_frame,
+            "start_date": self._date_str(bto.start_date),
+            "end_date": end_date,
+            "initial_balance": float(bto.initial_balance),
+            "risk_per_trade": float(bto.risk_per_trade),
+            "risk_reward_ratio": float(bto.risk_reward_ratio),
+            "strategy_type": strategy_bto.type,
+            "parameters": strategy_bto.parameters or {},
+            "candles": candle_data_version(bto.time_frame, end_date)
+        })
+
+    def run_backtest_preview(self, bto: BacktestBTO, progress: JobContext = NO_PROGRESS) -> dict:
+        #Load strategy
+        strategy_bto = self._load_strategy(bto.strategy_id)
         strategy = StrategyRegistry.get_strategy(strategy_bto.type)
 
+        # Same inputs and same candle data give the same result
+        cache_key = self._preview_cache_key(bto, strategy_bto)
+        cached = backtest_result_cache.get(strategy_bto.id, cache_key)
+        if cached is not None:
+            progress.report(1.0, "cached")
+            return self._with_preview_token(bto, cached)
+
+        # Load candle data
+        progress.report(0.0, "loading candles")
+        candles = self._load_candles(bto)
+
         # Apply strategy
+        progress.report(0.4, "generating signals", {"nr_candles": len(candles)})
         signals = strategy.generate_trades(candles, strategy_bto.parameters or {})
 
         # Run executor
+        progress.report(0.6, "simulating", {"nr_candles": len(candles), "nr_signals": len(signals)})
         executor = BacktestExecutor(
             initial_balance=bto.initial_balance,
             risk_per_trade=bto.risk_per_trade,
@@ -104,13 +165,241 @@ class BacktestBAOService(BacktestBAOInterface):
 
         executed_trades = result["executed_trades"]
         metrics = result["metrics"]
-        return {
+        preview = {
             "executed_trades": executed_trades,
             "metrics": metrics
         }
+        backtest_result_cache.put(strategy_bto.id, cache_key, preview)
+        return self._with_preview_token(bto, preview)
+
+    def _with_preview_token(self, bto: BacktestBTO, preview: dict) -> dict:
+        request = {
+            "user_id": bto.user_id,
+            "strategy_id": bto.strategy_id,
+            "symbol": bto.symbol,
+            "time_frame": bto.time_frame,
+            "start_date": bto.start_date,
+            "end_date": bto.end_date,
+            "initial_balance": bto.initial_balance,
+            "risk_per_trade": bto.risk_per_trade,
+            "risk_reward_ratio": bto.risk_reward_ratio
+        }
+        return {**preview, "preview_token": preview_store.put(request, preview)}
+
+    def _build_combinations(self, optimization: dict, base_parameters: dict) -> List[dict]:
+        # Each parameter set overrides the stored strategy parameters
+        if optimization.get("parameter_grid") is not None:
+            combinations = build_parameter_grid(optimization["parameter_grid"])
+        elif optimization.get("sampling") is not None:
+            sampling = optimization["sampling"]
+            combinations = sample_parameters(
+                sampling.get("ranges"),
+                sampling.get("n_samples"),
+                sampling.get("method", "random"),
+                sampling.get("seed")
+            )
+        else:
+            raise ValueError("Either parameter_grid or sampling is required.")
+
+        return [{**base_parameters, **params} for params in combinations]
+
+    def _settings(self, bto: BacktestBTO) -> dict:
+        return {
+            "initial_balance": bto.initial_balance,
+            "risk_per_trade": bto.risk_per_trade,
+            "risk_reward_ratio": bto.risk_reward_ratio
+        }
+
+    def run_portfolio_preview(self, leg_btos: List[BacktestBTO], leg_parameters: List[dict],
+                              progress: JobContext = NO_PROGRESS) -> dict:
+        strategies = [self._load_strategy(bto.strategy_id) for bto in leg_btos]
+
+        # Candle downloads are I/O bound, fetch the legs concurrently
+        progress.report(0.0, "loading candles")
+        with ThreadPoolExecutor(max_workers=min(len(leg_btos), PORTFOLIO_MAX_CONCURRENT_LOADS)) as pool:
+            leg_candles = list(pool.map(self._load_candles, leg_btos))
+
+        progress.report(0.4, "generating signals")
+
+        legs = []
+        for bto, strategy_bto, candles, parameters in zip(leg_btos, strategies, leg_candles, leg_parameters):
+            strategy = StrategyRegistry.get_strategy(strategy_bto.type)
+            signals = strategy.generate_trades(candles, {**(strategy_bto.parameters or {}), **parameters})
+            legs.append(PortfolioLeg(bto.symbol, candles, signals))
+
+        # Settings are shared by all legs
+        progress.report(0.6, "simulating")
+        settings = leg_btos[0]
+        executor = PortfolioExecutor(
+            initial_balance=settings.initial_balance,
+            risk_per_trade=settings.risk_per_trade,
+            risk_reward_ratio=settings.risk_reward_ratio
+        )
+        result = executor.simulate_portfolio(legs, settings.time_frame)
+
+        for leg, bto in zip(result["legs"], leg_btos):
+            leg["strategy_id"] = bto.strategy_id
+        return result
+
+    def _progress_reporter(self, progress: JobContext, total: int, start: float, partial=None):
+        # maps finished runs onto the [start, 1] progress range, partial results every ~5%
+        done = []
+        every = max(1, total // 20)
+
+        def on_result(result: dict):
+            done.append(result)
+            value = start + (1.0 - start) * len(done) / total
+            if partial and (len(done) % every == 0 or len(done) == total):
+                progress.report(value, partial=partial(done))
+            else:
+                progress.report(value)
+
+        return on_result
+
+    def run_backtest_optimization(self, bto: BacktestBTO, optimization: dict,
+                                  progress: JobContext = NO_PROGRESS) -> dict:
+        rank_by = optimization.get("rank_by") or "total_profit"
+        if rank_by not in RANKING_METRICS:
+            raise ValueError(f"Invalid rank_by '{rank_by}', expected one of {list(RANKING_METRICS)}.")
+
+        strategy_bto = self._load_strategy(bto.strategy_id)
+        combinations = self._build_combinations(optimization, strategy_bto.parameters or {})
+
+        # Candles are loaded once and shared by every run
+        progress.report(0.0, "loading candles")
+        candles = self._load_candles(bto)
+
+        progress.report(0.1, "optimizing")
+        on_result = self._progress_reporter(
+            progress, len(combinations), 0.1,
+            lambda done: {"nr_evaluated": len(done), "results": rank_results(done, rank_by)[:10]}
+        )
+        results = run_parameter_sweep(
+            strategy_bto.type, candles, bto.symbol, bto.time_frame,
+            combinations, self._settings(bto), optimization.get("max_workers"), on_result
+        )
+
+        ranked = rank_results(results, rank_by)
+        top_n = optimization.get("top_n")
+        return {
+            "strategy_id": bto.strategy_id,
+            "strategy_type": strategy_bto.type,
+            "rank_by": rank_by,
+            "nr_candles": len(candles),
+            "nr_combinations": len(combinations),
+            "results": ranked[:top_n] if top_n else ranked
+        }
+
+    def run_walk_forward(self, bto: BacktestBTO, walk_forward: dict, progress: JobContext = NO_PROGRESS) -> dict:
+        rank_by = walk_forward.get("rank_by") or "total_profit"
+        if rank_by not in RANKING_METRICS:
+            raise ValueError(f"Invalid rank_by '{rank_by}', expected one of {list(RANKING_METRICS)}.")
+
+        strategy_bto = self._load_strategy(bto.strategy_id)
+        combinations = self._build_combinations(walk_forward, strategy_bto.parameters or {})
+
+        # One candle array for the whole range, folds are index slices of it
+        progress.report(0.0, "loading candles")
+        candles = self._load_candles(bto)
+        folds = build_folds(
+            candles.time,
+            walk_forward["in_sample_days"],
+            walk_forward["out_of_sample_days"],
+            walk_forward.get("step_days"),
+            walk_forward.get("anchored", False)
+        )
+        if not folds:
+            raise ValueError("Date range is too short for the requested in-sample/out-of-sample windows.")
+
+        progress.report(0.1, "running folds")
+        on_result = self._progress_reporter(
+            progress, len(folds), 0.1,
+            lambda done: {"nr_folds": len(folds), "folds": sorted(done, key=lambda f: f["fold"])}
+        )
+        results = run_walk_forward(
+            strategy_bto.type, candles, bto.symbol, bto.time_frame,
+            folds, combinations, self._settings(bto), rank_by, walk_forward.get("max_workers"), on_result
+        )
+
+        return {
+            "strategy_id": bto.strategy_id,
+            "strategy_type": strategy_bto.type,
+            "rank_by": rank_by,
+            "nr_candles": len(candles),
+            "nr_combinations": len(combinations),
+            "summary": summarize_folds(results),
+            "folds": results
+        }
+
+    def submit_backtest_job(self, user_id: int, kind: str, args: tuple) -> dict:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Invalid job kind '{kind}', expected one of {list(JOB_KINDS)}.")
+        method_name = JOB_KINDS[kind]
+
+        def work(progress: JobContext):
+            # jobs outlive the request, so they get their own session
+            db = SessionLocal()
+            try:
+                service = BacktestBAOService(db, BacktestDAL(db))
+                return getattr(service, method_name)(*args, progress=progress)
+            finally:
+                db.close()
+
+        job = job_manager.submit(user_id, kind, work)
+        return job.to_status()
+
+    def get_backtest_job(self, job_id: str) -> Optional[dict]:
+        job = job_manager.get_job(job_id)
+        return job.to_status() if job else None
+
+    def get_backtest_job_result(self, job_id: str) -> Optional[dict]:
+        job = job_manager.get_job(job_id)
+        if not job:
+            return None
+        if job.status != JobStatus.COMPLETED:
+            raise ValueError(f"Job {job_id} is {job.status}, no result available.")
+        return job.result
+
+    def get_backtest_jobs_by_user(self, user_id: int) -> List[dict]:
+        return [job.to_status() for job in job_manager.get_jobs_by_user(user_id)]
+
+    def cancel_backtest_job(self, job_id: str) -> Optional[dict]:
+        job = job_manager.cancel(job_id)
+        return job.to_status() if job else None
+
+    def get_cache_stats(self) -> dict:
+        return backtest_result_cache.get_stats()
+
+    def run_monte_carlo(self, backtest_id: int, options: dict) -> Optional[dict]:
+        backtest = self.get_backtest_by_id(backtest_id)
+        if not backtest:
+            return None
+
+        # Trades come in execution order, from rows or from the columnar blob
+        trade_bao = TradeBAOService(TradeDAL(self.db))
+        trades = trade_bao.get_trade_rows(None, SourceType.BACKTEST, backtest_id=backtest_id)
+        profits = [float(t.profit) for t in trades]
+
+        result = run_monte_carlo(
+            profits, float(backtest.initial_balance), options["n_paths"], options["method"],
+            options["compounding"], options.get("seed")
+        )
+        return {"backtest_id": backtest_id, **result}
+
+    def run_monte_carlo_preview(self, executed_trades: List[dict], initial_balance: float, options: dict) -> dict:
+        profits = [float(t["profit"]) for t in executed_trades]
+        return run_monte_carlo(
+            profits, initial_balance, options["n_paths"], options["method"],
+            options["compounding"], options.get("seed")
+        )
 
     def delete_backtest(self, backtest_id: int) -> bool:
-        return self.dal.delete_backtest(backtest_id)
+        # the backtest's trades are deleted with it
+        backtest_dto = self.dal.get_backtest_by_id(backtest_id)
+        deleted = self.dal.delete_backtest(backtest_id)
+        if deleted:
+            statistic_result_cache.invalidate_user(backtest_dto.user_id)
+        return deleted
 
     def get_backtest_by_id(self, backtest_id: int) -> Optional[BacktestBTO]:
         dto = self.dal.get_backtest_by_id(backtest_id)
@@ -127,6 +416,15 @@ class BacktestBAOService(BacktestBAOInterface):
     def get_backtest_metrics(self, backtest_id: int) -> Optional[dict]:
         return self.dal.get_backtest_metrics(backtest_id)
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[dict]:
+        # backtest responses carry the small level, the full curve or the detail level is fetched on its own
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Invalid resolution '{resolution}', expected one of {list(RESOLUTIONS)}.")
+        curve = self.dal.get_balance_curve(backtest_id, resolution)
+        if curve is None:
+            return None
+        return {"backtest_id": backtest_id, "resolution": resolution, "nr_points": len(curve), "balance_curve": curve}
+
     def update_backtest(self, backtest_id: int, updated_bto: BacktestBTO) -> Optional[BacktestBTO]:
         updated_dto = BacktestMapper.bto_to_dto(updated_bto)
         result_dto = self.dal.update_backtest(backtest_id, updated_dto)
@@ -1,9 +1,15 @@
 from typing import Dict
 from business.bao.interfaces.chart_data_bao_interface import ChartDataBAOInterface
+from business.utils.candle_series import CandleSeries
 from business.utils.chart_data_loader import UniversalDataLoader
+from business.utils.candle_store import candle_store
 
 class ChartDataBAOService(ChartDataBAOInterface):
     def get_chart_data(self, data: Dict) -> Dict:
+        candles = self.get_candle_series(data)
+        return {"candles": candles.to_dicts()}
+
+    def get_candle_series(self, data: Dict) -> CandleSeries:
         symbol = data["symbol"]
         interval = data["time_frame"]
         start = data["start_date"]
@@ -12,4 +18,7 @@ class ChartDataBAOService(ChartDataBAOInterface):
         loader, mapped_symbol = UniversalDataLoader.get_loader_and_symbol(symbol)
         _, candles = loader.get_historical_data(symbol=mapped_symbol, interval=interval, start=start, end=end)
 
-        return {"candles": candles}
+        return candles
+
+    def get_store_stats(self) -> Dict:
+        return candle_store.get_stats()
@@ -1,5 +1,7 @@
+import calendar
+import os
 from collections import defaultdict
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -8,12 +10,22 @@ from business.bao.services.trade_bao_service import TradeBAOService
 from business.bto.statistic_bto import StatisticBTO
 from business.bto.trade_bto import TradeBTO
 from business.mappers.statistic_mapper import StatisticMapper
+from business.utils.statistic_cache import statistic_result_cache, normalize_params
+from business.utils.trade_metrics import trade_arrays, calculate_trade_metrics
 from persistence.dal.statistic_dal import StatisticDAL
 from persistence.dal.trade_dal import TradeDAL
 from persistence.entities.utils_entity import SessionType, TradeType
 from persistence.utils.data_validators import validate_statistic_params, validate_statistic_name
 
 
+# "sql" aggregates in the database, "numpy" loads the trade columns and aggregates them in one vectorized pass,
+# "python" loads the trades and aggregates them here
+STATISTICS_ENGINE = os.getenv("STATISTICS_ENGINE", "sql")
+
+# label and upper bound in hours, the last bucket is open ended
+DURATION_BUCKETS = [("0-1h", 1), ("1-4h", 4), ("4-12h", 12), ("12-24h", 24), (">24h", None)]
+
+
 def parse_statistic_params(params: Dict[str, Any]) -> Dict[str, Any]:
     filters = {}
 
@@ -89,13 +101,133 @@ class StatisticBAOService(StatisticBAOInterface):
 
     # Others
     def generate_statistics(self, bto: StatisticBTO) -> dict:
+        # A repeat view is one lookup. The version is read first, so a result computed while the user's
+        # trades changed is never served.
+        params_key = normalize_params(bto.params)
+        version = statistic_result_cache.get_version(bto.user_id)
+        cached = statistic_result_cache.get(bto.user_id, params_key)
+        if cached is not None:
+            return {**cached, "statistic_name": bto.name}
+
+        result = self._generate_statistics(bto)
+        statistic_result_cache.put(bto.user_id, params_key, version, result)
+        return result
+
+    def _generate_statistics(self, bto: StatisticBTO) -> dict:
         params = bto.params or {}
         filters = parse_statistic_params(params)
 
-        trades = self.trade_service.get_trades_by_field(bto.user_id, **filters)
+        engine = STATISTICS_ENGINE
+        if "backtest_id" in filters and self.trade_service.has_trade_columns(filters["backtest_id"]):
+            # a columnar backtest's trades are not in the trades table, its arrays go to the NumPy kernel
+            engine = "numpy"
+        elif params.get("summary_only"):
+            return self._generate_summary(bto, filters)
+
+        if engine == "python":
+            # lean rows carry the same attributes and values as the TradeBTOs
+            trades = self.trade_service.get_trade_rows(bto.user_id, **filters)
+            return self._calculate_metrics(trades, bto.name, filters)
+
+        if engine == "numpy":
+            columns = self.trade_service.get_trade_columns(bto.user_id, **filters)
+            if not columns["profit"]:
+                result = self._calculate_metrics([], bto.name, filters)
+            else:
+                result = {
+                    "statistic_name": bto.name,
+                    "filters_applied": filters,
+                    "metrics": calculate_trade_metrics(trade_arrays(columns), DURATION_BUCKETS)
+                }
+            if params.get("summary_only"):
+                del result["metrics"]["balance_curve"]
+            return result
+
+        aggregates = self.trade_service.get_trade_aggregates(bto.user_id, DURATION_BUCKETS, **filters)
+        if aggregates["totals"]["count"] == 0:
+            return self._calculate_metrics([], bto.name, filters)
+
+        profits = self.trade_service.stream_trade_profits(bto.user_id, **filters)
+        return self._metrics_from_aggregates(aggregates, profits, bto.name, filters)
+
+    def _generate_summary(self, bto: StatisticBTO, filters: dict) -> dict:
+        # Everything but the balance curve, from the trade_aggregates rows when the filters allow it
+        aggregates = self.trade_service.get_summary_aggregates(bto.user_id, DURATION_BUCKETS, **filters)
+        if aggregates is None:
+            aggregates = self.trade_service.get_trade_aggregates(bto.user_id, DURATION_BUCKETS, **filters)
+
+        if aggregates["totals"]["count"] == 0:
+            result = self._calculate_metrics([], bto.name, filters)
+            del result["metrics"]["balance_curve"]
+            return result
+        return self._metrics_from_aggregates(aggregates, None, bto.name, filters)
+
+    def get_cache_stats(self) -> dict:
+        return statistic_result_cache.get_stats()
+
+    def _metrics_from_aggregates(self, aggregates: dict, profits: Optional[Iterable[Optional[float]]], name: str,
+                                 filters: dict) -> dict:
+        # Same response as _calculate_metrics, built from the per-group sums of get_trade_aggregates.
+        # Without profits the balance curve is left out.
+        totals = aggregates["totals"]
+        total = totals["count"]
+
+        def rounded_sum(value):
+            # an empty sum() is the integer 0
+            return round(value, 2) if value is not None else 0
+
+        def stat_info(measures):
+            if not measures:
+                return {"count": 0, "profit": 0.0, "winrate": 0}
+            return {
+                "count": measures["count"],
+                "profit": rounded_sum(measures["profit"]),
+                "winrate": round(measures["wins"] / measures["count"] * 100, 2)
+            }
+
+        def group_info(key, value, measures):
+            return {key: value, "trades": measures["count"], "profit": rounded_sum(measures["profit"])}
 
-        result = self._calculate_metrics(trades, bto.name, filters)
-        return result
+        balance_curve = []
+        cumulative_balance = 0
+        for idx, profit in enumerate(profits or []):
+            cumulative_balance += profit if profit is not None else 0
+            balance_curve.append({
+                "trade": idx + 1,
+                "balance": round(cumulative_balance, 2)
+            })
+
+        by_duration = [
+            group_info("range", label, aggregates["by_duration"].get(label, {"count": 0, "profit": None}))
+            for label, _ in DURATION_BUCKETS
+        ]
+
+        metrics = {
+            "total_trades": total,
+            "winrate": round(totals["wins"] / total * 100, 2),
+            "lossrate": round(totals["losses"] / total * 100, 2),
+            "break_even": totals["break_even"],
+            "avg_rr": round(totals["rr_sum"] / totals["rr_count"], 2) if totals["rr_count"] else None,
+            "avg_profit": round(totals["win_profit"] / totals["wins"], 2) if totals["wins"] else None,
+            "avg_loss": round(totals["loss_profit"] / totals["losses"], 2) if totals["losses"] else None,
+            "total_result": rounded_sum(totals["profit"]),
+            "max_profit": totals["max_profit"],
+            "max_loss": totals["min_profit"],
+            "balance_curve": balance_curve,
+            "long_stats": stat_info(aggregates["by_type"].get(TradeType.BUY)),
+            "short_stats": stat_info(aggregates["by_type"].get(TradeType.SELL)),
+            "by_instrument": [group_info("instrument", market, m) for market, m in aggregates["by_market"]],
+            "by_day": [group_info("day", calendar.day_name[day - 1], m) for day, m in aggregates["by_weekday"]],
+            "by_duration": by_duration
+        }
+        if profits is None:
+            del metrics["balance_curve"]
+
+        return {
+            "statistic_name": name,
+            "filters_applied": filters,
+            "metrics": metrics
+        }
 
     def _calculate_metrics(self, trades: List[TradeBTO], name: str, filters: dict) -> dict:
         total = len(trades)
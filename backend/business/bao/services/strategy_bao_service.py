@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from business.bao.interfaces.strategy_bao_interface import StrategyBAOInterface
 from business.bto.strategy_bto import StrategyBTO
 from business.mappers.strategy_mapper import StrategyMapper
+from business.utils.backtest.result_cache import backtest_result_cache
+from business.utils.statistic_cache import statistic_result_cache
 from persistence.dal.strategy_dal import StrategyDAL
 from persistence.entities.utils_entity import StrategyType
 from persistence.utils.data_validators import validate_strategy_name, validate_strategy_type, \
@@ -25,7 +27,18 @@ class StrategyBAOService(StrategyBAOInterface):
         return StrategyMapper.dto_to_bto(saved_dto)
 
     def delete_strategy(self, strategy_id: int) -> bool:
-        return self.dal.delete_strategy(strategy_id)
+        # the backtests of the strategy and their trades are deleted with it
+        strategy = self.dal.get_strategy_by_id(strategy_id)
+        user_ids = set(self.dal.get_backtest_user_ids(strategy_id))
+        if strategy and strategy.created_by is not None:
+            user_ids.add(strategy.created_by)
+
+        deleted = self.dal.delete_strategy(strategy_id)
+        backtest_result_cache.invalidate_strategy(strategy_id)
+        if deleted:
+            for user_id in user_ids:
+                statistic_result_cache.invalidate_user(user_id)
+        return deleted
 
     def get_strategy_by_id(self, strategy_id: int) -> Optional[StrategyBTO]:
         dto = self.dal.get_strategy_by_id(strategy_id)
@@ -53,4 +66,5 @@ class StrategyBAOService(StrategyBAOInterface):
     def update_strategy(self, strategy_id: int, updated_bto: StrategyBTO) -> Optional[StrategyBTO]:
         updated_dto = StrategyMapper.bto_to_dto(updated_bto)
         result_dto = self.dal.update_strategy(strategy_id, updated_dto)
+        backtest_result_cache.invalidate_strategy(strategy_id)
         return StrategyMapper.dto_to_bto(result_dto) if result_dto else None
@@ -1,13 +1,20 @@
-from datetime import time, datetime
-from typing import List, Optional
+import base64
+import json
+from datetime import date, time, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.engine import Row
 
 from business.bto.trade_bto import TradeBTO
 from business.mappers.trade_mapper import TradeMapper
+from business.utils.backtest.backtest_executor import map_action_to_trade_type
+from business.utils.statistic_cache import statistic_result_cache
 from persistence.dal.trade_dal import TradeDAL
 from business.bao.interfaces.trade_bao_interface import TradeBAOInterface
 from persistence.entities.utils_entity import SourceType, SessionType, TradeType
 from persistence.utils.data_validators import is_valid_time_and_date, is_valid_price, calculate_pips, \
-    get_session_from_open_time, to_time
+    get_session_from_open_time, to_time, local_date_and_seconds, validate_trade_batch, \
+    get_sessions_from_open_seconds, calculate_pips_batch
 
 
 class TradeBAOService(TradeBAOInterface):
@@ -22,10 +29,70 @@ class TradeBAOService(TradeBAOInterface):
         trade_dto = TradeMapper.bto_to_dto(trade_bto)
         trade_dto.session = get_session_from_open_time(trade_bto)
         saved_trade_dto = self.dal.add_trade(trade_dto, trade_bto.user_id)
+        statistic_result_cache.invalidate_user(trade_bto.user_id)
         return TradeMapper.dto_to_bto(saved_trade_dto)
 
     def delete_trade(self, trade_id: int) -> bool:
-        return self.dal.delete_trade(trade_id)
+        trade_dto = self.dal.get_trade_by_id(trade_id)
+        deleted = self.dal.delete_trade(trade_id)
+        if deleted:
+            statistic_result_cache.invalidate_user(trade_dto.user_id)
+        return deleted
+
+    def prepare_backtest_trades(self, market: str, executed_trades: List[dict]) -> List[Dict]:
+        # Validation, session and pips for a whole backtest in one pass over columns,
+        # giving the rows ready for TradeDAL.add_trades_bulk
+        if not executed_trades:
+            return []
+
+        open_ts = np.array([t["open_timestamp"] for t in executed_trades], dtype=np.int64)
+        close_ts = np.array([t["close_timestamp"] for t in executed_trades], dtype=np.int64)
+        actions = [t["entry_action"].lower() for t in executed_trades]
+        open_prices = np.array([t["entry_price"] for t in executed_trades], dtype=float)
+        close_prices = np.array([t["exit_price"] for t in executed_trades], dtype=float)
+        sl_prices = np.array([t["sl_price"] for t in executed_trades], dtype=float)
+        tp_prices = np.array([t["tp_price"] for t in executed_trades], dtype=float)
+
+        open_days, open_seconds = local_date_and_seconds(open_ts)
+        close_days, close_seconds = local_date_and_seconds(close_ts)
+        validate_trade_batch(
+            open_days * 86400 + open_seconds, close_days * 86400 + close_seconds,
+            np.array(actions), open_prices, sl_prices, tp_prices
+        )
+
+        sessions = get_sessions_from_open_seconds(open_seconds)
+        pips = calculate_pips_batch(open_prices, close_prices).tolist()
+        open_dates = open_days.astype("datetime64[D]").tolist()
+        close_dates = close_days.astype("datetime64[D]").tolist()
+        trade_types = {action: map_action_to_trade_type(action) for action in set(actions)}
+
+        return [
+            {
+                "market": market,
+                "volume": 1,
+                "type": trade_types[actions[i]],
+                "open_date": open_dates[i],
+                "open_time": self._seconds_to_time(int(open_seconds[i])),
+                "close_date": close_dates[i],
+                "close_time": self._seconds_to_time(int(close_seconds[i])),
+                "session": sessions[i],
+                "open_price": t["entry_price"],
+                "close_price": t["exit_price"],
+                "sl_price": t["sl_price"],
+                "tp_price": t["tp_price"],
+                "swap": 0,
+                "commission": 0,
+                "profit": t["profit"],
+                "pips": pips[i],
+                "link_photo": None,
+                "source_type": SourceType.BACKTEST,
+            }
+            for i, t in enumerate(executed_trades)
+        ]
+
+    @staticmethod
+    def _seconds_to_time(seconds: int) -> time:
+        return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
 
 
     def get_trades_by_user(self, user_id: int) -> List[TradeBTO]:
@@ -37,6 +104,69 @@ class TradeBAOService(TradeBAOInterface):
         return [TradeMapper.dto_to_bto(trade) for trade in trade_dtos]
 
     def get_trades_by_field(self, user_id: int, source: Optional[SourceType] = None, **filters) -> List[TradeBTO]:
+        processed_filters = self._process_filters(filters)
+        trade_dtos = self.dal.get_trades_by_field(user_id, source, **processed_filters)
+        return [TradeMapper.dto_to_bto(trade) for trade in trade_dtos]
+
+    # Lean read path: rows of persistence's TRADE_ROW_FIELDS instead of BTOs, for read-only listings
+    def get_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None, **filters) -> List[Row]:
+        processed_filters = self._process_filters(filters)
+        return self.dal.get_trade_rows(user_id, source, **processed_filters)
+
+    def get_trades_page(self, user_id: Optional[int], limit: int, cursor: Optional[str] = None,
+                        source: Optional[SourceType] = None, **filters) -> Tuple[List[Row], Optional[str]]:
+        # one row more than the page tells whether there is a next page
+        processed_filters = self._process_filters(filters)
+        rows = self.dal.get_trade_rows_page(user_id, limit + 1, self._decode_cursor(cursor), source,
+                                            **processed_filters)
+        next_cursor = self._encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def stream_trades(self, user_id: Optional[int], source: Optional[SourceType] = None,
+                      **filters) -> Iterator[Row]:
+        processed_filters = self._process_filters(filters)
+        return self.dal.stream_trade_rows(user_id, source, **processed_filters)
+
+    @staticmethod
+    def _encode_cursor(trade: Row) -> str:
+        key = [trade.open_date.isoformat(), trade.open_time.isoformat(), trade.id]
+        return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[date, time, int]]:
+        if not cursor:
+            return None
+        try:
+            open_date, open_time, trade_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return date.fromisoformat(open_date), time.fromisoformat(open_time), int(trade_id)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor.")
+
+    def get_trade_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                             source: Optional[SourceType] = None, **filters) -> Dict:
+        processed_filters = self._process_filters(filters)
+        return self.dal.get_trade_aggregates(user_id, duration_buckets, source, **processed_filters)
+
+    def get_summary_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                               source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        processed_filters = self._process_filters(filters)
+        return self.dal.get_summary_aggregates(user_id, duration_buckets, source, **processed_filters)
+
+    def get_trade_columns(self, user_id: int, source: Optional[SourceType] = None, **filters) -> Dict[str, list]:
+        processed_filters = self._process_filters(filters)
+        return self.dal.get_trade_columns(user_id, source, **processed_filters)
+
+    def stream_trade_profits(self, user_id: int, source: Optional[SourceType] = None,
+                             **filters) -> Iterator[Optional[float]]:
+        processed_filters = self._process_filters(filters)
+        return self.dal.stream_trade_profits(user_id, source, **processed_filters)
+
+    def has_trade_columns(self, backtest_id: int) -> bool:
+        # the backtest's trades are a columnar blob on its row, not rows of the trades table
+        return self.dal.has_trade_columns(backtest_id)
+
+    @staticmethod
+    def _process_filters(filters: Dict) -> Dict:
         processed_filters = {}
 
         if "market" in filters:
@@ -76,8 +206,7 @@ class TradeBAOService(TradeBAOInterface):
             elif filters["profit_filter"] == "be":
                 processed_filters["profit"] = 0
 
-        trade_dtos = self.dal.get_trades_by_field(user_id, source, **processed_filters)
-        return [TradeMapper.dto_to_bto(trade) for trade in trade_dtos]
+        return processed_filters
 
 
     def update_trade(self, trade_id: int, updated_trade_bto: TradeBTO) -> Optional[TradeBTO]:
@@ -89,4 +218,6 @@ class TradeBAOService(TradeBAOInterface):
         updated_trade_dto.session = get_session_from_open_time(updated_trade_bto)
 
         result_dto = self.dal.update_trade(trade_id, updated_trade_dto)
+        if result_dto:
+            statistic_result_cache.invalidate_user(result_dto.user_id)
         return TradeMapper.dto_to_bto(result_dto) if result_dto else None
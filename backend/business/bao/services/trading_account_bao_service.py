@@ -12,9 +12,13 @@ from persistence.dal.trading_account_dal import TradingAccountDAL
 from business.bto.trading_account_bto import TradingAccountBTO
 
 
+# shared by the per-request service instances
+account_info_cache = TTLCache(maxsize=100, ttl=600)
+
+
 class TradingAccountBAOService(TradingAccountBAOInterface):
     def __init__(self, trading_account_dal: TradingAccountDAL):
-        self.account_info_cache = TTLCache(maxsize=100, ttl=600)
+        self.account_info_cache = account_info_cache
         self.trading_account_dal = trading_account_dal
 
 
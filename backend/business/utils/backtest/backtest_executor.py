@@ -1,9 +1,11 @@
 import math
-import pandas as pd
-from typing import List, Dict
-from ta.volatility import AverageTrueRange
+import numpy as np
+from typing import List, Dict, Union
 
-from business.utils.backtest.sl_calculator import get_dynamic_sl
+from business.utils.backtest.exit_tracker import ExitTracker
+from business.utils.backtest.monte_carlo import max_drawdown
+from business.utils.backtest.sl_calculator import StopLossContext
+from business.utils.candle_series import CandleSeries
 from persistence.entities.utils_entity import TradeType
 
 
@@ -31,31 +33,43 @@ class BacktestExecutor:
         self.loss_sum = 0.0
         self.nr_trades = 0
         self.timeframe = None
+        self.sl_context = None
 
-    def simulate_trades(self, signals: List[Dict], candles: List[Dict], timeframe: str, symbol: str) -> Dict:
+    def simulate_trades(self, signals: List[Dict], candles: Union[CandleSeries, List[Dict]],
+                        timeframe: str, symbol: str) -> Dict:
         executed_trades = []
         self.timeframe = timeframe
 
+        candles = CandleSeries.of(candles)
+        self.sl_context = StopLossContext(candles, symbol)
+
+        times = candles.time.tolist()
+        opens = candles.open.tolist()
+        highs = candles.high.tolist()
+        lows = candles.low.tolist()
+        closes = candles.close.tolist()
+
         position = None
         entry_price, entry_index = None, None
         sl_price, tp_price = None, None
+        tracker = None
 
         signal_pointer = 0
         current_signal = signals[signal_pointer] if signals else None
 
-        for i in range(len(candles)):
-            candle_time = candles[i]["time"]
+        for i in range(len(times)):
+            candle_time = times[i]
 
             if position is not None:
-                hit_tp, hit_sl = self._check_exit_conditions(candles, entry_index, i, sl_price, tp_price, position)
+                hit_tp, hit_sl = tracker.update(i, opens[i], highs[i], lows[i])
                 if hit_tp or hit_sl:
-                    exit_price = candles[i]["close"]
+                    exit_price = closes[i]
                     exit_action = "SELL" if position == "BUY" else "BUY"
                     profit = self._calculate_profit(exit_price, entry_price, sl_price, tp_price, hit_tp, hit_sl, position)
 
                     executed_trades.append(
                         self._record_trade(
-                            candles, entry_index, i,
+                            times, entry_index, i,
                             entry_action=position,
                             exit_action=exit_action,
                             entry_price=entry_price,
@@ -67,7 +81,7 @@ class BacktestExecutor:
                     )
 
                     self._update_metrics(profit)
-                    position = entry_price = entry_index = sl_price = tp_price = None
+                    position = entry_price = entry_index = sl_price = tp_price = tracker = None
 
             if current_signal and candle_time >= current_signal["timestamp"]:
                 action = current_signal["action"]
@@ -75,18 +89,19 @@ class BacktestExecutor:
 
                 if position is None:
                     position, entry_price, entry_index, sl_price, tp_price = (
-                        self._enter_position(action, price, i, candles, symbol)
+                        self._enter_position(action, price, i)
                     )
+                    tracker = ExitTracker(entry_index, sl_price, tp_price, position)
 
                 elif position != action:
                     exit_price = price
-                    hit_tp, hit_sl = self._check_exit_conditions(candles, entry_index, i, sl_price, tp_price, position)
+                    hit_tp, hit_sl = tracker.hit_tp, tracker.hit_sl
                     profit = self._calculate_profit(exit_price, entry_price, sl_price, tp_price, hit_tp, hit_sl, position)
                     exit_action = "SELL" if position == "BUY" else "BUY"
 
                     executed_trades.append(
                         self._record_trade(
-                            candles, entry_index, i,
+                            times, entry_index, i,
                             entry_action=position,
                             exit_action=exit_action,
                             entry_price=entry_price,
@@ -100,22 +115,23 @@ class BacktestExecutor:
                     self._update_metrics(profit)
 
                     position, entry_price, entry_index, sl_price, tp_price = (
-                        self._enter_position(action, price, i, candles, symbol)
+                        self._enter_position(action, price, i)
                     )
+                    tracker = ExitTracker(entry_index, sl_price, tp_price, position)
 
                 signal_pointer += 1
                 current_signal = signals[signal_pointer] if signal_pointer < len(signals) else None
 
         if position is not None:
-            exit_index = len(candles) - 1
-            exit_price = candles[exit_index]["close"]
-            hit_tp, hit_sl = self._check_exit_conditions(candles, entry_index, exit_index, sl_price, tp_price, position)
+            exit_index = len(times) - 1
+            exit_price = closes[exit_index]
+            hit_tp, hit_sl = tracker.hit_tp, tracker.hit_sl
             profit = self._calculate_profit(exit_price, entry_price, sl_price, tp_price, hit_tp, hit_sl, position)
             exit_action = "SELL" if position == "BUY" else "BUY"
 
             executed_trades.append(
                 self._record_trade(
-                    candles, entry_index, exit_index,
+                    times, entry_index, exit_index,
                     entry_action=position,
                     exit_action=exit_action,
                     entry_price=entry_price,
@@ -134,9 +150,9 @@ class BacktestExecutor:
             "executed_trades": executed_trades,
         }
 
-    def _enter_position(self, action: str, price: float, index: int, candles: List[Dict], symbol: str):
-        risk_amount = self.equity * (self.risk_per_trade / 100)
-        sl_distance = get_dynamic_sl(price, candles, index, symbol, action)
+    def _enter_position(self, action: str, price: float, index: int, sl_context: StopLossContext = None):
+        sl_context = sl_context or self.sl_context
+        sl_distance = sl_context.get_sl_distance(price, index, action)
 
         tp_distance = sl_distance * self.risk_reward_ratio
 
@@ -149,41 +165,6 @@ class BacktestExecutor:
 
         return action, price, index, sl_price, tp_price
 
-    def _check_exit_conditions(
-            self, candles: List[Dict], entry_index: int, current_index: int,
-            sl_price: float, tp_price: float, position: str
-    ):
-        hit_tp, hit_sl = False, False
-
-        for j in range(entry_index + 1, current_index + 1):
-            o = candles[j]["open"]
-            h = candles[j]["high"]
-            l = candles[j]["low"]
-            c = candles[j]["close"]
-
-            if position == "BUY":
-                if l <= sl_price and h >= tp_price:
-                    if abs(o - sl_price) < abs(o - tp_price):
-                        return False, True  # SL first
-                    else:
-                        return True, False  # TP first
-                elif l <= sl_price:
-                    return False, True
-                elif h >= tp_price:
-                    return True, False
-
-            else:  # SELL
-                if h >= sl_price and l <= tp_price:
-                    if abs(o - sl_price) < abs(o - tp_price):
-                        return False, True  # SL first
-                    else:
-                        return True, False  # TP first
-                elif h >= sl_price:
-                    return False, True
-                elif l <= tp_price:
-                    return True, False
-        return hit_tp, hit_sl
-
     def _calculate_profit(self, exit_price: float, entry_price: float,
                           sl_price: float, tp_price: float,
                           hit_tp: bool, hit_sl: bool, position: str):
@@ -211,7 +192,7 @@ class BacktestExecutor:
         profit = risk_amount * rr_achieved
         return round(profit, 2)
 
-    def _record_trade(self, candles: List[Dict], entry_index: int, exit_index: int,
+    def _record_trade(self, times: List[int], entry_index: int, exit_index: int,
                       entry_action: str, exit_action: str,
                       entry_price: float, exit_price: float,
                       sl_price: float, tp_price: float,
@@ -227,8 +208,8 @@ class BacktestExecutor:
             "tp_price": tp_price,
             "profit": profit,
             "pips": abs(entry_price - exit_price),
-            "open_timestamp": candles[entry_index]["time"],
-            "close_timestamp": candles[exit_index]["time"]
+            "open_timestamp": times[entry_index],
+            "close_timestamp": times[exit_index]
         }
 
     def _update_metrics(self, profit: float):
@@ -263,12 +244,5 @@ class BacktestExecutor:
         }
 
     def _calculate_max_drawdown(self) -> float:
-        peak = self.equity_curve[0]
-        max_dd = 0.0
-        for balance in self.equity_curve:
-            if balance > peak:
-                peak = balance
-            drawdown = peak - balance
-            max_dd = max(max_dd, drawdown)
-        return max_dd
+        return float(max_drawdown(np.asarray(self.equity_curve)))
 
@@ -0,0 +1,53 @@
+from typing import Tuple
+
+
+def check_bar_exit(o: float, h: float, l: float, sl_price: float, tp_price: float, position: str) -> Tuple[bool, bool]:
+    if position == "BUY":
+        if l <= sl_price and h >= tp_price:
+            if abs(o - sl_price) < abs(o - tp_price):
+                return False, True  # SL first
+            else:
+                return True, False  # TP first
+        elif l <= sl_price:
+            return False, True
+        elif h >= tp_price:
+            return True, False
+
+    else:  # SELL
+        if h >= sl_price and l <= tp_price:
+            if abs(o - sl_price) < abs(o - tp_price):
+                return False, True  # SL first
+            else:
+                return True, False  # TP first
+        elif h >= sl_price:
+            return False, True
+        elif l <= tp_price:
+            return True, False
+
+    return False, False
+
+
+class ExitTracker:
+    # Follows one open position bar by bar. Only the newly arrived bar is checked,
+    # the first SL/TP hit is latched, so the cost per bar is O(1) instead of rescanning from entry.
+    def __init__(self, entry_index: int, sl_price: float, tp_price: float, position: str):
+        self.entry_index = entry_index
+        self.sl_price = sl_price
+        self.tp_price = tp_price
+        self.position = position
+
+        self.last_index = entry_index
+        self.hit_tp = False
+        self.hit_sl = False
+
+    @property
+    def is_hit(self) -> bool:
+        return self.hit_tp or self.hit_sl
+
+    def update(self, index: int, o: float, h: float, l: float) -> Tuple[bool, bool]:
+        if self.is_hit or index <= self.last_index:
+            return self.hit_tp, self.hit_sl
+
+        self.last_index = index
+        self.hit_tp, self.hit_sl = check_bar_exit(o, h, l, self.sl_price, self.tp_price, self.position)
+        return self.hit_tp, self.hit_sl
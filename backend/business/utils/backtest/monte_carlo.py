@@ -0,0 +1,201 @@
+from typing import List, Dict, Optional
+import numpy as np
+
+
+SIMULATION_METHODS = ("shuffle", "bootstrap")
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_PATHS = 100_000
+
+# Paths are simulated PATH_CHUNK at a time, one trade after the other, with each path's state (equity, peak,
+# drawdown, losing run) in vectors across the paths. numpy's cumulative ops along a path are much slower than
+# elementwise ops across paths, and the vectors stay in cache. Samples are drawn TRADE_BLOCK trades at a time.
+# Samples are drawn for ~2 * sqrt(paths) rows and columns of a grid of paths (see _sample_blocks): a permutation
+# per path alone took longer than the whole simulation. 10,000 paths x 5,000 trades take ~0.5 s on one core.
+PATH_CHUNK = 8192
+TRADE_BLOCK = 64
+# values per batch of shuffle sort keys (~8 MB of uint64)
+SORT_BATCH_VALUES = 1 << 20
+
+
+# Path metrics, computed along the last axis so they work on one curve or a (paths, trades) matrix
+def max_drawdown(equity: np.ndarray, initial_balance: Optional[float] = None) -> np.ndarray:
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] == 0:
+        return np.zeros(equity.shape[:-1])
+
+    drawdown = np.maximum.accumulate(equity, axis=-1)
+    if initial_balance is not None:
+        np.maximum(drawdown, initial_balance, out=drawdown)
+    np.subtract(drawdown, equity, out=drawdown)
+    return drawdown.max(axis=-1)
+
+
+def longest_losing_streak(profits: np.ndarray) -> np.ndarray:
+    losses = np.asarray(profits) < 0
+    if losses.shape[-1] == 0:
+        return np.zeros(losses.shape[:-1], dtype=np.int64)
+
+    # running count of losses, minus the count at the last winning (or flat) trade
+    dtype = np.int16 if losses.shape[-1] <= np.iinfo(np.int16).max else np.int64
+    count = np.cumsum(losses, axis=-1, dtype=dtype)
+    last_reset = np.where(losses, 0, count).astype(dtype, copy=False)
+    np.maximum.accumulate(last_reset, axis=-1, out=last_reset)
+    np.subtract(count, last_reset, out=count)
+    return count.max(axis=-1).astype(np.int64)
+
+
+def trade_returns(profits: np.ndarray, initial_balance: float) -> np.ndarray:
+    # profit of each trade relative to the balance it was sized on
+    profits = np.asarray(profits, dtype=np.float64)
+    balance_before = initial_balance + np.concatenate(([0.0], np.cumsum(profits)[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(balance_before > 0, profits / balance_before, 0.0)
+    return returns
+
+
+# Simulation
+def _permutations(rng: np.random.Generator, n_paths: int, n_trades: int) -> np.ndarray:
+    # one random order of the trades per row. The rows sort random 48-bit keys with the trade index in the low
+    # 16 bits, a plain sort of uint64 is much faster than per-element bounded draws or an argsort.
+    if n_trades > 1 << 16:
+        return rng.permuted(np.broadcast_to(np.arange(n_trades), (n_paths, n_trades)), axis=1)
+
+    order = np.empty((n_paths, n_trades), dtype=np.uint16)
+    trade_index = np.arange(n_trades, dtype=np.uint64)
+    batch = max(1, SORT_BATCH_VALUES // n_trades)
+    for start in range(0, n_paths, batch):
+        stop = min(start + batch, n_paths)
+        keys = rng.bit_generator.random_raw((stop - start) * n_trades).reshape(stop - start, n_trades)
+        keys &= np.uint64(0xFFFF_FFFF_FFFF_0000)
+        keys |= trade_index
+        keys.sort(axis=1)
+        order[start:stop] = keys & np.uint64(0xFFFF)
+    return order
+
+
+def _sample_blocks(rng: np.random.Generator, values: np.ndarray, n_paths: int, method: str):
+    # (trades, paths) blocks of sampled values, TRADE_BLOCK trades each. The paths are a grid of `groups` columns
+    # g by `rows` rows j, built from draws per row and per column instead of per path:
+    # - shuffle: path (j, g) plays base permutation g in the order of permutation j, bases[g][orders[j][k]]
+    # - bootstrap: path (j, g) takes trade (first[k][g] + second[k][j]) mod n as its k-th trade
+    # Every path is sampled exactly as on its own. Two paths sharing g (or j) are independent too, composing
+    # with (adding) an independent uniform permutation (index) gives one, so any statistic averaged over the
+    # paths has the variance of independent paths.
+    n_trades = len(values)
+    groups = int(np.ceil(np.sqrt(n_paths)))
+    rows = -(-n_paths // groups)
+
+    if method == "shuffle":
+        # (trades, groups), column g holds the values in the order of base g
+        base_values = np.ascontiguousarray(values[_permutations(rng, groups, n_trades)].T)
+        orders = np.ascontiguousarray(_permutations(rng, rows, n_trades).T)
+    else:
+        # index sums stay below 2n, the doubled values spare the mod
+        doubled = np.concatenate((values, values))
+
+    for start in range(0, n_trades, TRADE_BLOCK):
+        stop = min(start + TRADE_BLOCK, n_trades)
+        if method == "shuffle":
+            # whole rows of base_values, (trades, rows, groups)
+            block = base_values[orders[start:stop]]
+        else:
+            first = rng.integers(0, n_trades, size=(stop - start, 1, groups))
+            second = rng.integers(0, n_trades, size=(stop - start, rows, 1))
+            block = doubled[first + second]
+        yield block.reshape(stop - start, -1)[:, :n_paths]
+
+
+def _simulate_chunk(blocks, n_paths: int, initial_balance: float, compounding: bool):
+    # Equity is initial_balance times the running product of (1 + return), or plus the running sum of profits.
+    # Peak and drawdown are tracked on that level and scaled to the balance once at the end.
+    level = np.ones(n_paths) if compounding else np.zeros(n_paths)
+    peak = level.copy()
+    drawdown = np.zeros(n_paths)
+    losing_run = np.zeros(n_paths, dtype=np.int32)
+    streak = np.zeros(n_paths, dtype=np.int32)
+    scratch = np.empty(n_paths)
+    losing = np.empty(n_paths, dtype=bool)
+
+    for block in blocks:
+        for value in block:
+            if compounding:
+                np.add(value, 1.0, out=scratch)
+                level *= scratch
+            else:
+                level += value
+
+            np.maximum(peak, level, out=peak)
+            np.subtract(peak, level, out=scratch)
+            np.maximum(drawdown, scratch, out=drawdown)
+
+            np.less(value, 0, out=losing)
+            losing_run += 1
+            losing_run *= losing
+            np.maximum(streak, losing_run, out=streak)
+
+    if compounding:
+        return level * initial_balance, drawdown * initial_balance, streak
+    return level + initial_balance, drawdown, streak
+
+
+def simulate(profits: List[float], initial_balance: float, n_paths: int = 1000, method: str = "bootstrap",
+             compounding: bool = True, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    if method not in SIMULATION_METHODS:
+        raise ValueError(f"Invalid method '{method}', expected one of {SIMULATION_METHODS}.")
+    if not isinstance(n_paths, int) or not 0 < n_paths <= MAX_PATHS:
+        raise ValueError(f"n_paths must be between 1 and {MAX_PATHS}.")
+
+    profits = np.asarray(profits, dtype=np.float64)
+    # compounding resamples returns, so a trade keeps its size relative to the balance at that point of the path
+    values = trade_returns(profits, initial_balance) if compounding else profits
+
+    rng = np.random.default_rng(seed)
+    final_equity = np.full(n_paths, float(initial_balance))
+    drawdowns = np.zeros(n_paths)
+    streaks = np.zeros(n_paths, dtype=np.int64)
+    if len(profits) == 0:
+        return {"final_equity": final_equity, "max_drawdown": drawdowns, "losing_streak": streaks}
+
+    # equal chunks, a small last one would pay the per-trade overhead for few paths
+    chunk = -(-n_paths // -(-n_paths // PATH_CHUNK))
+    for start in range(0, n_paths, chunk):
+        stop = min(start + chunk, n_paths)
+        blocks = _sample_blocks(rng, values, stop - start, method)
+        final_equity[start:stop], drawdowns[start:stop], streaks[start:stop] = \
+            _simulate_chunk(blocks, stop - start, initial_balance, compounding)
+
+    return {"final_equity": final_equity, "max_drawdown": drawdowns, "losing_streak": streaks}
+
+
+def _distribution(values: np.ndarray) -> Dict:
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std()), 2),
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)},
+    }
+
+
+def summarize(simulation: Dict[str, np.ndarray], initial_balance: float) -> Dict:
+    final_equity = simulation["final_equity"]
+    return {
+        "n_paths": len(final_equity),
+        "probability_of_loss": round(float((final_equity < initial_balance).mean()), 4),
+        "final_equity": _distribution(final_equity),
+        "max_drawdown": _distribution(simulation["max_drawdown"]),
+        "losing_streak": _distribution(simulation["losing_streak"].astype(np.float64)),
+    }
+
+
+def run_monte_carlo(profits: List[float], initial_balance: float, n_paths: int = 1000, method: str = "bootstrap",
+                    compounding: bool = True, seed: Optional[int] = None) -> Dict:
+    simulation = simulate(profits, initial_balance, n_paths, method, compounding, seed)
+    return {
+        "method": method,
+        "compounding": compounding,
+        "initial_balance": initial_balance,
+        "nr_trades": len(profits),
+        **summarize(simulation, initial_balance),
+    }
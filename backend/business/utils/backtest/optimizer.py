@@ -0,0 +1,186 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
+import numpy as np
+
+from business.utils.backtest.backtest_executor import BacktestExecutor
+from business.utils.candle_series import CandleSeries
+from business.utils.strategies.strategy_registry import StrategyRegistry
+from persistence.entities.utils_entity import StrategyType
+
+
+EXECUTOR_PARAMETERS = ("initial_balance", "risk_per_trade", "risk_reward_ratio")
+
+# metric -> True when higher is better
+RANKING_METRICS = {
+    "total_profit": True,
+    "profit_factor": True,
+    "expectancy": True,
+    "winrate": True,
+    "drawdown_max": False,
+    "nr_trades": True,
+}
+
+SAMPLING_METHODS = ("random", "latin_hypercube")
+MAX_COMBINATIONS = 5000
+
+
+# Parameter sets
+def build_parameter_grid(grid: Dict[str, List]) -> List[Dict]:
+    if not isinstance(grid, dict) or not grid:
+        raise ValueError("parameter_grid must be a non-empty dictionary of value lists.")
+
+    for name, values in grid.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"parameter_grid['{name}'] must be a non-empty list.")
+
+    total = math.prod(len(values) for values in grid.values())
+    if total > MAX_COMBINATIONS:
+        raise ValueError(f"parameter_grid has {total} combinations, the maximum is {MAX_COMBINATIONS}.")
+
+    names = list(grid.keys())
+    return [dict(zip(names, combo)) for combo in itertools.product(*grid.values())]
+
+
+def sample_parameters(ranges: Dict[str, List], n_samples: int, method: str = "random",
+                      seed: Optional[int] = None) -> List[Dict]:
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Invalid sampling method '{method}', expected one of {SAMPLING_METHODS}.")
+    if not isinstance(ranges, dict) or not ranges:
+        raise ValueError("sampling.ranges must be a non-empty dictionary of [min, max] pairs.")
+    if not isinstance(n_samples, int) or not 0 < n_samples <= MAX_COMBINATIONS:
+        raise ValueError(f"sampling.n_samples must be between 1 and {MAX_COMBINATIONS}.")
+
+    rng = np.random.default_rng(seed)
+    samples = [{} for _ in range(n_samples)]
+
+    for name, bounds in ranges.items():
+        if not isinstance(bounds, list) or len(bounds) != 2 or bounds[0] > bounds[1]:
+            raise ValueError(f"sampling.ranges['{name}'] must be a [min, max] pair.")
+        low, high = bounds
+
+        if method == "latin_hypercube":
+            # one sample per stratum, strata shuffled independently per dimension
+            u = (rng.permutation(n_samples) + rng.random(n_samples)) / n_samples
+        else:
+            u = rng.random(n_samples)
+
+        if isinstance(low, int) and isinstance(high, int):
+            values = np.minimum(np.floor(low + u * (high - low + 1)), high).astype(int).tolist()
+        else:
+            values = (low + u * (high - low)).tolist()
+
+        for sample, value in zip(samples, values):
+            sample[name] = value
+
+    return samples
+
+
+def split_parameters(parameters: Dict) -> Tuple[Dict, Dict]:
+    strategy_params = {k: v for k, v in parameters.items() if k not in EXECUTOR_PARAMETERS}
+    executor_params = {k: v for k, v in parameters.items() if k in EXECUTOR_PARAMETERS}
+    return strategy_params, executor_params
+
+
+# Evaluation
+def evaluate_parameters(strategy_type: StrategyType, candles: CandleSeries, symbol: str, time_frame: str,
+                        parameters: Dict, settings: Dict, trade_from: Optional[int] = None) -> Dict:
+    strategy_params, executor_params = split_parameters(parameters)
+    executor_settings = {**settings, **executor_params}
+
+    strategy = StrategyRegistry.get_strategy(strategy_type)
+    signals = strategy.generate_trades(candles, strategy_params)
+    if trade_from is not None:
+        # earlier candles only warm up the indicators
+        signals = [s for s in signals if s["timestamp"] >= trade_from]
+
+    executor = BacktestExecutor(
+        initial_balance=executor_settings["initial_balance"],
+        risk_per_trade=executor_settings["risk_per_trade"],
+        risk_reward_ratio=executor_settings["risk_reward_ratio"]
+    )
+    result = executor.simulate_trades(signals, candles, time_frame, symbol)
+
+    metrics = {k: v for k, v in result["metrics"].items() if k != "balance_curve"}
+    return {"parameters": parameters, "metrics": metrics}
+
+
+def rank_results(results: List[Dict], rank_by: str) -> List[Dict]:
+    if rank_by not in RANKING_METRICS:
+        raise ValueError(f"Invalid rank_by '{rank_by}', expected one of {list(RANKING_METRICS)}.")
+
+    higher_is_better = RANKING_METRICS[rank_by]
+
+    def sort_key(result: Dict):
+        value = result["metrics"].get(rank_by)
+        if value is None:
+            # profit_factor is None when there were no losses
+            value = math.inf if rank_by == "profit_factor" else None
+        if value is None:
+            return 1, 0.0
+        return 0, -value if higher_is_better else value
+
+    ranked = sorted(results, key=sort_key)
+    return [{"rank": i + 1, **result} for i, result in enumerate(ranked)]
+
+
+# Process pool: candles and settings are sent once per worker, not once per task
+_worker_state: Dict = {}
+
+
+def _init_worker(strategy_type: StrategyType, candles: CandleSeries, symbol: str, time_frame: str, settings: Dict):
+    _worker_state.update(
+        strategy_type=strategy_type, candles=candles, symbol=symbol, time_frame=time_frame, settings=settings
+    )
+
+
+def _evaluate_in_worker(parameters: Dict) -> Dict:
+    return evaluate_parameters(
+        _worker_state["strategy_type"], _worker_state["candles"], _worker_state["symbol"],
+        _worker_state["time_frame"], parameters, _worker_state["settings"]
+    )
+
+
+def default_worker_count(tasks: int, max_workers: Optional[int] = None) -> int:
+    limit = max_workers or int(os.getenv("OPTIMIZER_MAX_WORKERS", os.cpu_count() or 1))
+    return max(1, min(limit, tasks))
+
+
+def collect_results(results: Iterable[Dict], on_result: Optional[Callable[[Dict], None]] = None,
+                    pool: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+    # on_result sees every result as it arrives; if it raises (e.g. the job was cancelled)
+    # the tasks that haven't started yet are dropped instead of being waited for
+    collected = []
+    try:
+        for result in results:
+            collected.append(result)
+            if on_result:
+                on_result(result)
+    except BaseException:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    return collected
+
+
+def run_parameter_sweep(strategy_type: StrategyType, candles: CandleSeries, symbol: str, time_frame: str,
+                        combinations: List[Dict], settings: Dict, max_workers: Optional[int] = None,
+                        on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    workers = default_worker_count(len(combinations), max_workers)
+
+    if workers == 1:
+        return collect_results(
+            (evaluate_parameters(strategy_type, candles, symbol, time_frame, params, settings)
+             for params in combinations),
+            on_result
+        )
+
+    chunksize = max(1, len(combinations) // (workers * 4))
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(strategy_type, candles, symbol, time_frame, settings)
+    ) as pool:
+        return collect_results(pool.map(_evaluate_in_worker, combinations, chunksize=chunksize), on_result, pool)
@@ -0,0 +1,121 @@
+import heapq
+from itertools import repeat
+from typing import List, Dict, Union
+
+from business.utils.backtest.backtest_executor import BacktestExecutor
+from business.utils.backtest.exit_tracker import ExitTracker
+from business.utils.backtest.sl_calculator import StopLossContext
+from business.utils.candle_series import CandleSeries
+
+
+class PortfolioLeg:
+    def __init__(self, symbol: str, candles: Union[CandleSeries, List[Dict]], signals: List[Dict]):
+        self.symbol = symbol
+        candles = CandleSeries.of(candles)
+        self.sl_context = StopLossContext(candles, symbol)
+
+        self.times = candles.time.tolist()
+        self.opens = candles.open.tolist()
+        self.highs = candles.high.tolist()
+        self.lows = candles.low.tolist()
+        self.closes = candles.close.tolist()
+
+        self.signals = signals
+        self.signal_pointer = 0
+
+        self.position = None
+        self.entry_price, self.entry_index = None, None
+        self.sl_price, self.tp_price = None, None
+        self.tracker = None
+
+        self.executed_trades = []
+
+    @property
+    def current_signal(self):
+        return self.signals[self.signal_pointer] if self.signal_pointer < len(self.signals) else None
+
+    def bars(self, leg_index: int):
+        # (timestamp, leg, bar) keys, already sorted, for the k-way merge
+        return zip(self.times, repeat(leg_index), range(len(self.times)))
+
+
+class PortfolioExecutor(BacktestExecutor):
+    # Runs several legs against one shared equity: the legs' bars are merged on timestamp
+    # and streamed once, so every trade is sized from the balance at the moment it closes.
+    def simulate_portfolio(self, legs: List[PortfolioLeg], timeframe: str) -> Dict:
+        self.timeframe = timeframe
+        executed_trades = []
+
+        for _, leg_index, i in heapq.merge(*(leg.bars(n) for n, leg in enumerate(legs))):
+            leg = legs[leg_index]
+
+            if leg.position is not None:
+                hit_tp, hit_sl = leg.tracker.update(i, leg.opens[i], leg.highs[i], leg.lows[i])
+                if hit_tp or hit_sl:
+                    executed_trades.append(self._close_leg(leg, leg_index, i, leg.closes[i], hit_tp, hit_sl))
+
+            signal = leg.current_signal
+            if signal and leg.times[i] >= signal["timestamp"]:
+                action = signal["action"]
+                price = signal["price"]
+
+                if leg.position is None:
+                    self._open_leg(leg, action, price, i)
+                elif leg.position != action:
+                    executed_trades.append(
+                        self._close_leg(leg, leg_index, i, price, leg.tracker.hit_tp, leg.tracker.hit_sl)
+                    )
+                    self._open_leg(leg, action, price, i)
+
+                leg.signal_pointer += 1
+
+            # a position still open on the leg's last bar is closed there
+            if i == len(leg.times) - 1 and leg.position is not None:
+                executed_trades.append(
+                    self._close_leg(leg, leg_index, i, leg.closes[i], leg.tracker.hit_tp, leg.tracker.hit_sl)
+                )
+
+        return {
+            "metrics": self._calculate_final_metrics(),
+            "legs": [self._leg_metrics(leg) for leg in legs],
+            "executed_trades": executed_trades,
+        }
+
+    def _open_leg(self, leg: PortfolioLeg, action: str, price: float, index: int):
+        leg.position, leg.entry_price, leg.entry_index, leg.sl_price, leg.tp_price = (
+            self._enter_position(action, price, index, leg.sl_context)
+        )
+        leg.tracker = ExitTracker(leg.entry_index, leg.sl_price, leg.tp_price, leg.position)
+
+    def _close_leg(self, leg: PortfolioLeg, leg_index: int, exit_index: int, exit_price: float,
+                   hit_tp: bool, hit_sl: bool) -> Dict:
+        profit = self._calculate_profit(
+            exit_price, leg.entry_price, leg.sl_price, leg.tp_price, hit_tp, hit_sl, leg.position
+        )
+        trade = self._record_trade(
+            leg.times, leg.entry_index, exit_index,
+            entry_action=leg.position,
+            exit_action="SELL" if leg.position == "BUY" else "BUY",
+            entry_price=leg.entry_price,
+            exit_price=exit_price,
+            sl_price=leg.sl_price,
+            tp_price=leg.tp_price,
+            profit=profit,
+        )
+        trade["leg"] = leg_index
+        trade["symbol"] = leg.symbol
+
+        self._update_metrics(profit)
+        leg.executed_trades.append(trade)
+        leg.position = leg.entry_price = leg.entry_index = leg.sl_price = leg.tp_price = leg.tracker = None
+        return trade
+
+    def _leg_metrics(self, leg: PortfolioLeg) -> Dict:
+        # same formulas as the aggregate, over the leg's own trades
+        accumulator = BacktestExecutor(self.initial_balance, self.risk_per_trade, self.risk_reward_ratio)
+        for trade in leg.executed_trades:
+            accumulator._update_metrics(trade["profit"])
+
+        metrics = accumulator._calculate_final_metrics()
+        metrics.pop("balance_curve")
+        return {"symbol": leg.symbol, "nr_candles": len(leg.times), "metrics": metrics}
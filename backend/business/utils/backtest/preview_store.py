@@ -0,0 +1,45 @@
+import os
+import secrets
+import threading
+from typing import Dict, Optional
+from cachetools import TTLCache
+
+
+class PreviewStore:
+    # Keeps preview results server-side for a short time, so saving a backtest only needs the token
+    # and persists exactly what the engine computed. Bounded by the number of held trades.
+    def __init__(self, max_trades: int, ttl: int):
+        self._entries = TTLCache(maxsize=max_trades, ttl=ttl, getsizeof=self._size_of)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size_of(entry: Dict) -> int:
+        return len(entry["result"]["executed_trades"]) + 1
+
+    def put(self, request: Dict, result: Dict) -> Optional[str]:
+        entry = {"request": request, "result": result}
+        if self._size_of(entry) > self._entries.maxsize:
+            return None
+
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._entries[token] = entry
+        return token
+
+    def pop(self, token: str, user_id: int) -> Optional[Dict]:
+        # single use: a token saves one backtest, and only for the user who ran the preview
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry["request"]["user_id"] != user_id:
+                return None
+            return self._entries.pop(token)
+
+    def restore(self, token: str, entry: Dict):
+        with self._lock:
+            self._entries[token] = entry
+
+
+preview_store = PreviewStore(
+    max_trades=int(os.getenv("PREVIEW_STORE_MAX_TRADES", 1_000_000)),
+    ttl=int(os.getenv("PREVIEW_TOKEN_TTL", 1800))
+)
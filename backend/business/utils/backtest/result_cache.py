@@ -0,0 +1,166 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Optional, Union
+from cachetools import TTLCache
+
+
+# bump when the candle loaders change in a way that alters the data they return
+CANDLE_SOURCE_VERSION = 2
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "1h": 3600,
+    "daily": 86400,
+    "1d": 86400,
+}
+
+
+def candle_data_version(time_frame: str, end_date: Union[str, date, datetime]) -> str:
+    # A range that ended before today is final. One that reaches today changes with every new candle,
+    # so its version is the index of the current candle period.
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date[:10], "%Y-%m-%d").date()
+    elif isinstance(end_date, datetime):
+        end_date = end_date.date()
+
+    if end_date < datetime.utcnow().date():
+        return f"{CANDLE_SOURCE_VERSION}:closed"
+    return f"{CANDLE_SOURCE_VERSION}:{int(time.time()) // TIMEFRAME_SECONDS.get(time_frame, 60)}"
+
+
+def make_cache_key(inputs: Dict) -> str:
+    payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BacktestResultCache:
+    # In-memory TTL/LRU tier bounded by the number of cached trades, plus an optional pickle tier on disk.
+    # Entries are keyed by (strategy_id, key) so a strategy change can drop them, evicted entries leave nothing behind.
+    def __init__(self, max_trades: int, ttl: int, disk_dir: Optional[str] = None, disk_ttl: Optional[int] = None):
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_ttl = disk_ttl if disk_ttl is not None else ttl
+
+        self._memory = TTLCache(maxsize=max_trades, ttl=ttl, getsizeof=self._size_of)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def _size_of(entry: Dict) -> int:
+        return len(entry["executed_trades"]) + 1
+
+    def _disk_path(self, strategy_id: int, key: str) -> str:
+        return os.path.join(self.disk_dir, f"s{strategy_id}_{key}.pkl")
+
+    def get(self, strategy_id: int, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get((strategy_id, key))
+            if entry is not None:
+                self._stats["hits"] += 1
+                return entry
+
+        entry = self._read_disk(strategy_id, key)
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(strategy_id, key, entry)
+        return entry
+
+    def put(self, strategy_id: int, key: str, entry: Dict):
+        with self._lock:
+            self._stats["stores"] += 1
+            self._remember(strategy_id, key, entry)
+        self._write_disk(strategy_id, key, entry)
+
+    def _remember(self, strategy_id: int, key: str, entry: Dict):
+        if self._size_of(entry) > self._memory.maxsize:
+            return
+        self._memory[(strategy_id, key)] = entry
+
+    def invalidate_strategy(self, strategy_id: int):
+        with self._lock:
+            dropped = [memory_key for memory_key in self._memory.keys() if memory_key[0] == strategy_id]
+            for memory_key in dropped:
+                self._memory.pop(memory_key, None)
+            self._stats["invalidations"] += 1
+
+        if self.disk_dir:
+            for path in glob.glob(os.path.join(self.disk_dir, f"s{strategy_id}_*.pkl")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+        if self.disk_dir:
+            for path in glob.glob(os.path.join(self.disk_dir, "s*_*.pkl")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round((self._stats["hits"] + self._stats["disk_hits"]) / lookups, 4) if lookups else None,
+                "entries": len(self._memory),
+                "cached_trades": int(self._memory.currsize),
+                "max_trades": int(self._memory.maxsize),
+                "disk_enabled": bool(self.disk_dir),
+            }
+
+    # Disk tier
+    def _read_disk(self, strategy_id: int, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(strategy_id, key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.disk_ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_disk(self, strategy_id: int, key: str, entry: Dict):
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(strategy_id, key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("ERROR writing backtest cache entry:", str(e))
+
+
+backtest_result_cache = BacktestResultCache(
+    max_trades=int(os.getenv("BACKTEST_CACHE_MAX_TRADES", 500_000)),
+    ttl=int(os.getenv("BACKTEST_CACHE_TTL", 900)),
+    disk_dir=os.getenv("BACKTEST_CACHE_DIR") or None,
+    disk_ttl=int(os.getenv("BACKTEST_CACHE_DISK_TTL", 86400))
+)
@@ -1,9 +1,12 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 import math
 import numpy as np
 import pandas as pd
 from ta.volatility import AverageTrueRange
 
+from business.utils import indicators
+from business.utils.candle_series import CandleSeries
+
 def _pip_size(symbol: str) -> float:
     s = symbol.upper()
     # indices/metale/crypto/forex
@@ -19,9 +22,89 @@ def _pip_size(symbol: str) -> float:
         return 0.0001  # standard FX pairs
     return 0.0001
 
+class StopLossContext:
+    ATR_WINDOW = 14
+    ATR_MULTIPLIER = 1.5
+    STRUCTURE_LOOKBACK = 10
+    VOLATILITY_WINDOW = 30
+    VOLATILITY_MULTIPLIER = 1.2
+
+    # Built once per backtest: every series get_dynamic_sl needs is precomputed,
+    # so looking up the SL distance for an entry index is O(1).
+    def __init__(self, candles: Union[CandleSeries, List[Dict]], symbol: str,
+                 structure_lookback: int = STRUCTURE_LOOKBACK):
+        candles = CandleSeries.of(candles)
+        self.size = len(candles)
+        self.structure_lookback = structure_lookback
+        self.default_distance = float(20 * _pip_size(symbol))
+
+        self.atr = None
+        self.swing_low = None
+        self.swing_high = None
+        self.tr_p75 = None
+
+        if not self.size:
+            return
+
+        df = pd.DataFrame({
+            "open": candles.open,
+            "high": candles.high,
+            "low": candles.low,
+            "close": candles.close,
+        })
+
+        # 1) ATR(14)
+        try:
+            self.atr = AverageTrueRange(
+                high=df["high"], low=df["low"], close=df["close"], window=self.ATR_WINDOW
+            ).average_true_range().to_numpy(dtype=float)
+        except Exception:
+            self.atr = None
+
+        # 2) Price structure: swing low/high of the previous N candles (entry candle excluded)
+        self.swing_low = indicators.shift(indicators.rolling_min(candles.low, structure_lookback))
+        self.swing_high = indicators.shift(indicators.rolling_max(candles.high, structure_lookback))
+
+        # 3) Fallback: percentila 75 a True Range (entry candle included)
+        tr = (df["high"] - df["low"]).astype(float)
+        self.tr_p75 = tr.rolling(self.VOLATILITY_WINDOW, min_periods=1).quantile(0.75).to_numpy(dtype=float)
+
+    def get_sl_distance(self, entry_price: float, entry_index: int, action: str) -> float:
+        if not self.size or entry_index <= 0 or entry_index >= self.size:
+            return self.default_distance
+
+        dist_atr = None
+        if self.atr is not None:
+            atr_val = float(self.atr[entry_index])
+            if math.isfinite(atr_val) and atr_val > 0:
+                dist_atr = atr_val * self.ATR_MULTIPLIER
+
+        dist_structure = None
+        is_buy = (action or "").upper() == "BUY"
+        if is_buy:
+            swing = float(self.swing_low[entry_index])
+            if math.isfinite(swing):
+                dist_structure = max(0.0, entry_price - swing)
+        else:
+            swing = float(self.swing_high[entry_index])
+            if math.isfinite(swing):
+                dist_structure = max(0.0, swing - entry_price)
+
+        dist_vol = None
+        p75 = float(self.tr_p75[entry_index])
+        if math.isfinite(p75) and p75 > 0:
+            dist_vol = p75 * self.VOLATILITY_MULTIPLIER
+
+        candidates = [d for d in (dist_atr, dist_structure, dist_vol) if d is not None and d > 0]
+        if candidates:
+            return float(max(candidates))
+
+        return self.default_distance
+
+
 def get_dynamic_sl(
     entry_price: float,
-    candles: List[Dict],
+    candles: Union[CandleSeries, List[Dict]],
     entry_index: int,
     symbol: str,
     action: str,
@@ -29,51 +112,4 @@ def get_dynamic_sl(
     if not candles or entry_index <= 0 or entry_index >= len(candles):
         return 20 * _pip_size(symbol)
 
-    df = pd.DataFrame(candles, dtype=float)
-    for col in ("high", "low", "close", "open"):
-        if col not in df.columns:
-            raise ValueError(f"Missing column: {col}")
-
-    # 1) ATR(14) * 1.5
-    dist_atr = None
-    try:
-        atr_series = AverageTrueRange(
-            high=df["high"], low=df["low"], close=df["close"], window=14
-        ).average_true_range()
-        atr_val = float(atr_series.iloc[entry_index])
-        if math.isfinite(atr_val) and atr_val > 0:
-            dist_atr = atr_val * 1.5
-    except Exception:
-        pass
-
-    # 2) Price structure (swing low/high for last N candles)
-    lookback = 10
-    left = max(0, entry_index - lookback)
-    lows = df["low"].iloc[left:entry_index]
-    highs = df["high"].iloc[left:entry_index]
-    dist_structure = None
-    if len(lows) and len(highs):
-        is_buy = (action or "").upper() == "BUY"
-        if is_buy:
-            dist_structure = max(0.0, entry_price - float(lows.min()))
-        else:
-            dist_structure = max(0.0, float(highs.max()) - entry_price)
-
-    # 3) Fallback: percentila 75 a True Range
-    dist_vol = None
-    try:
-        tr = (df["high"] - df["low"]).astype(float)
-        W = 30
-        tr_win = tr.iloc[max(0, entry_index - W + 1): entry_index + 1]
-        if len(tr_win):
-            p75 = float(np.nanpercentile(tr_win, 75))
-            if math.isfinite(p75) and p75 > 0:
-                dist_vol = p75 * 1.2
-    except Exception:
-        pass
-
-    candidates = [d for d in (dist_atr, dist_structure, dist_vol) if d is not None and d > 0]
-    if candidates:
-        return float(max(candidates))
-
-    return float(20 * _pip_size(symbol))
+    return StopLossContext(candles, symbol).get_sl_distance(entry_price, entry_index, action)
@@ -0,0 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Optional
+import numpy as np
+
+from business.utils.backtest.optimizer import evaluate_parameters, rank_results, default_worker_count, \
+    collect_results
+from business.utils.candle_series import CandleSeries
+from persistence.entities.utils_entity import StrategyType
+
+
+SECONDS_PER_DAY = 86400
+
+
+def build_folds(times: np.ndarray, in_sample_days: int, out_of_sample_days: int,
+                step_days: Optional[int] = None, anchored: bool = False) -> List[Dict]:
+    if in_sample_days <= 0 or out_of_sample_days <= 0:
+        raise ValueError("in_sample_days and out_of_sample_days must be positive.")
+    step_days = step_days or out_of_sample_days
+    if step_days <= 0:
+        raise ValueError("step_days must be positive.")
+
+    folds = []
+    if len(times) == 0:
+        return folds
+
+    first, last = int(times[0]), int(times[-1])
+    in_sample = in_sample_days * SECONDS_PER_DAY
+    out_of_sample = out_of_sample_days * SECONDS_PER_DAY
+    step = step_days * SECONDS_PER_DAY
+
+    window_start = first
+    while window_start + in_sample <= last:
+        oos_start_ts = window_start + in_sample
+        oos_end_ts = oos_start_ts + out_of_sample
+
+        # candle index ranges, end exclusive
+        is_start = 0 if anchored else int(np.searchsorted(times, window_start, side="left"))
+        oos_start = int(np.searchsorted(times, oos_start_ts, side="left"))
+        oos_end = int(np.searchsorted(times, oos_end_ts, side="left"))
+
+        if oos_start > is_start and oos_end > oos_start:
+            folds.append({
+                "fold": len(folds) + 1,
+                "in_sample": (is_start, oos_start),
+                "out_of_sample": (oos_start, oos_end),
+            })
+        window_start += step
+
+    return folds
+
+
+def run_fold(strategy_type: StrategyType, candles: CandleSeries, symbol: str, time_frame: str,
+             fold: Dict, combinations: List[Dict], settings: Dict, rank_by: str) -> Dict:
+    is_start, is_end = fold["in_sample"]
+    oos_start, oos_end = fold["out_of_sample"]
+
+    # Optimize on the in-sample slice
+    in_sample = candles[is_start:is_end]
+    results = [
+        evaluate_parameters(strategy_type, in_sample, symbol, time_frame, params, settings)
+        for params in combinations
+    ]
+    best = rank_results(results, rank_by)[0]
+
+    # Score the winner on the out-of-sample slice, warming indicators up on the in-sample candles
+    out_of_sample = evaluate_parameters(
+        strategy_type, candles[is_start:oos_end], symbol, time_frame, best["parameters"], settings,
+        trade_from=int(candles.time[oos_start])
+    )
+
+    return {
+        "fold": fold["fold"],
+        "in_sample": _window(candles, is_start, is_end),
+        "out_of_sample": _window(candles, oos_start, oos_end),
+        "best_parameters": best["parameters"],
+        "in_sample_metrics": best["metrics"],
+        "out_of_sample_metrics": out_of_sample["metrics"],
+    }
+
+
+def _window(candles: CandleSeries, start: int, end: int) -> Dict:
+    return {
+        "start": int(candles.time[start]),
+        "end": int(candles.time[end - 1]),
+        "nr_candles": end - start,
+    }
+
+
+def summarize_folds(folds: List[Dict]) -> Dict:
+    in_sample_profit = sum(f["in_sample_metrics"]["total_profit"] for f in folds)
+    out_of_sample_profit = sum(f["out_of_sample_metrics"]["total_profit"] for f in folds)
+    nr_trades = sum(f["out_of_sample_metrics"]["nr_trades"] for f in folds)
+
+    return {
+        "nr_folds": len(folds),
+        "profitable_folds": sum(1 for f in folds if f["out_of_sample_metrics"]["total_profit"] > 0),
+        "out_of_sample_total_profit": round(out_of_sample_profit, 2),
+        "out_of_sample_nr_trades": nr_trades,
+        "out_of_sample_drawdown_max": max((f["out_of_sample_metrics"]["drawdown_max"] for f in folds), default=0),
+        # share of the in-sample profit that survived out of sample
+        "walk_forward_efficiency": round(out_of_sample_profit / in_sample_profit, 4) if in_sample_profit > 0 else None,
+    }
+
+
+# Process pool: each worker receives the full candle series and parameter sets once, tasks are folds
+_worker_state: Dict = {}
+
+
+def _init_worker(strategy_type: StrategyType, candles: CandleSeries, symbol: str, time_frame: str,
+                 combinations: List[Dict], settings: Dict, rank_by: str):
+    _worker_state.update(
+        strategy_type=strategy_type, candles=candles, symbol=symbol, time_frame=time_frame,
+        combinations=combinations, settings=settings, rank_by=rank_by
+    )
+
+
+def _run_fold_in_worker(fold: Dict) -> Dict:
+    return run_fold(
+        _worker_state["strategy_type"], _worker_state["candles"], _worker_state["symbol"],
+        _worker_state["time_frame"], fold, _worker_state["combinations"], _worker_state["settings"],
+        _worker_state["rank_by"]
+    )
+
+
+def run_walk_forward(strategy_type: StrategyType, candles: CandleSeries, symbol: str, time_frame: str,
+                     folds: List[Dict], combinations: List[Dict], settings: Dict, rank_by: str,
+                     max_workers: Optional[int] = None,
+                     on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    workers = default_worker_count(len(folds), max_workers)
+
+    if workers == 1:
+        return collect_results(
+            (run_fold(strategy_type, candles, symbol, time_frame, fold, combinations, settings, rank_by)
+             for fold in folds),
+            on_result
+        )
+
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(strategy_type, candles, symbol, time_frame, combinations, settings, rank_by)
+    ) as pool:
+        return collect_results(pool.map(_run_fold_in_worker, folds), on_result, pool)
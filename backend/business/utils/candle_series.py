@@ -0,0 +1,140 @@
+from typing import List, Dict, Union, Optional
+import numpy as np
+import pandas as pd
+
+
+class CandleSeries:
+    PRICE_FIELDS = ("open", "high", "low", "close")
+
+    def __init__(self,
+                 time: np.ndarray,
+                 open: np.ndarray,
+                 high: np.ndarray,
+                 low: np.ndarray,
+                 close: np.ndarray,
+                 volume: Optional[np.ndarray] = None
+                 ):
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = (
+            np.ascontiguousarray(volume, dtype=np.float64) if volume is not None
+            else np.zeros(len(self.time), dtype=np.float64)
+        )
+
+        size = len(self.time)
+        for name in ("open", "high", "low", "close", "volume"):
+            if len(getattr(self, name)) != size:
+                raise ValueError(f"Column '{name}' has {len(getattr(self, name))} values, expected {size}.")
+
+    # Constructors
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        return cls(*(np.empty(0) for _ in range(5)))
+
+    @classmethod
+    def of(cls, candles: Union["CandleSeries", List[Dict], None]) -> "CandleSeries":
+        if isinstance(candles, CandleSeries):
+            return candles
+        if not candles:
+            return cls.empty()
+        return cls.from_dicts(candles)
+
+    @classmethod
+    def from_dicts(cls, candles: List[Dict]) -> "CandleSeries":
+        for col in ("time",) + cls.PRICE_FIELDS:
+            if col not in candles[0]:
+                raise ValueError(f"Missing column: {col}")
+
+        return cls(
+            time=[c["time"] for c in candles],
+            open=[c["open"] for c in candles],
+            high=[c["high"] for c in candles],
+            low=[c["low"] for c in candles],
+            close=[c["close"] for c in candles],
+            volume=[c.get("volume", 0.0) for c in candles],
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "CandleSeries":
+        if df is None or df.empty:
+            return cls.empty()
+
+        def column(name: str) -> np.ndarray:
+            values = df[name]
+            # yfinance returns one sub-column per ticker
+            if isinstance(values, pd.DataFrame):
+                values = values.iloc[:, 0]
+            return values.to_numpy(dtype=np.float64)
+
+        prices = {name: column(name) for name in cls.PRICE_FIELDS}
+        volume = column("volume") if "volume" in df.columns else None
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        time = index.to_numpy().astype("datetime64[s]").astype(np.int64)
+
+        valid = np.ones(len(time), dtype=bool)
+        for values in prices.values():
+            valid &= ~np.isnan(values)
+
+        if not valid.all():
+            time = time[valid]
+            prices = {name: values[valid] for name, values in prices.items()}
+            volume = volume[valid] if volume is not None else None
+
+        return cls(time=time, volume=volume, **prices)
+
+    # Adapters
+    def to_dicts(self) -> List[Dict]:
+        return [
+            {"time": t, "open": o, "high": h, "low": l, "close": c}
+            for t, o, h, l, c in zip(
+                self.time.tolist(), self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist()
+            )
+        ]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "open": self.open,
+                "high": self.high,
+                "low": self.low,
+                "close": self.close,
+                "volume": self.volume,
+            },
+            index=pd.to_datetime(self.time, unit="s"),
+        )
+
+    # Access
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CandleSeries(
+                self.time[key], self.open[key], self.high[key],
+                self.low[key], self.close[key], self.volume[key]
+            )
+
+        return {
+            "time": int(self.time[key]),
+            "open": float(self.open[key]),
+            "high": float(self.high[key]),
+            "low": float(self.low[key]),
+            "close": float(self.close[key]),
+            "volume": float(self.volume[key]),
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def between(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> "CandleSeries":
+        left = 0 if start_ts is None else int(np.searchsorted(self.time, start_ts, side="left"))
+        right = len(self) if end_ts is None else int(np.searchsorted(self.time, end_ts, side="right"))
+        return self[left:right]
@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+from business.utils.candle_series import CandleSeries
+from business.utils.backtest.result_cache import TIMEFRAME_SECONDS
+
+
+# (symbol, interval, start_ts, end_ts) -> the provider's candles with start_ts <= time < end_ts
+CandleFetcher = Callable[[str, str, int, int], CandleSeries]
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+LOAD_ATTEMPTS = 3
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(coverage: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    # the parts of [start, end) outside the merged coverage
+    gaps, position = [], start
+    for covered_start, covered_end in coverage:
+        if covered_end <= position:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > position:
+            gaps.append((position, covered_start))
+        position = max(position, covered_end)
+    if position < end:
+        gaps.append((position, end))
+    return gaps
+
+
+def concat_series(parts: List[CandleSeries]) -> CandleSeries:
+    parts = [part for part in parts if len(part)]
+    if len(parts) == 1:
+        return parts[0]
+    if not parts:
+        return CandleSeries.empty()
+    return CandleSeries(*(np.concatenate([getattr(part, name) for part in parts]) for name in COLUMNS))
+
+
+class CandleStore:
+    # Candles on disk per (provider, symbol, interval). A key's directory holds index.json, the ranges
+    # [start, end) in epoch seconds already fetched, and a generation directory with one .npy file per
+    # column, memory-mapped on read. A request only fetches the parts of its range that are not covered,
+    # merges them into a new generation and switches index.json to it. Candles from the current period
+    # on are still changing: they are fetched every time and never stored. Without a root_dir every
+    # request goes to the provider.
+    def __init__(self, root_dir: Optional[str] = None):
+        self.root_dir = root_dir
+        self._locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._stats = {"hits": 0, "partial_hits": 0, "misses": 0, "fetched_ranges": 0, "fetched_candles": 0}
+
+        if root_dir:
+            os.makedirs(root_dir, exist_ok=True)
+
+    def get_candles(self, provider: str, symbol: str, interval: str, start_ts: int, end_ts: int,
+                    fetch: CandleFetcher) -> CandleSeries:
+        step = TIMEFRAME_SECONDS.get(interval)
+        if not self.root_dir or step is None:
+            return fetch(symbol, interval, start_ts, end_ts)
+
+        # open time of the candle still being formed
+        settled_ts = int(time.time()) // step * step
+        key = (provider, symbol, interval)
+        with self._key_lock(key):
+            coverage, stored = self._load(key)
+            gaps = missing_ranges(coverage, start_ts, end_ts)
+            fetched = [fetch(symbol, interval, gap_start, gap_end) for gap_start, gap_end in gaps]
+            self._count(gaps, fetched, (start_ts, end_ts))
+
+            # an empty answer is not remembered, Yahoo also answers that way when a download fails
+            new_coverage = [(gap_start, min(gap_end, settled_ts))
+                            for (gap_start, gap_end), candles in zip(gaps, fetched)
+                            if gap_start < settled_ts and len(candles)]
+            if new_coverage:
+                settled = concat_series([candles.between(None, settled_ts - 1) for candles in fetched])
+                stored = self._save(key, merge_ranges(coverage + new_coverage), stored, settled)
+
+        fresh = concat_series([candles.between(settled_ts, end_ts - 1) for candles in fetched])
+        return concat_series([stored.between(start_ts, min(end_ts, settled_ts) - 1), fresh])
+
+    def get_coverage(self, provider: str, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        return self._load((provider, symbol, interval))[0] if self.root_dir else []
+
+    def get_stats(self) -> Dict:
+        with self._locks_lock:
+            requests = self._stats["hits"] + self._stats["partial_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / requests, 4) if requests else None,
+                "enabled": bool(self.root_dir),
+            }
+
+    def _count(self, gaps: List[Tuple[int, int]], fetched: List[CandleSeries], requested: Tuple[int, int]):
+        with self._locks_lock:
+            if not gaps:
+                self._stats["hits"] += 1
+            elif gaps == [requested]:
+                self._stats["misses"] += 1
+            else:
+                self._stats["partial_hits"] += 1
+            self._stats["fetched_ranges"] += len(gaps)
+            self._stats["fetched_candles"] += sum(len(candles) for candles in fetched)
+
+    def _key_lock(self, key: Tuple[str, str, str]) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _key_dir(self, key: Tuple[str, str, str]) -> str:
+        # symbols like ^GDAXI or EURUSD=X are kept, path separators are not
+        return os.path.join(self.root_dir, *(part.replace(os.sep, "_").replace("/", "_") for part in key))
+
+    def _load(self, key: Tuple[str, str, str]) -> Tuple[List[Tuple[int, int]], CandleSeries]:
+        key_dir = self._key_dir(key)
+        # a save can switch index.json between reading it and opening the generation, the index is then read again
+        for _ in range(LOAD_ATTEMPTS):
+            try:
+                with open(os.path.join(key_dir, "index.json")) as f:
+                    index = json.load(f)
+                generation_dir = os.path.join(key_dir, index["generation"])
+            except FileNotFoundError:
+                return [], CandleSeries.empty()
+            except (OSError, ValueError, KeyError) as e:
+                # a broken entry is refetched
+                print("ERROR reading candle store entry:", key_dir, str(e))
+                return [], CandleSeries.empty()
+
+            try:
+                columns = [np.load(os.path.join(generation_dir, f"{name}.npy"), mmap_mode="r") for name in COLUMNS]
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                print("ERROR reading candle store entry:", generation_dir, str(e))
+                return [], CandleSeries.empty()
+
+            return [tuple(covered) for covered in index["coverage"]], CandleSeries(*columns)
+
+        print("ERROR reading candle store entry:", key_dir, "generation changed while reading")
+        return [], CandleSeries.empty()
+
+    def _save(self, key: Tuple[str, str, str], coverage: List[Tuple[int, int]], stored: CandleSeries,
+              fetched: CandleSeries) -> CandleSeries:
+        # fetched candles replace stored ones with the same time
+        merged = concat_series([fetched, stored])
+        _, first = np.unique(merged.time, return_index=True)
+        merged = CandleSeries(*(getattr(merged, name)[first] for name in COLUMNS))
+
+        key_dir = self._key_dir(key)
+        index_path = os.path.join(key_dir, "index.json")
+        previous, retired = None, None
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            previous, retired = index.get("generation"), index.get("retired")
+        except (OSError, ValueError):
+            pass
+
+        # A new directory per write. The generation it replaces stays until the next write, for readers that
+        # read the old index.json but did not open its files yet. Only the one retired by the last write is removed.
+        generation = f"g{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+        generation_dir = os.path.join(key_dir, generation)
+        try:
+            os.makedirs(generation_dir)
+            for name in COLUMNS:
+                np.save(os.path.join(generation_dir, f"{name}.npy"), getattr(merged, name))
+            tmp_path = f"{index_path}.{generation}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"generation": generation, "retired": previous, "coverage": coverage,
+                           "candles": len(merged)}, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print("ERROR writing candle store entry:", key_dir, str(e))
+            shutil.rmtree(generation_dir, ignore_errors=True)
+            return merged
+
+        if retired and retired != previous:
+            shutil.rmtree(os.path.join(key_dir, retired), ignore_errors=True)
+        return merged
+
+
+candle_store = CandleStore(root_dir=os.getenv("CANDLE_STORE_DIR") or None)
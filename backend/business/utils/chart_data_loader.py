@@ -1,33 +1,43 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-def extract_price(value):
-    try:
-        return float(value.iloc[0]) if isinstance(value, pd.Series) else float(value)
-    except Exception:
-        return None
+from business.utils.candle_series import CandleSeries
+from business.utils.candle_store import CandleStore, candle_store
+
+BINANCE_API_URL = os.getenv("BINANCE_API_URL", "https://api.binance.com")
+# pages of one request fetched at the same time
+BINANCE_MAX_CONCURRENCY = int(os.getenv("BINANCE_MAX_CONCURRENCY", 4))
+# below Binance's 6000 per IP, other clients may share it
+BINANCE_WEIGHT_PER_MINUTE = int(os.getenv("BINANCE_WEIGHT_PER_MINUTE", 4800))
 
 class YahooFinanceLoader:
+    INTERVAL_MAPPING = {
+        "1m": "1m",
+        "5m": "5m",
+        "15m": "15m",
+        "30m": "30m",
+        "60m": "60m",
+        "daily": "1d"
+    }
+
     def get_historical_data(self, symbol: str,
                             interval: str = "1m",
                             start: str = None,
-                            end: str = None) -> tuple[pd.DataFrame, list[dict]]:
-
-        interval_mapping = {
-            "1m": "1m",
-            "5m": "5m",
-            "15m": "15m",
-            "30m": "30m",
-            "60m": "60m",
-            "daily": "1d"
-        }
+                            end: str = None) -> tuple[pd.DataFrame, CandleSeries]:
 
-        if interval not in interval_mapping:
+        if interval not in self.INTERVAL_MAPPING:
             raise ValueError(f"Unsupported interval '{interval}' for Yahoo Finance.")
 
-        yf_interval = interval_mapping[interval]
+        yf_interval = self.INTERVAL_MAPPING[interval]
 
         if not start or not end:
             end_date = datetime.today().strftime('%Y-%m-%d')
@@ -52,92 +62,230 @@ class YahooFinanceLoader:
         df.index = pd.to_datetime(df.index)
         df = df.sort_index()
 
-        candles = []
-        for ts, row in df.iterrows():
-            open_price = extract_price(row["open"])
-            high_price = extract_price(row["high"])
-            low_price = extract_price(row["low"])
-            close_price = extract_price(row["close"])
+        return df, CandleSeries.from_dataframe(df)
 
-            if None in (open_price, high_price, low_price, close_price):
-                continue
+    @staticmethod
+    def to_dataframe(candles: CandleSeries) -> pd.DataFrame:
+        return candles.to_dataframe()
 
-            candles.append({
-                "time": int(ts.timestamp()),
-                "open": open_price,
-                "high": high_price,
-                "low": low_price,
-                "close": close_price
-            })
+    def fetch_candles(self, symbol: str, interval: str, start_ts: int, end_ts: int) -> CandleSeries:
+        # Candles with start_ts <= time < end_ts (UTC), none when the range has no data. Yahoo reads the
+        # dates in the exchange's timezone, so a day is added on both sides and the result is cut to the range.
+        if interval not in self.INTERVAL_MAPPING:
+            raise ValueError(f"Unsupported interval '{interval}' for Yahoo Finance.")
+
+        start_date = (datetime.fromtimestamp(start_ts, timezone.utc) - timedelta(days=1)).strftime('%Y-%m-%d')
+        end_date = (datetime.fromtimestamp(end_ts, timezone.utc) + timedelta(days=1)).strftime('%Y-%m-%d')
+        df = yf.download(symbol, start=start_date, end=end_date, interval=self.INTERVAL_MAPPING[interval],
+                         auto_adjust=False, progress=False)
+        if df is None or df.empty:
+            return CandleSeries.empty()
 
-        return df, candles
+        df = df.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"})
+        df = df.sort_index()
+        return CandleSeries.from_dataframe(df).between(start_ts, end_ts - 1)
+
+
+class BinanceWeightLimiter:
+    # Request weight spent in the last minute, shared by every BinanceLoader of the process. A request waits
+    # until its weight fits the budget, the weight Binance reports as used counts when it is higher.
+    WINDOW_SECONDS = 60
+
+    def __init__(self, weight_per_minute: int):
+        self.weight_per_minute = weight_per_minute
+        self._spent = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._spent and self._spent[0][0] <= now - self.WINDOW_SECONDS:
+                    self._spent.popleft()
+                if not self._spent or sum(w for _, w in self._spent) + weight <= self.weight_per_minute:
+                    self._spent.append((now, weight))
+                    return
+                wait = self._spent[0][0] + self.WINDOW_SECONDS - now
+            time.sleep(max(wait, 0.01))
+
+    def observe(self, used_weight: int):
+        with self._lock:
+            spent = sum(w for _, w in self._spent)
+            if used_weight > spent:
+                self._spent.append((time.monotonic(), used_weight - spent))
 
 
 class BinanceLoader:
-    BASE_URL = "https://api.binance.com/api/v3/klines"
+    KLINES_PATH = "/api/v3/klines"
+    # Binance's name and length in seconds of the intervals, under the names the app uses too
+    INTERVALS = {
+        "1m": ("1m", 60),
+        "3m": ("3m", 180),
+        "5m": ("5m", 300),
+        "15m": ("15m", 900),
+        "30m": ("30m", 1800),
+        "60m": ("1h", 3600),
+        "1h": ("1h", 3600),
+        "2h": ("2h", 7200),
+        "4h": ("4h", 14400),
+        "6h": ("6h", 21600),
+        "8h": ("8h", 28800),
+        "12h": ("12h", 43200),
+        "daily": ("1d", 86400),
+        "1d": ("1d", 86400),
+        "3d": ("3d", 259200),
+        "1w": ("1w", 604800),
+    }
+    PAGE_LIMIT = 1000
+    # request weight of a klines page, the weight Binance reports keeps the limiter honest if that changes
+    KLINES_WEIGHT = 2
+    MAX_RETRIES = 3
 
-    def get_historical_data(self, symbol: str, interval: str = "1m", start: str = None, end: str = None,
-                            limit: int = 1000) -> tuple[pd.DataFrame, list[dict]]:
+    _session = None
+    _session_lock = threading.Lock()
+    weight_limiter = BinanceWeightLimiter(BINANCE_WEIGHT_PER_MINUTE)
+
+    def __init__(self, base_url: str = None, max_concurrency: int = None):
+        self.base_url = (base_url or BINANCE_API_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or BINANCE_MAX_CONCURRENCY
 
+    @classmethod
+    def session(cls) -> requests.Session:
+        # one pooled session for the process, so pages reuse kept-alive connections
+        with cls._session_lock:
+            if cls._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(BINANCE_MAX_CONCURRENCY, 10))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._session = session
+            return cls._session
+
+    def get_historical_data(self, symbol: str, interval: str = "1m", start: str = None, end: str = None,
+                            limit: int = 1000) -> tuple[pd.DataFrame, CandleSeries]:
+        # start and end are UTC dates, end is exclusive like in the candle store
         if not start or not end:
-            end_dt = datetime.utcnow()
+            end_dt = datetime.now(timezone.utc)
             start_dt = end_dt - timedelta(days=1)
         else:
-            start_dt = datetime.strptime(start, "%Y-%m-%d")
-            end_dt = datetime.strptime(end, "%Y-%m-%d")
+            start_dt = datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            end_dt = datetime.strptime(end, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+        candles = self._fetch(symbol, interval, int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000) - 1,
+                              limit)
+        return self.to_dataframe(candles), candles
+
+    @staticmethod
+    def to_dataframe(candles: CandleSeries) -> pd.DataFrame:
+        return candles.to_dataframe().rename_axis("open_time")
+
+    def fetch_candles(self, symbol: str, interval: str, start_ts: int, end_ts: int) -> CandleSeries:
+        # candles with start_ts <= time < end_ts, Binance's endTime is inclusive
+        return self._fetch(symbol, interval, start_ts * 1000, end_ts * 1000 - 1)
+
+    def _fetch(self, symbol: str, interval: str, start_ms: int, end_ms: int, limit: int = 1000) -> CandleSeries:
+        # Candles opened from start_ms to end_ms, both inclusive. The range is cut into windows of limit
+        # candles up front, the windows are fetched concurrently and parsed into one preallocated buffer.
+        if interval not in self.INTERVALS:
+            raise ValueError(f"Unsupported interval '{interval}' for Binance.")
+        binance_interval, step = self.INTERVALS[interval]
+        limit = min(limit, self.PAGE_LIMIT)
+
+        window_ms = step * 1000 * limit
+        windows = [(window_start, min(window_start + window_ms, end_ms + 1) - 1)
+                   for window_start in range(start_ms, end_ms + 1, window_ms)]
+        if not windows:
+            return CandleSeries.empty()
+
+        # time, open, high, low, close, volume per candle, a window holds at most limit candles
+        buffer = np.empty((len(windows) * limit, 6), dtype=np.float64)
+        counts = [0] * len(windows)
+
+        def fetch_window(nr: int):
+            window_start, window_end = windows[nr]
+            rows = self._get_klines(symbol, binance_interval, window_start, window_end, limit)
+            if rows:
+                buffer[nr * limit:nr * limit + len(rows)] = [row[:6] for row in rows]
+            counts[nr] = len(rows)
+
+        if len(windows) == 1:
+            fetch_window(0)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(windows))) as pool:
+                # list() surfaces the first error
+                list(pool.map(fetch_window, range(len(windows))))
+
+        kept = np.concatenate([np.arange(nr * limit, nr * limit + count) for nr, count in enumerate(counts)])
+        candles = buffer[kept]
+        return CandleSeries(
+            time=candles[:, 0].astype(np.int64) // 1000,
+            open=candles[:, 1],
+            high=candles[:, 2],
+            low=candles[:, 3],
+            close=candles[:, 4],
+            volume=candles[:, 5],
+        )
+
+    def _get_klines(self, symbol: str, binance_interval: str, start_ms: int, end_ms: int, limit: int) -> list:
+        params = {
+            "symbol": symbol.upper(),
+            "interval": binance_interval,
+            "startTime": start_ms,
+            "endTime": end_ms,
+            "limit": limit
+        }
 
-        start_ts = int(start_dt.timestamp() * 1000)
-        end_ts = int(end_dt.timestamp() * 1000)
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.weight_limiter.acquire(self.KLINES_WEIGHT)
+            response = self.session().get(self.base_url + self.KLINES_PATH, params=params, timeout=30)
 
-        df_all = pd.DataFrame()
+            used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used_weight and used_weight.isdigit():
+                self.weight_limiter.observe(int(used_weight))
 
-        while start_ts < end_ts:
-            params = {
-                "symbol": symbol.upper(),
-                "interval": interval,
-                "startTime": start_ts,
-                "endTime": end_ts,
-                "limit": limit
-            }
+            # 429 asks to back off, 418 is the ban that follows when that is ignored
+            if response.status_code in (429, 500, 502, 503, 504) and attempt < self.MAX_RETRIES:
+                retry_after = response.headers.get("Retry-After", "")
+                time.sleep(int(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                continue
 
-            response = requests.get(self.BASE_URL, params=params)
             if response.status_code != 200:
-                msg = response.json().get("msg", "")
+                try:
+                    msg = response.json().get("msg", "")
+                except ValueError:
+                    msg = response.text[:200]
                 raise Exception(f"Binance API error: {response.status_code} - {msg}")
 
-            data = response.json()
-            if not data:
-                break
-
-            df = pd.DataFrame(data, columns=[
-                "open_time", "open", "high", "low", "close", "volume",
-                "close_time", "quote_asset_volume", "number_of_trades",
-                "taker_buy_base_volume", "taker_buy_quote_volume", "ignore"
-            ])
+            return response.json()
 
-            df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-            df = df.set_index("open_time")
-            df = df[["open", "high", "low", "close", "volume"]].astype(float)
 
-            df_all = pd.concat([df_all, df])
+class StoredCandleLoader:
+    # A provider loader behind the local candle store: a dated request only downloads the parts of its
+    # range the store does not hold yet. start and end are UTC dates, end is exclusive.
+    def __init__(self, loader, provider: str, store: CandleStore):
+        self.loader = loader
+        self.provider = provider
+        self.store = store
 
-            last_time = data[-1][0]
-            start_ts = last_time + 1
+    def get_historical_data(self, symbol: str, interval: str = "1m", start: str = None,
+                            end: str = None) -> tuple[pd.DataFrame, CandleSeries]:
+        # the default ranges end now, there is nothing settled to reuse
+        if not start or not end or not self.store.root_dir:
+            return self.loader.get_historical_data(symbol=symbol, interval=interval, start=start, end=end)
 
-        df_all = df_all.sort_index()
+        start_ts = self._date_ts(start)
+        end_ts = self._date_ts(end)
+        candles = self.store.get_candles(self.provider, symbol, interval, start_ts, end_ts,
+                                         self.loader.fetch_candles)
+        if not len(candles):
+            raise ValueError(f"No data returned by {self.provider} for symbol: {symbol} and interval: {interval}")
 
-        candles = [
-            {
-                "time": int(ts.timestamp()),
-                "open": extract_price(row["open"]),
-                "high": extract_price(row["high"]),
-                "low": extract_price(row["low"]),
-                "close": extract_price(row["close"]),
-            }
-            for ts, row in df_all.iterrows()
-        ]
+        # framed like the loader frames its own downloads
+        return self.loader.to_dataframe(candles), candles
 
-        return df_all, candles
+    @staticmethod
+    def _date_ts(value: str) -> int:
+        return int(datetime.strptime(value[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
 
 
 class UniversalDataLoader:
@@ -162,6 +310,6 @@ class UniversalDataLoader:
         mapped_symbol = cls.SYMBOL_MAPPING.get(symbol_upper, symbol_upper)
 
         if symbol_upper in ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"]:
-            return BinanceLoader(), mapped_symbol
+            return StoredCandleLoader(BinanceLoader(), "binance", candle_store), mapped_symbol
         else:
-            return YahooFinanceLoader(), mapped_symbol
+            return StoredCandleLoader(YahooFinanceLoader(), "yahoo", candle_store), mapped_symbol
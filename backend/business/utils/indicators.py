@@ -0,0 +1,187 @@
+from typing import Callable, Tuple
+import numpy as np
+
+# Differences within this fraction of the price level count as equal in crossovers(). Rolling sums carry
+# ~window * 1e-16 relative rounding error, two prices a tick apart differ by far more than 1e-10.
+CROSS_RTOL = 1e-10
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _first_valid(values: np.ndarray) -> int:
+    valid = np.flatnonzero(~np.isnan(values))
+    return int(valid[0]) if len(valid) else len(values)
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    # Block prefix/suffix sums: every window spans at most two blocks of `window` values,
+    # so the cost is O(N) and the rounding error stays bounded by the window, not the series length.
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window <= 0 or n < window:
+        return out
+
+    pad = (-n) % window
+    blocks = np.concatenate([values, np.zeros(pad)]).reshape(-1, window)
+    prefix = np.cumsum(blocks, axis=1).ravel()
+    suffix = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    end = np.arange(window - 1, n)
+    start = end - window + 1
+    out[window - 1:] = np.where(start % window == 0, prefix[end], suffix[start] + prefix[end])
+    return out
+
+
+def rolling_sum(values, window: int) -> np.ndarray:
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    out[first:] = _rolling_sum(values[first:], window)
+    return out
+
+
+def sma(values, period: int) -> np.ndarray:
+    # out[i] = mean(values[i - period + 1 : i + 1]), NaN until the window is full
+    return rolling_sum(values, period) / period
+
+
+def rolling_std(values, period: int) -> np.ndarray:
+    # population standard deviation over the same window as sma()
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    tail = values[first:]
+    if not len(tail):
+        return out
+
+    centered = tail - tail.mean()
+    mean = _rolling_sum(centered, period) / period
+    mean_sq = _rolling_sum(centered * centered, period) / period
+    out[first:] = np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+    return out
+
+
+def _rolling_extreme(values, window: int, op: np.ufunc) -> np.ndarray:
+    # van Herk/Gil-Werman: block prefix/suffix extremes give every window in O(1) amortized,
+    # whatever the window size. Early bars use the partial window, NaNs are skipped.
+    values = _as_array(values)
+    n = len(values)
+    if n == 0:
+        return values.copy()
+
+    window = max(1, min(int(window), n))
+    out = np.empty(n)
+    out[:window - 1] = op.accumulate(values[:window - 1])
+
+    pad = (-n) % window
+    blocks = np.concatenate([values, np.full(pad, np.nan)]).reshape(-1, window)
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    end = np.arange(window - 1, n)
+    out[window - 1:] = op(suffix[end - window + 1], prefix[end])
+    return out
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    # out[i] = max(values[max(0, i - window + 1) : i + 1])
+    return _rolling_extreme(values, window, np.fmax)
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    # out[i] = min(values[max(0, i - window + 1) : i + 1])
+    return _rolling_extreme(values, window, np.fmin)
+
+
+def ema(values, period: int) -> np.ndarray:
+    # seeded with the SMA of the first `period` values, then the usual recursive update
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    if period <= 0 or len(values) - first < period:
+        return out
+
+    closes = values[first:].tolist()
+    multiplier = 2 / (period + 1)
+
+    prev = sum(closes[:period]) / period
+    result = [prev]
+    for price in closes[period:]:
+        prev = (price - prev) * multiplier + prev
+        result.append(prev)
+
+    out[first + period - 1:] = result
+    return out
+
+
+def wilder_smoothing(values, period: int) -> np.ndarray:
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    if period <= 0 or len(values) - first < period:
+        return out
+
+    data = values[first:].tolist()
+    prev = sum(data[:period]) / period
+    result = [prev]
+    for value in data[period:]:
+        prev = (prev * (period - 1) + value) / period
+        result.append(prev)
+
+    out[first + period - 1:] = result
+    return out
+
+
+def rsi(values, period: int = 14, wilder: bool = True) -> np.ndarray:
+    # out[i] uses the `period` price changes ending at bar i; wilder=False averages them with a plain SMA
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    if len(values) <= period:
+        return out
+
+    delta = np.diff(values)
+    gains = np.maximum(delta, 0.0)
+    losses = np.maximum(-delta, 0.0)
+
+    average = wilder_smoothing if wilder else sma
+    avg_gain = average(gains, period)
+    avg_loss = average(losses, period)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        result = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+
+    out[1:] = np.where(np.isnan(avg_gain), np.nan, result)
+    return out
+
+
+def macd(values, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9,
+         average: Callable[[np.ndarray, int], np.ndarray] = ema) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    fast = average(values, fast_period)
+    slow = average(values, slow_period)
+    macd_line = fast - slow
+    signal_line = average(macd_line, signal_period)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def shift(values, periods: int = 1) -> np.ndarray:
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    if periods >= 0:
+        out[periods:] = values[:len(values) - periods]
+    else:
+        out[:periods] = values[-periods:]
+    return out
+
+
+def crossovers(fast, slow, scale, rtol: float = CROSS_RTOL) -> Tuple[np.ndarray, np.ndarray]:
+    # (up, down) masks of the bars where `fast` moves from below `slow` to above it and back. Differences
+    # within rtol * |scale| are ties, so lines that are mathematically equal never cross on rounding noise.
+    diff = _as_array(fast) - _as_array(slow)
+    tolerance = rtol * np.abs(_as_array(scale))
+    with np.errstate(invalid="ignore"):
+        side = np.where(np.isnan(diff), np.nan, np.sign(diff) * (np.abs(diff) > tolerance))
+        prev_side = shift(side)
+        return (prev_side < 0) & (side > 0), (prev_side > 0) & (side < 0)
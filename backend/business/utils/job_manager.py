@@ -0,0 +1,179 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobLimitError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, user_id: int, kind: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.kind = kind
+
+        self.status = JobStatus.QUEUED
+        self.progress = 0.0
+        self.stage = None
+        self.partial = None
+        self.result = None
+        self.error = None
+
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in JobStatus.FINISHED
+
+    def finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = datetime.utcnow()
+        if status == JobStatus.COMPLETED:
+            self.progress = 1.0
+
+    def to_status(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "user_id": self.user_id,
+            "kind": self.kind,
+            "status": self.status,
+            "cancel_requested": self.cancel_event.is_set(),
+            "progress": round(self.progress, 4),
+            "stage": self.stage,
+            "partial": self.partial,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobContext:
+    # Handed to the work function: reports progress and is the cooperative cancellation checkpoint
+    def __init__(self, job: Optional[Job] = None):
+        self.job = job
+
+    @property
+    def cancelled(self) -> bool:
+        return self.job is not None and self.job.cancel_event.is_set()
+
+    def report(self, progress: Optional[float] = None, stage: Optional[str] = None, partial: Any = None):
+        if self.job is None:
+            return
+        if self.cancelled:
+            raise JobCancelled()
+
+        if progress is not None:
+            self.job.progress = min(max(progress, 0.0), 1.0)
+        if stage is not None:
+            self.job.stage = stage
+        if partial is not None:
+            self.job.partial = partial
+
+
+# used when the work runs synchronously, outside of a job
+NO_PROGRESS = JobContext()
+
+
+class JobManager:
+    def __init__(self, max_workers: int, max_jobs_per_user: int, retention_seconds: int):
+        self.max_jobs_per_user = max_jobs_per_user
+        self.retention_seconds = retention_seconds
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backtest-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_id: int, kind: str, work: Callable[[JobContext], Any]) -> Job:
+        with self._lock:
+            self._purge_finished()
+
+            # queued jobs count too, so a user can't fill the queue ahead of everyone else
+            active = sum(1 for j in self._jobs.values() if j.user_id == user_id and not j.is_finished)
+            if active >= self.max_jobs_per_user:
+                raise JobLimitError(f"User {user_id} already has {active} active jobs (limit {self.max_jobs_per_user}).")
+
+            job = Job(user_id, kind)
+            self._jobs[job.id] = job
+
+        job.future = self._pool.submit(self._run, job, work)
+        return job
+
+    def _run(self, job: Job, work: Callable[[JobContext], Any]):
+        if job.cancel_event.is_set():
+            job.finish(JobStatus.CANCELLED)
+            return
+
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            result = work(JobContext(job))
+            job.finish(JobStatus.COMPLETED, result=result)
+        except JobCancelled:
+            job.finish(JobStatus.CANCELLED)
+        except Exception as e:
+            print("ERROR in job", job.id, str(e))
+            job.finish(JobStatus.FAILED, error=str(e))
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def get_jobs_by_user(self, user_id: int) -> List[Job]:
+        with self._lock:
+            self._purge_finished()
+            return sorted(
+                (j for j in self._jobs.values() if j.user_id == user_id),
+                key=lambda j: j.created_at, reverse=True
+            )
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        job.cancel_event.set()
+        # still queued: drop it now, a running job stops at its next checkpoint
+        if job.future is not None and job.future.cancel():
+            job.finish(JobStatus.CANCELLED)
+        return job
+
+    def _purge_finished(self):
+        now = datetime.utcnow()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and (now - job.finished_at).total_seconds() > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager(
+    max_workers=int(os.getenv("JOB_MAX_WORKERS", 2)),
+    max_jobs_per_user=int(os.getenv("JOB_MAX_PER_USER", 2)),
+    retention_seconds=int(os.getenv("JOB_RETENTION_SECONDS", 3600))
+)
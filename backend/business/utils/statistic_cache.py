@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from cachetools import LRUCache
+
+
+def normalize_params(params: Optional[Dict[str, Any]]) -> str:
+    # key order does not change a statistic, list order does (it shows up in filters_applied)
+    return json.dumps(params or {}, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class StatisticResultCache:
+    # LRU cache of generated statistics keyed by (user_id, normalized params). Every user has a data version
+    # that is bumped when their trades change. An entry remembers the version it was computed under and is
+    # only served while that is still the user's version. Versions live in this process only.
+    def __init__(self, max_entries: int):
+        self._entries = LRUCache(maxsize=max_entries)
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "stores": 0, "invalidations": 0}
+
+    def get_version(self, user_id: int) -> int:
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def get(self, user_id: int, params_key: str) -> Optional[Dict]:
+        with self._lock:
+            key = (user_id, params_key)
+            entry: Optional[Tuple[int, Dict]] = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            version, result = entry
+            if version != self._versions.get(user_id, 0):
+                self._stats["stale"] += 1
+                del self._entries[key]
+                return None
+            self._stats["hits"] += 1
+            return result
+
+    def put(self, user_id: int, params_key: str, version: int, result: Dict):
+        # version is the one read before computing: if the trades changed meanwhile, the entry is never served
+        with self._lock:
+            if version != self._versions.get(user_id, 0):
+                return
+            self._entries[(user_id, params_key)] = (version, result)
+            self._stats["stores"] += 1
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["stale"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "max_entries": int(self._entries.maxsize),
+            }
+
+
+statistic_result_cache = StatisticResultCache(
+    max_entries=int(os.getenv("STATISTIC_CACHE_MAX_ENTRIES", 2000))
+)
@@ -1,5 +1,35 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+import numpy as np
+
+from business.utils.candle_series import CandleSeries
 
 class BaseStrategy:
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
         pass
+
+    @staticmethod
+    def signals_from_masks(candles: CandleSeries, buy: np.ndarray, sell: np.ndarray,
+                           alternate: bool = False) -> List[Dict]:
+        # buy/sell are boolean arrays over the candles (BUY wins if both are set);
+        # alternate=True drops repeated signals in the same direction, like an open long/short position does
+        buy = np.asarray(buy, dtype=bool)
+        sell = np.asarray(sell, dtype=bool) & ~buy
+
+        indices = np.flatnonzero(buy | sell)
+        is_buy = buy[indices]
+        if alternate and len(indices):
+            keep = np.concatenate(([True], is_buy[1:] != is_buy[:-1]))
+            indices, is_buy = indices[keep], is_buy[keep]
+
+        return [
+            {
+                "trade_id": n + 1,
+                "action": "BUY" if b else "SELL",
+                "timestamp": t,
+                "price": p,
+                "profit": 0
+            }
+            for n, (t, p, b) in enumerate(zip(
+                candles.time[indices].tolist(), candles.close[indices].tolist(), is_buy.tolist()
+            ))
+        ]
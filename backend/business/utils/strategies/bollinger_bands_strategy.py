@@ -1,37 +1,27 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+import numpy as np
+
+from business.utils import indicators
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 class BollingerBandsStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
         period = parameters.get("period", 20)
         deviation = parameters.get("deviation", 2)
 
-        closes = [c['close'] for c in candles]
-        trades = []
+        candles = CandleSeries.of(candles)
 
-        for i in range(period, len(candles)):
-            sma = sum(closes[i - period:i]) / period
-            std_dev = (sum([(x - sma) ** 2 for x in closes[i - period:i]]) / period) ** 0.5
+        # bands of the candles before bar i (bar i itself is excluded)
+        sma = indicators.shift(indicators.sma(candles.close, period))
+        std_dev = indicators.shift(indicators.rolling_std(candles.close, period))
 
-            upper_band = sma + deviation * std_dev
-            lower_band = sma - deviation * std_dev
-            price = candles[i]['close']
+        upper_band = sma + deviation * std_dev
+        lower_band = sma - deviation * std_dev
+        price = candles.close
 
-            if price < lower_band:
-                trades.append({
-                    "trade_id": len(trades) + 1,
-                    "action": "BUY",
-                    "timestamp": candles[i]['time'],
-                    "price": price,
-                    "profit": 0
-                })
-            elif price > upper_band:
-                trades.append({
-                    "trade_id": len(trades) + 1,
-                    "action": "SELL",
-                    "timestamp": candles[i]['time'],
-                    "price": price,
-                    "profit": 0
-                })
+        with np.errstate(invalid="ignore"):
+            buy = price < lower_band
+            sell = price > upper_band
 
-        return trades
\ No newline at end of file
+        return self.signals_from_masks(candles, buy, sell)
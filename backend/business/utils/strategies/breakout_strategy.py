@@ -1,32 +1,25 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+import numpy as np
+
+from business.utils import indicators
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 class BreakoutStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
         window = parameters.get("window", 20)
-        trades = []
-        for i in range(window, len(candles)):
-            highs = [c['high'] for c in candles[i - window:i]]
-            lows = [c['low'] for c in candles[i - window:i]]
-            high = max(highs)
-            low = min(lows)
-            price = candles[i]['close']
 
-            if price > high:
-                trades.append({
-                    "trade_id": len(trades) + 1,
-                    "action": "BUY",
-                    "timestamp": candles[i]['time'],
-                    "price": price,
-                    "profit": 0
-                })
-            elif price < low:
-                trades.append({
-                    "trade_id": len(trades) + 1,
-                    "action": "SELL",
-                    "timestamp": candles[i]['time'],
-                    "price": price,
-                    "profit": 0
-                })
+        candles = CandleSeries.of(candles)
+
+        # highest high / lowest low of the `window` candles before bar i
+        high = indicators.shift(indicators.rolling_max(candles.high, window))
+        low = indicators.shift(indicators.rolling_min(candles.low, window))
+        high[:window] = np.nan
+        low[:window] = np.nan
+        price = candles.close
+
+        with np.errstate(invalid="ignore"):
+            buy = price > high
+            sell = price < low
 
-        return trades
\ No newline at end of file
+        return self.signals_from_masks(candles, buy, sell)
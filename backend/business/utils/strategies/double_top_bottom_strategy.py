@@ -1,36 +1,43 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 
 class DoubleTopBottomStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
+        candles = CandleSeries.of(candles)
+        highs = candles.high.tolist()
+        lows = candles.low.tolist()
+        closes = candles.close.tolist()
+        times = candles.time.tolist()
+
         trades = []
-        for i in range(2, len(candles) - 2):
-            a = candles[i - 2]['high']
-            b = candles[i]['high']
-            c = candles[i + 2]['high']
+        for i in range(2, len(closes) - 2):
+            a = highs[i - 2]
+            b = highs[i]
+            c = highs[i + 2]
 
             # Double Top
             if abs(a - c) < (a * 0.005) and b < a:
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "SELL",
-                    "timestamp": candles[i + 2]['time'],
-                    "price": candles[i + 2]['close'],
+                    "timestamp": times[i + 2],
+                    "price": closes[i + 2],
                     "profit": 0
                 })
 
             # Double Bottom (inverse pe low)
-            a = candles[i - 2]['low']
-            b = candles[i]['low']
-            c = candles[i + 2]['low']
+            a = lows[i - 2]
+            b = lows[i]
+            c = lows[i + 2]
 
             if abs(a - c) < (a * 0.005) and b > a:
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "BUY",
-                    "timestamp": candles[i + 2]['time'],
-                    "price": candles[i + 2]['close'],
+                    "timestamp": times[i + 2],
+                    "price": closes[i + 2],
                     "profit": 0
                 })
-        return trades
\ No newline at end of file
+        return trades
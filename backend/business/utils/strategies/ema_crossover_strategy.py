@@ -1,67 +1,25 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+import numpy as np
+
+from business.utils import indicators
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 
 class EMACrossoverStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
         short_period = parameters.get("short_period", 5)
         long_period = parameters.get("long_period", 20)
 
-        short_ema = []
-        long_ema = []
-        trades = []
-        position = None
-
-        closes = [c["close"] for c in candles]
-
-        def calculate_ema(period: int) -> List[float]:
-            ema = [None] * len(closes)
-            multiplier = 2 / (period + 1)
-
-            for i in range(period - 1, len(closes)):
-                if i == period - 1:
-                    sma = sum(closes[:period]) / period
-                    ema[i] = sma
-                else:
-                    if ema[i - 1] is not None:
-                        ema[i] = (closes[i] - ema[i - 1]) * multiplier + ema[i - 1]
-            return ema
-
-        short_ema = calculate_ema(short_period)
-        long_ema = calculate_ema(long_period)
-
-        for i in range(1, len(candles)):
-            if (
-                short_ema[i - 1] is None or long_ema[i - 1] is None or
-                short_ema[i] is None or long_ema[i] is None
-            ):
-                continue
-
-            current_time = candles[i]["time"]
-            price = candles[i]["close"]
+        candles = CandleSeries.of(candles)
 
-            # BUY crossover
-            if short_ema[i - 1] < long_ema[i - 1] and short_ema[i] > long_ema[i]:
-                if position != "long":
-                    trades.append({
-                        "trade_id": len(trades) + 1,
-                        "action": "BUY",
-                        "timestamp": current_time,
-                        "price": price,
-                        "profit": 0
-                    })
-                    position = "long"
+        short_ema = indicators.ema(candles.close, short_period)
+        long_ema = indicators.ema(candles.close, long_period)
+        prev_short_ema = indicators.shift(short_ema)
+        prev_long_ema = indicators.shift(long_ema)
 
-            # SELL crossover
-            elif short_ema[i - 1] > long_ema[i - 1] and short_ema[i] < long_ema[i]:
-                if position != "short":
-                    trades.append({
-                        "trade_id": len(trades) + 1,
-                        "action": "SELL",
-                        "timestamp": current_time,
-                        "price": price,
-                        "profit": 0
-                    })
-                    position = "short"
+        with np.errstate(invalid="ignore"):
+            buy = (prev_short_ema < prev_long_ema) & (short_ema > long_ema)
+            sell = (prev_short_ema > prev_long_ema) & (short_ema < long_ema)
 
-        return trades
+        return self.signals_from_masks(candles, buy, sell, alternate=True)
@@ -1,29 +1,35 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 class EngulfingPatternStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
+        candles = CandleSeries.of(candles)
+        opens = candles.open.tolist()
+        closes = candles.close.tolist()
+        times = candles.time.tolist()
+
         trades = []
-        for i in range(1, len(candles)):
-            prev = candles[i - 1]
-            curr = candles[i]
+        for i in range(1, len(closes)):
+            prev_open, prev_close = opens[i - 1], closes[i - 1]
+            curr_open, curr_close = opens[i], closes[i]
 
             # Bullish Engulfing
-            if prev['close'] < prev['open'] and curr['close'] > curr['open'] and curr['close'] > prev['open'] and curr['open'] < prev['close']:
+            if prev_close < prev_open and curr_close > curr_open and curr_close > prev_open and curr_open < prev_close:
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "BUY",
-                    "timestamp": curr['time'],
-                    "price": curr['close'],
+                    "timestamp": times[i],
+                    "price": curr_close,
                     "profit": 0
                 })
             # Bearish Engulfing
-            elif prev['close'] > prev['open'] and curr['close'] < curr['open'] and curr['open'] > prev['close'] and curr['close'] < prev['open']:
+            elif prev_close > prev_open and curr_close < curr_open and curr_open > prev_close and curr_close < prev_open:
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "SELL",
-                    "timestamp": curr['time'],
-                    "price": curr['close'],
+                    "timestamp": times[i],
+                    "price": curr_close,
                     "profit": 0
                 })
 
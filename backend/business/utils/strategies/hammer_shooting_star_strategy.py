@@ -1,21 +1,25 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 class HammerShootingStarStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
+        candles = CandleSeries.of(candles)
+
         trades = []
-        for c in candles:
-            body = abs(c['close'] - c['open'])
-            upper_wick = c['high'] - max(c['close'], c['open'])
-            lower_wick = min(c['close'], c['open']) - c['low']
+        for t, o, h, l, c in zip(candles.time.tolist(), candles.open.tolist(), candles.high.tolist(),
+                                 candles.low.tolist(), candles.close.tolist()):
+            body = abs(c - o)
+            upper_wick = h - max(c, o)
+            lower_wick = min(c, o) - l
 
             # Hammer (potential BUY)
             if lower_wick > 2 * body and upper_wick < body:
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "BUY",
-                    "timestamp": c['time'],
-                    "price": c['close'],
+                    "timestamp": t,
+                    "price": c,
                     "profit": 0
                 })
             # Shooting Star (potential SELL)
@@ -23,8 +27,8 @@ class HammerShootingStarStrategy(BaseStrategy):
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "SELL",
-                    "timestamp": c['time'],
-                    "price": c['close'],
+                    "timestamp": t,
+                    "price": c,
                     "profit": 0
                 })
-        return trades
\ No newline at end of file
+        return trades
@@ -1,20 +1,26 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 class HeadAndShouldersStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
+        candles = CandleSeries.of(candles)
+        highs = candles.high.tolist()
+        closes = candles.close.tolist()
+        times = candles.time.tolist()
+
         trades = []
-        for i in range(2, len(candles) - 2):
-            l_shoulder = candles[i - 2]['high']
-            head = candles[i]['high']
-            r_shoulder = candles[i + 2]['high']
+        for i in range(2, len(closes) - 2):
+            l_shoulder = highs[i - 2]
+            head = highs[i]
+            r_shoulder = highs[i + 2]
 
             if l_shoulder < head and r_shoulder < head and abs(l_shoulder - r_shoulder) < (head * 0.01):
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": "SELL",
-                    "timestamp": candles[i + 2]['time'],
-                    "price": candles[i + 2]['close'],
+                    "timestamp": times[i + 2],
+                    "price": closes[i + 2],
                     "profit": 0
                 })
-        return trades
\ No newline at end of file
+        return trades
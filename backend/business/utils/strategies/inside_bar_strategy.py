@@ -1,22 +1,27 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 
 class InsideBarStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
-        trades = []
-        for i in range(1, len(candles)):
-            prev = candles[i - 1]
-            curr = candles[i]
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
+        candles = CandleSeries.of(candles)
+        opens = candles.open.tolist()
+        highs = candles.high.tolist()
+        lows = candles.low.tolist()
+        closes = candles.close.tolist()
+        times = candles.time.tolist()
 
-            if curr['high'] < prev['high'] and curr['low'] > prev['low']:
-                direction = "BUY" if curr['close'] > curr['open'] else "SELL"
+        trades = []
+        for i in range(1, len(closes)):
+            if highs[i] < highs[i - 1] and lows[i] > lows[i - 1]:
+                direction = "BUY" if closes[i] > opens[i] else "SELL"
                 trades.append({
                     "trade_id": len(trades) + 1,
                     "action": direction,
-                    "timestamp": curr['time'],
-                    "price": curr['close'],
+                    "timestamp": times[i],
+                    "price": closes[i],
                     "profit": 0
                 })
-        return trades
\ No newline at end of file
+        return trades
@@ -1,35 +1,24 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+import numpy as np
+
+from business.utils import indicators
+from business.utils.candle_series import CandleSeries
 from business.utils.strategies.base_strategy import BaseStrategy
 
 class MovingAverageEnvelopeStrategy(BaseStrategy):
-    def generate_trades(self, candles: List[Dict], parameters: Dict) -> List[Dict]:
+    def generate_trades(self, candles: Union[CandleSeries, List[Dict]], parameters: Dict) -> List[Dict]:
         period = parameters.get("period", 20)
         percent = parameters.get("percent", 0.02)
 
-        closes = [c['close'] for c in candles]
-        trades = []
+        candles = CandleSeries.of(candles)
 
-        for i in range(period, len(candles)):
-            sma = sum(closes[i - period:i]) / period
-            upper = sma * (1 + percent)
-            lower = sma * (1 - percent)
-            price = closes[i]
+        sma = indicators.shift(indicators.sma(candles.close, period))
+        upper = sma * (1 + percent)
+        lower = sma * (1 - percent)
+        price = candles.close
 
-            if price > upper:
-                trades.append({
-                    "trade_id": len(trades) + 1,
-                    "action": "SELL",
-                    "timestamp": candles[i]['time'],
-                    "price": price,
-                    "profit": 0
-                })
-            elif price < lower:
-                trades.append({
-                    "trade_id": len(trades) + 1,
-                    "action": "BUY",
-                    "timestamp": candles[i]['time'],
-                    "price": price,
-                    "profit": 0
-                })
+        with np.errstate(invalid="ignore"):
+            sell = price > upper
+            buy = (price < lower) & ~sell
 
-        return trades
\ No newline at end of file
+        return self.signals_from_masks(candles, buy, sell)
@@ -0,0 +1,155 @@
+import calendar
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from persistence.entities.utils_entity import TradeType
+
+
+# 1970-01-01 was a Thursday
+EPOCH_WEEKDAY = 3
+
+
+def trade_arrays(columns: Dict[str, list]) -> Dict[str, np.ndarray]:
+    # missing numbers become NaN, types and markets become integer codes
+    arrays = {
+        name: np.array(columns[name], dtype=np.float64)
+        for name in ("profit", "open_epoch", "close_epoch", "open_price", "sl_price", "tp_price")
+    }
+
+    # types come as their names, strings hash much faster than enum members
+    trade_types, type_code = _codes_by_first_appearance(columns["type"])
+    for key, trade_type in (("is_long", TradeType.BUY), ("is_short", TradeType.SELL)):
+        arrays[key] = type_code == (trade_types.index(trade_type.name) if trade_type.name in trade_types else -1)
+
+    arrays["markets"], arrays["market_code"] = _codes_by_first_appearance(columns["market"])
+    return arrays
+
+
+def _codes_by_first_appearance(values) -> Tuple[list, np.ndarray]:
+    # a dict keeps insertion order, so the codes follow the first trade of each value
+    codes = {}
+    code = np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.intp, count=len(values))
+    return list(codes), code
+
+
+def _int_codes_by_first_appearance(values: np.ndarray) -> Tuple[list, np.ndarray]:
+    uniques, first_index, codes = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first_index)
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    return uniques[order].tolist(), rank[codes]
+
+
+def _round_2(values: np.ndarray) -> list:
+    # np.round scales by 100 and can land on the other side of a .5 tie than round(), so only values
+    # close to a tie go through round()
+    rounded = np.round(values, 2)
+    scaled = np.abs(values * 100)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    result = rounded.tolist()
+    for i in np.flatnonzero(near_tie).tolist():
+        result[i] = round(float(values[i]), 2)
+    return result
+
+
+def _running_total(values: np.ndarray) -> float:
+    # cumsum adds left to right like sum(), np.sum's pairwise order would differ in the last bits
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def _group_sums(codes: np.ndarray, profit: np.ndarray, has_profit: np.ndarray, size: int) -> List[Optional[float]]:
+    # bincount also accumulates in trade order. None marks a group without any profit, whose sum() is 0
+    sums = np.bincount(codes, weights=np.where(has_profit, profit, 0.0), minlength=size)
+    counted = np.bincount(codes, weights=has_profit, minlength=size)
+    return [float(s) if c else None for s, c in zip(sums.tolist(), counted.tolist())]
+
+
+def _rounded(value: Optional[float]):
+    return round(value, 2) if value is not None else 0
+
+
+def calculate_trade_metrics(arrays: Dict[str, np.ndarray], duration_buckets: List[Tuple[str, Optional[int]]]) -> Dict:
+    profit = arrays["profit"]
+    total = len(profit)
+    has_profit = ~np.isnan(profit)
+    profit_or_zero = np.where(has_profit, profit, 0.0)
+
+    wins = profit > 0
+    losses = profit < 0
+    nr_wins = int(np.count_nonzero(wins))
+    nr_losses = int(np.count_nonzero(losses))
+
+    # R:R where TP, SL and open are set and non-zero, and neither TP nor SL sits on the open price
+    open_price, sl_price, tp_price = arrays["open_price"], arrays["sl_price"], arrays["tp_price"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rr = np.abs(tp_price - open_price) / np.abs(open_price - sl_price)
+    has_rr = (
+        ~np.isnan(tp_price) & (tp_price != 0) & ~np.isnan(sl_price) & (sl_price != 0) & (open_price != 0) &
+        (sl_price != open_price) & (tp_price != open_price)
+    )
+    rr = rr[has_rr]
+
+    balances = _round_2(np.cumsum(profit_or_zero))
+    balance_curve = [{"trade": trade, "balance": balance} for trade, balance in zip(range(1, total + 1), balances)]
+
+    def stat_info(mask: np.ndarray):
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return {"count": 0, "profit": 0.0, "winrate": 0}
+        group_sum = _running_total(profit[mask & has_profit]) if np.any(mask & has_profit) else None
+        return {
+            "count": count,
+            "profit": _rounded(group_sum),
+            "winrate": round(int(np.count_nonzero(mask & wins)) / count * 100, 2)
+        }
+
+    # By instrument
+    markets, market_code = arrays["markets"], arrays["market_code"]
+    market_counts = np.bincount(market_code, minlength=len(markets)).tolist()
+    market_sums = _group_sums(market_code, profit, has_profit, len(markets))
+    by_instrument = [
+        {"instrument": market, "trades": market_counts[i], "profit": _rounded(market_sums[i])}
+        for i, market in enumerate(markets)
+    ]
+
+    # By day of week, from the open time's day number
+    weekday = ((np.floor_divide(arrays["open_epoch"], 86400) + EPOCH_WEEKDAY) % 7).astype(np.intp)
+    day_numbers, day_code = _int_codes_by_first_appearance(weekday)
+    day_counts = np.bincount(day_code, minlength=len(day_numbers)).tolist()
+    day_sums = _group_sums(day_code, profit, has_profit, len(day_numbers))
+    by_day = [
+        {"day": calendar.day_name[day], "trades": day_counts[i], "profit": _rounded(day_sums[i])}
+        for i, day in enumerate(day_numbers)
+    ]
+
+    # By duration, for closed trades only
+    duration = (arrays["close_epoch"] - arrays["open_epoch"]) / 3600
+    closed = ~np.isnan(duration)
+    bounds = [hours for _, hours in duration_buckets if hours is not None]
+    bucket = np.searchsorted(bounds, duration[closed], side="left")
+    bucket_counts = np.bincount(bucket, minlength=len(duration_buckets)).tolist()
+    bucket_sums = _group_sums(bucket, profit[closed], has_profit[closed], len(duration_buckets))
+    by_duration = [
+        {"range": label, "trades": bucket_counts[i], "profit": _rounded(bucket_sums[i])}
+        for i, (label, _) in enumerate(duration_buckets)
+    ]
+
+    profits = profit[has_profit]
+    return {
+        "total_trades": total,
+        "winrate": round(nr_wins / total * 100, 2),
+        "lossrate": round(nr_losses / total * 100, 2),
+        "break_even": int(np.count_nonzero(profit == 0)),
+        "avg_rr": round(_running_total(rr) / len(rr), 2) if len(rr) else None,
+        "avg_profit": round(_running_total(profit[wins]) / nr_wins, 2) if nr_wins else None,
+        "avg_loss": round(_running_total(profit[losses]) / nr_losses, 2) if nr_losses else None,
+        "total_result": _rounded(_running_total(profits) if len(profits) else None),
+        "max_profit": float(profits.max()) if len(profits) else None,
+        "max_loss": float(profits.min()) if len(profits) else None,
+        "balance_curve": balance_curve,
+        "long_stats": stat_info(arrays["is_long"]),
+        "short_stats": stat_info(arrays["is_short"]),
+        "by_instrument": by_instrument,
+        "by_day": by_day,
+        "by_duration": by_duration
+    }
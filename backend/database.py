@@ -1,5 +1,6 @@
 import os
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
@@ -8,7 +9,16 @@ load_dotenv()
 
 DATABASE_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 
-engine = create_engine(DATABASE_URL)
+# Each request checks out its own connection. The defaults (10 + 30 overflow) cover FastAPI's
+# 40 sync worker threads, so a request waits for a thread, never for a connection.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=int(os.getenv("DB_POOL_SIZE", 10)),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 30)),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 30)),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -21,3 +31,35 @@ def get_db():
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+
+
+# Pool metrics
+_pool_stats = {"connects": 0, "checkouts": 0, "invalidations": 0, "peak_checked_out": 0}
+_pool_stats_lock = threading.Lock()
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    with _pool_stats_lock:
+        _pool_stats["connects"] += 1
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    with _pool_stats_lock:
+        _pool_stats["checkouts"] += 1
+        _pool_stats["peak_checked_out"] = max(_pool_stats["peak_checked_out"], engine.pool.checkedout())
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    with _pool_stats_lock:
+        _pool_stats["invalidations"] += 1
+
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    with _pool_stats_lock:
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            **_pool_stats,
+        }
@@ -4,6 +4,7 @@ from database import engine, Base
 from persistence.entities.user_entity import UserEntity
 from persistence.entities.trading_account_entity import TradingAccountEntity
 from persistence.entities.trade_entity import TradeEntity
+from persistence.entities.trade_aggregate_entity import TradeAggregateEntity
 from persistence.entities.backtest_entity import BacktestEntity
 from persistence.entities.strategy_entity import StrategyEntity
 from persistence.entities.statistic_entity import StatisticEntity
@@ -9,6 +9,7 @@ from presentation.controllers.statistic_controller import router as statistic_ro
 from presentation.controllers.backtest_controller import router as backtest_router
 from presentation.controllers.strategy_controller import router as strategy_router
 from presentation.controllers.chart_data_controller import router as chart_data_router
+from presentation.controllers.health_controller import router as health_router
 
 from dotenv import load_dotenv
 
@@ -36,6 +37,7 @@ app.include_router(statistic_router)
 app.include_router(backtest_router)
 app.include_router(strategy_router)
 app.include_router(chart_data_router)
+app.include_router(health_router)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
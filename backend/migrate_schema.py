@@ -0,0 +1,98 @@
+from typing import List
+from sqlalchemy import inspect, text, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from database import engine
+from init_db import wait_for_db
+from persistence.entities.trade_entity import TradeEntity
+from persistence.entities.backtest_entity import BacktestEntity
+from persistence.utils.balance_curve import balance_curve_columns
+
+
+# Adds the columns and indexes declared on the entities to an existing database, create_all only covers
+# new tables, and moves older balance curves to the binary levels:
+#   python migrate_schema.py
+INDEXED_TABLES = (TradeEntity.__table__, BacktestEntity.__table__)
+MIGRATED_TABLES = (BacktestEntity.__table__,)
+
+
+def add_missing_columns(bind: Engine = engine) -> List[str]:
+    # only nullable columns can be added to a table that has rows
+    added = []
+    with bind.begin() as conn:
+        for table in MIGRATED_TABLES:
+            existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN IF NOT EXISTS "{column.name}" {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def downsample_balance_curves(bind: Engine = engine, batch_size: int = 100) -> int:
+    # backtests saved before the binary levels hold their whole curve in balance_curve
+    backtests = BacktestEntity.__table__
+    pending = select(backtests.c.id, backtests.c.balance_curve).where(
+        backtests.c.balance_curve_full.is_(None), backtests.c.balance_curve.isnot(None)
+    ).order_by(backtests.c.id)
+
+    done, last_id = 0, 0
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(pending.where(backtests.c.id > last_id).limit(batch_size)).all()
+            for backtest_id, curve in rows:
+                columns = balance_curve_columns(curve)
+                if columns["balance_curve_full"] is not None:
+                    conn.execute(update(backtests).where(backtests.c.id == backtest_id).values(**columns))
+                    done += 1
+        if len(rows) < batch_size:
+            return done
+        last_id = rows[-1][0]
+
+
+def create_missing_indexes(bind: Engine = engine) -> List[str]:
+    # CONCURRENTLY keeps the tables writable during the build. It cannot run in a transaction, and a build
+    # that failed leaves an invalid index behind, which is dropped and built again.
+    created = []
+    with bind.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in INDEXED_TABLES:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                state = conn.execute(text(
+                    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name"
+                ), {"name": index.name}).scalar()
+                if state:
+                    continue
+                if state is not None:
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+
+                ddl = str(CreateIndex(index).compile(dialect=conn.dialect))
+                conn.execute(text(ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+                conn.execute(text(f'ANALYZE "{table.name}"'))
+                created.append(index.name)
+    return created
+
+
+def drop_indexes(bind: Engine = engine) -> List[str]:
+    # the way back, e.g. to measure the queries without the indexes
+    dropped = []
+    with bind.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in INDEXED_TABLES:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+                dropped.append(index.name)
+    return dropped
+
+
+if __name__ == "__main__":
+    wait_for_db()
+    added = add_missing_columns()
+    print("Added columns: " + ", ".join(added) if added else "All columns already exist.")
+    print(f"Downsampled {downsample_balance_curves()} balance curves.")
+    created = create_missing_indexes()
+    print("Created indexes: " + ", ".join(created) if created else "All indexes already exist.")
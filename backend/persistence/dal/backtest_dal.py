@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from persistence.dao.interfaces.backtest_dao_interface import BacktestDAOInterface
 from persistence.dao.repositories.backtest_repository import BacktestRepository
 from persistence.dto.backtest_dto import BacktestDTO
@@ -11,6 +11,12 @@ class BacktestDAL:
     def add_backtest(self, dto: BacktestDTO, user_id: int) -> BacktestDTO:
         return self.repo.add_backtest(dto, user_id)
 
+    def add_backtest_with_trades(self, dto: BacktestDTO, user_id: int, trade_rows: List[Dict]) -> BacktestDTO:
+        return self.repo.add_backtest_with_trades(dto, user_id, trade_rows)
+
+    def add_backtest_with_trade_columns(self, dto: BacktestDTO, user_id: int, trade_rows: List[Dict]) -> BacktestDTO:
+        return self.repo.add_backtest_with_trade_columns(dto, user_id, trade_rows)
+
 
     def delete_backtest(self, backtest_id: int) -> bool:
         return self.repo.delete_backtest(backtest_id)
@@ -28,6 +34,9 @@ class BacktestDAL:
     def get_backtest_metrics(self, backtest_id: int) -> Optional[dict]:
         return self.repo.get_backtest_metrics(backtest_id)
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[List[Dict[str, float]]]:
+        return self.repo.get_balance_curve(backtest_id, resolution)
+
 
     def update_backtest(self, backtest_id: int, updated_dto: BacktestDTO) -> Optional[BacktestDTO]:
         return self.repo.update_backtest(backtest_id, updated_dto)
@@ -25,6 +25,9 @@ class StrategyDAL:
     def get_public_strategies(self) -> List[StrategyDTO]:
         return self.repo.get_public_strategies()
 
+    def get_backtest_user_ids(self, strategy_id: int) -> List[int]:
+        return self.repo.get_backtest_user_ids(strategy_id)
+
     def get_public_strategy_by_type(self, type: StrategyType) -> Optional[StrategyDTO]:
         return self.repo.get_public_strategy_by_type(type)
 
@@ -1,5 +1,6 @@
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from persistence.dto.trade_dto import TradeDTO
 from persistence.dao.repositories.trade_repository import TradeRepository
@@ -15,6 +16,10 @@ class TradeDAL:
     def add_trade(self, trade_dto: TradeDTO, user_id: int) -> TradeDTO:
         return self.repo.add_trade(trade_dto, user_id)
 
+    def add_trades_bulk(self, trade_rows: List[Dict], user_id: int, backtest_id: Optional[int] = None,
+                        commit: bool = True) -> int:
+        return self.repo.add_trades_bulk(trade_rows, user_id, backtest_id, commit)
+
     def delete_trade(self, trade_id: int) -> bool:
         return self.repo.delete_trade(trade_id)
 
@@ -35,4 +40,33 @@ class TradeDAL:
         return self.repo.get_trades_by_field(user_id, source, **filters)
 
     def get_trades_by_backtest(self, backtest_id: int) -> List[TradeDTO]:
-        return self.repo.get_trades_by_backtest(backtest_id)
\ No newline at end of file
+        return self.repo.get_trades_by_backtest(backtest_id)
+
+    def get_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None, **filters) -> List[Row]:
+        return self.repo.get_trade_rows(user_id, source, **filters)
+
+    def get_trade_rows_page(self, user_id: Optional[int], limit: int, after: Optional[Tuple] = None,
+                            source: Optional[SourceType] = None, **filters) -> List[Row]:
+        return self.repo.get_trade_rows_page(user_id, limit, after, source, **filters)
+
+    def stream_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None,
+                          **filters) -> Iterator[Row]:
+        return self.repo.stream_trade_rows(user_id, source, **filters)
+
+    def get_trade_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                             source: Optional[SourceType] = None, **filters) -> Dict:
+        return self.repo.get_trade_aggregates(user_id, duration_buckets, source, **filters)
+
+    def get_summary_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                               source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        return self.repo.get_summary_aggregates(user_id, duration_buckets, source, **filters)
+
+    def get_trade_columns(self, user_id: int, source: Optional[SourceType] = None, **filters) -> Dict[str, list]:
+        return self.repo.get_trade_columns(user_id, source, **filters)
+
+    def stream_trade_profits(self, user_id: int, source: Optional[SourceType] = None,
+                             **filters) -> Iterator[Optional[float]]:
+        return self.repo.stream_trade_profits(user_id, source, **filters)
+
+    def has_trade_columns(self, backtest_id: int) -> bool:
+        return self.repo.has_trade_columns(backtest_id)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from persistence.dto.backtest_dto import BacktestDTO
 
 class BacktestDAOInterface:
@@ -7,6 +7,12 @@ class BacktestDAOInterface:
     def add_backtest(self, dto: BacktestDTO, user_id: int) -> BacktestDTO:
         pass
 
+    def add_backtest_with_trades(self, dto: BacktestDTO, user_id: int, trade_rows: List[Dict]) -> BacktestDTO:
+        pass
+
+    def add_backtest_with_trade_columns(self, dto: BacktestDTO, user_id: int, trade_rows: List[Dict]) -> BacktestDTO:
+        pass
+
     def delete_backtest(self, backtest_id: int) -> bool:
         pass
 
@@ -24,6 +30,9 @@ class BacktestDAOInterface:
     def get_backtest_metrics(self, backtest_id: int) -> Optional[dict]:
         pass
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[List[Dict[str, float]]]:
+        pass
+
 
     # Setters
     def update_backtest(self, backtest_id: int, updated_dto: BacktestDTO) -> Optional[BacktestDTO]:
@@ -23,6 +23,9 @@ class StrategyDAOInterface:
     def get_public_strategies(self) -> List[StrategyDTO]:
         pass
 
+    def get_backtest_user_ids(self, strategy_id: int) -> List[int]:
+        pass
+
     def get_strategies_by_type(self, type: StrategyType) -> List[StrategyDTO]:
         pass
 
@@ -0,0 +1,25 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from persistence.entities.utils_entity import SourceType
+
+
+class TradeAggregateDAOInterface:
+
+    # Maintenance
+    def add_trades(self, *conditions) -> None:
+        pass
+
+    def get_trade_keys(self, *conditions) -> List[Tuple]:
+        pass
+
+    def refresh(self, keys: Iterable[Tuple]) -> None:
+        pass
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        pass
+
+
+    # Getters
+    def get_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                       source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        pass
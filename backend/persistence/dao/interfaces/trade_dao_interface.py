@@ -1,4 +1,6 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.engine import Row
 
 from persistence.dto.trade_dto import TradeDTO
 from persistence.entities.utils_entity import SourceType
@@ -10,6 +12,10 @@ class TradeDAOInterface:
     def add_trade(self, trade_dto: TradeDTO, user_id: int) -> TradeDTO:
         pass
 
+    def add_trades_bulk(self, trade_rows: List[Dict], user_id: int, backtest_id: Optional[int] = None,
+                        commit: bool = True) -> int:
+        pass
+
     def delete_trade(self, trade_id: int) -> bool:
         pass
 
@@ -30,6 +36,35 @@ class TradeDAOInterface:
     def get_trades_by_backtest(self, backtest_id: int) -> List[TradeDTO]:
        pass
 
+    def get_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None, **filters) -> List[Row]:
+        pass
+
+    def get_trade_rows_page(self, user_id: Optional[int], limit: int, after: Optional[Tuple] = None,
+                            source: Optional[SourceType] = None, **filters) -> List[Row]:
+        pass
+
+    def stream_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None,
+                          **filters) -> Iterator[Row]:
+        pass
+
+    def get_trade_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                             source: Optional[SourceType] = None, **filters) -> Dict:
+        pass
+
+    def get_summary_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                               source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        pass
+
+    def get_trade_columns(self, user_id: int, source: Optional[SourceType] = None, **filters) -> Dict[str, list]:
+        pass
+
+    def stream_trade_profits(self, user_id: int, source: Optional[SourceType] = None,
+                             **filters) -> Iterator[Optional[float]]:
+        pass
+
+    def has_trade_columns(self, backtest_id: int) -> bool:
+        pass
+
     # Setters
     def update_trade(self, trade_id: int, updated_trade_dto: TradeDTO) -> Optional[TradeDTO]:
         pass
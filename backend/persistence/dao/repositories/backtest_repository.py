@@ -1,10 +1,16 @@
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from persistence.dao.interfaces.backtest_dao_interface import BacktestDAOInterface
+from persistence.dao.repositories.trade_aggregate_repository import TradeAggregateRepository
+from persistence.dao.repositories.trade_repository import TradeRepository
 from persistence.entities.backtest_entity import BacktestEntity
+from persistence.entities.trade_entity import TradeEntity
 from persistence.dto.backtest_dto import BacktestDTO
 from persistence.mappers.backtest_mapper import BacktestMapper
+from persistence.utils.balance_curve import balance_curve_columns, decode_full_curve, decode_curve_level, \
+    DETAIL_POINTS, PREVIEW_POINTS
+from persistence.utils.trade_columns import encode_trade_columns
 
 class BacktestRepository(BacktestDAOInterface):
     def __init__(self, db: Session):
@@ -22,12 +28,53 @@ class BacktestRepository(BacktestDAOInterface):
             self.db.rollback()
             raise e
 
+    def add_backtest_with_trades(self, dto: BacktestDTO, user_id: int, trade_rows: List[Dict]) -> BacktestDTO:
+        # The backtest row and all of its trades go in one transaction: either everything is saved or nothing
+        try:
+            entity = BacktestMapper.dto_to_entity(dto)
+            entity.user_id = user_id
+            self.db.add(entity)
+            self.db.flush()
+
+            TradeRepository(self.db).add_trades_bulk(trade_rows, user_id, backtest_id=entity.id, commit=False)
+
+            self.db.commit()
+            self.db.refresh(entity)
+            return BacktestMapper.entity_to_dto(entity)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
+
+    def add_backtest_with_trade_columns(self, dto: BacktestDTO, user_id: int, trade_rows: List[Dict]) -> BacktestDTO:
+        # The trades go on the backtest row as one compressed columnar blob instead of rows of the trades table:
+        # saving, loading and deleting them is a single row. They stay out of the user's trade listings,
+        # aggregates and statistics, only the reads of this backtest see them.
+        try:
+            entity = BacktestMapper.dto_to_entity(dto)
+            entity.user_id = user_id
+            entity.trade_columns = encode_trade_columns(trade_rows)
+            self.db.add(entity)
+
+            self.db.commit()
+            self.db.refresh(entity)
+            return BacktestMapper.entity_to_dto(entity)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
+
     def delete_backtest(self, backtest_id: int) -> bool:
         try:
             entity = self.db.query(BacktestEntity).filter(BacktestEntity.id == backtest_id).first()
             if not entity:
                 return False
+
+            # the trades go with the backtest, their aggregate groups are recomputed without them
+            aggregates = TradeAggregateRepository(self.db)
+            keys = aggregates.get_trade_keys(TradeEntity.backtest_id == backtest_id)
             self.db.delete(entity)
+            self.db.flush()
+            aggregates.refresh(keys)
+
             self.db.commit()
             return True
         except SQLAlchemyError as e:
@@ -47,6 +94,23 @@ class BacktestRepository(BacktestDAOInterface):
         entities = self.db.query(BacktestEntity).filter(BacktestEntity.strategy_id == strategy_id).all()
         return [BacktestMapper.entity_to_dto(e) for e in entities]
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[List[Dict[str, float]]]:
+        # only the column of the resolution is read. Backtests saved before the binary levels have
+        # their whole curve in balance_curve.
+        column = {
+            "full": BacktestEntity.balance_curve_full,
+            str(DETAIL_POINTS): BacktestEntity.balance_curve_detail,
+            str(PREVIEW_POINTS): None,
+        }[resolution]
+        stored = self.db.query(BacktestEntity.balance_curve, *([column] if column is not None else [])) \
+            .filter(BacktestEntity.id == backtest_id).first()
+        if stored is None:
+            return None
+
+        if column is None or stored[1] is None:
+            return stored[0] or []
+        return decode_full_curve(stored[1]) if resolution == "full" else decode_curve_level(stored[1])
+
     def get_backtest_metrics(self, backtest_id: int) -> Optional[dict]:
         entity = self.db.query(BacktestEntity).filter(BacktestEntity.id == backtest_id).first()
         if not entity:
@@ -76,7 +140,7 @@ class BacktestRepository(BacktestDAOInterface):
             }
 
             for key, value in update_fields.items():
-                setattr(backtest, key, value)
+                self._set_field(backtest, key, value)
 
             self.db.commit()
             self.db.refresh(backtest)
@@ -85,6 +149,15 @@ class BacktestRepository(BacktestDAOInterface):
             self.db.rollback()
             raise e
 
+    @staticmethod
+    def _set_field(backtest: BacktestEntity, key: str, value) -> None:
+        # a new balance curve replaces all of its stored levels
+        if key == "balance_curve":
+            for column, column_value in balance_curve_columns(value).items():
+                setattr(backtest, column, column_value)
+        else:
+            setattr(backtest, key, value)
+
     def update_backtest_metrics(self, backtest_id: int, metrics: dict) -> bool:
         try:
             backtest = self.db.query(BacktestEntity).filter(BacktestEntity.id == backtest_id).first()
@@ -97,7 +170,7 @@ class BacktestRepository(BacktestDAOInterface):
 
             for key, value in metrics.items():
                 if key in allowed_fields:
-                    setattr(backtest, key, value)
+                    self._set_field(backtest, key, value)
 
             self.db.commit()
             return True
@@ -1,7 +1,11 @@
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from persistence.dao.interfaces.strategy_dao_interface import StrategyDAOInterface
+from persistence.dao.repositories.trade_aggregate_repository import TradeAggregateRepository
+from persistence.entities.backtest_entity import BacktestEntity
 from persistence.entities.strategy_entity import StrategyEntity
+from persistence.entities.trade_entity import TradeEntity
 from persistence.dto.strategy_dto import StrategyDTO
 from persistence.entities.utils_entity import StrategyType
 from persistence.mappers.strategy_mapper import StrategyMapper
@@ -20,12 +24,24 @@ class StrategyRepository(StrategyDAOInterface):
         return StrategyMapper.entity_to_dto(entity)
 
     def delete_strategy(self, strategy_id: int) -> bool:
-        entity = self.db.query(StrategyEntity).filter(StrategyEntity.id == strategy_id).first()
-        if not entity:
-            return False
-        self.db.delete(entity)
-        self.db.commit()
-        return True
+        try:
+            entity = self.db.query(StrategyEntity).filter(StrategyEntity.id == strategy_id).first()
+            if not entity:
+                return False
+
+            # the strategy's backtests and their trades go with it, their aggregate groups are recomputed without them
+            aggregates = TradeAggregateRepository(self.db)
+            backtest_ids = self.db.query(BacktestEntity.id).filter(BacktestEntity.strategy_id == strategy_id)
+            keys = aggregates.get_trade_keys(TradeEntity.backtest_id.in_(backtest_ids.scalar_subquery()))
+            self.db.delete(entity)
+            self.db.flush()
+            aggregates.refresh(keys)
+
+            self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
 
     def get_strategy_by_id(self, strategy_id: int) -> Optional[StrategyDTO]:
         entity = self.db.query(StrategyEntity).filter(StrategyEntity.id == strategy_id).first()
@@ -39,6 +55,11 @@ class StrategyRepository(StrategyDAOInterface):
         entities = self.db.query(StrategyEntity).filter(StrategyEntity.is_public == True).all()
         return [StrategyMapper.entity_to_dto(e) for e in entities]
 
+    def get_backtest_user_ids(self, strategy_id: int) -> List[int]:
+        # users with backtests of this strategy, public strategies are backtested by others too
+        rows = self.db.query(BacktestEntity.user_id).filter(BacktestEntity.strategy_id == strategy_id).distinct().all()
+        return [user_id for user_id, in rows]
+
     def get_public_strategy_by_type(self, type: StrategyType) -> Optional[StrategyDTO]:
         entity = (
             self.db.query(StrategyEntity)
@@ -0,0 +1,270 @@
+from sqlalchemy import func, cast, select, text, tuple_, Float
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from persistence.dao.interfaces.trade_aggregate_dao_interface import TradeAggregateDAOInterface
+from persistence.entities.trade_aggregate_entity import TradeAggregateEntity, DURATION_BUCKET_HOURS, \
+    NR_DURATION_BUCKETS
+from persistence.entities.trade_entity import TradeEntity
+from persistence.entities.utils_entity import SourceType
+
+
+KEY_FIELDS = ("user_id", "source_type", "market", "open_date", "type", "session")
+
+
+def trade_duration_seconds():
+    return func.extract(
+        "epoch",
+        (TradeEntity.close_date + TradeEntity.close_time) - (TradeEntity.open_date + TradeEntity.open_time)
+    )
+
+def trade_is_closed():
+    return TradeEntity.close_date.isnot(None) & TradeEntity.close_time.isnot(None)
+
+def risk_reward():
+    # R:R and the condition it is defined under: TP, SL and open set and non-zero, neither TP nor SL on the open
+    open_price = cast(TradeEntity.open_price, Float)
+    sl_price = cast(TradeEntity.sl_price, Float)
+    tp_price = cast(TradeEntity.tp_price, Float)
+    has_rr = (
+        (TradeEntity.tp_price != 0) & (TradeEntity.sl_price != 0) & (TradeEntity.open_price != 0) &
+        (TradeEntity.sl_price != TradeEntity.open_price) & (TradeEntity.tp_price != TradeEntity.open_price)
+    )
+    return func.abs(tp_price - open_price) / func.abs(open_price - sl_price), has_rr
+
+def aggregate_measures(values) -> Dict:
+    count, profit, wins, win_profit, losses, loss_profit, break_even, max_profit, min_profit, rr_sum, rr_count = [
+        float(v) if v is not None and not isinstance(v, int) else v for v in values
+    ]
+    return {
+        "count": count,
+        "profit": profit,
+        "wins": wins,
+        "win_profit": win_profit,
+        "losses": losses,
+        "loss_profit": loss_profit,
+        "break_even": break_even,
+        "max_profit": max_profit,
+        "min_profit": min_profit,
+        "rr_sum": rr_sum,
+        "rr_count": rr_count,
+    }
+
+
+class TradeAggregateRepository(TradeAggregateDAOInterface):
+    # Keeps trade_aggregates in step with trades. Every method runs inside the caller's transaction
+    # and leaves the commit to it, except rebuild.
+    def __init__(self, db: Session):
+        self.db = db
+
+
+    # Maintenance
+    def add_trades(self, *conditions) -> None:
+        # the trades matching the conditions are new: their groups are added onto the stored rows
+        for user_id in self._user_ids(conditions):
+            self._lock_user(user_id)
+
+        stmt = insert(TradeAggregateEntity).from_select(self._column_names(), self._grouped_trades(*conditions))
+        stored, added = TradeAggregateEntity.__table__.c, stmt.excluded
+
+        def added_sum(name):
+            return func.coalesce(stored[name] + added[name], stored[name], added[name])
+
+        updates = {name: stored[name] + added[name] for name in self._count_names()}
+        updates.update({name: added_sum(name) for name in self._sum_names()})
+        updates["max_profit"] = func.greatest(stored.max_profit, added.max_profit)
+        updates["min_profit"] = func.least(stored.min_profit, added.min_profit)
+        updates["first_trade_id"] = func.least(stored.first_trade_id, added.first_trade_id)
+
+        self.db.execute(stmt.on_conflict_do_update(index_elements=list(KEY_FIELDS), set_=updates))
+
+    def get_trade_keys(self, *conditions) -> List[Tuple]:
+        key_columns = [getattr(TradeEntity, field) for field in KEY_FIELDS]
+        return [tuple(row) for row in self.db.query(*key_columns).filter(*conditions).distinct().all()]
+
+    def refresh(self, keys: Iterable[Tuple]) -> None:
+        # the groups of these keys are recomputed from their trades, groups left without trades disappear
+        keys = list(set(keys))
+        for user_id in sorted({key[0] for key in keys}):
+            self._lock_user(user_id)
+
+        aggregate_key = tuple_(*[getattr(TradeAggregateEntity, field) for field in KEY_FIELDS])
+        trade_key = tuple_(*[getattr(TradeEntity, field) for field in KEY_FIELDS])
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            self.db.query(TradeAggregateEntity).filter(aggregate_key.in_(chunk)).delete(synchronize_session=False)
+            self.db.execute(insert(TradeAggregateEntity).from_select(
+                self._column_names(), self._grouped_trades(trade_key.in_(chunk))
+            ))
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        # backfill: drops the user's (or everyone's) rows and regroups all of their trades
+        try:
+            # trade writes wait until the rebuild commits, so none of them is missed or counted twice
+            self.db.execute(text("LOCK TABLE trades IN SHARE MODE"))
+
+            query = self.db.query(TradeAggregateEntity)
+            conditions = []
+            if user_id is not None:
+                query = query.filter(TradeAggregateEntity.user_id == user_id)
+                conditions.append(TradeEntity.user_id == user_id)
+            query.delete(synchronize_session=False)
+
+            result = self.db.execute(insert(TradeAggregateEntity).from_select(
+                self._column_names(), self._grouped_trades(*conditions)
+            ))
+            self.db.commit()
+            return result.rowcount
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+
+    # Getters
+    def get_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                       source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        # Same structure as TradeRepository.get_trade_aggregates, read from the aggregate rows.
+        # None when the filters or buckets need the single trades.
+        if [hours for _, hours in duration_buckets] != [*DURATION_BUCKET_HOURS, None]:
+            return None
+
+        try:
+            agg = TradeAggregateEntity
+            weekday = func.extract("isodow", agg.open_date)
+            query = self.db.query(
+                func.grouping(agg.type, agg.market, weekday),
+                agg.type, agg.market, weekday,
+                func.sum(agg.trade_count),
+                func.sum(agg.profit_sum),
+                func.sum(agg.win_count),
+                func.sum(agg.win_profit),
+                func.sum(agg.loss_count),
+                func.sum(agg.loss_profit),
+                func.sum(agg.break_even_count),
+                func.max(agg.max_profit),
+                func.min(agg.min_profit),
+                func.sum(agg.rr_sum),
+                func.sum(agg.rr_count),
+                *[func.sum(getattr(agg, f"duration_{i}_count")) for i in range(NR_DURATION_BUCKETS)],
+                *[func.sum(getattr(agg, f"duration_{i}_profit")) for i in range(NR_DURATION_BUCKETS)],
+            ).filter(agg.user_id == user_id)
+
+            if source:
+                query = query.filter(agg.source_type == source)
+            query = self._filtered_query(query, **filters)
+            if query is None:
+                return None
+
+            query = query.group_by(func.grouping_sets(tuple_(), agg.type, agg.market, weekday)) \
+                .order_by(func.min(agg.first_trade_id))
+
+            aggregates = {"totals": {}, "by_type": {}, "by_market": [], "by_weekday": [], "by_duration": {}}
+            for grouping, trade_type, market, day, *values in query.all():
+                measures = aggregate_measures(values[:11])
+                # grouping() sets a bit for every column left out of the row's grouping set
+                if grouping == 0b111:
+                    # the totals row is there even without any aggregate row, its sums are then NULL
+                    aggregates["totals"] = {**measures, "count": measures["count"] or 0}
+                    bucket_counts = values[11:11 + NR_DURATION_BUCKETS]
+                    bucket_profits = values[11 + NR_DURATION_BUCKETS:]
+                    for (label, _), count, profit in zip(duration_buckets, bucket_counts, bucket_profits):
+                        if count:
+                            aggregates["by_duration"][label] = {
+                                "count": int(count), "profit": float(profit) if profit is not None else None
+                            }
+                elif grouping == 0b011:
+                    aggregates["by_type"][trade_type] = measures
+                elif grouping == 0b101:
+                    aggregates["by_market"].append((market, measures))
+                elif grouping == 0b110:
+                    aggregates["by_weekday"].append((int(day), measures))
+
+            return aggregates
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+
+    # Helpers
+    def _grouped_trades(self, *conditions):
+        # one row per key with the measures of its trades, labelled like the trade_aggregates columns
+        profit = TradeEntity.profit
+        rr, has_rr = risk_reward()
+        duration, closed = trade_duration_seconds(), trade_is_closed()
+
+        bounds = [hours * 3600 for hours in DURATION_BUCKET_HOURS]
+        in_bucket = [closed & (duration <= bounds[0])]
+        in_bucket += [closed & (duration > low) & (duration <= high) for low, high in zip(bounds, bounds[1:])]
+        in_bucket += [closed & (duration > bounds[-1])]
+
+        key_columns = [getattr(TradeEntity, field) for field in KEY_FIELDS]
+        return select(
+            *key_columns,
+            func.count().label("trade_count"),
+            func.sum(profit).label("profit_sum"),
+            func.count().filter(profit > 0).label("win_count"),
+            func.sum(profit).filter(profit > 0).label("win_profit"),
+            func.count().filter(profit < 0).label("loss_count"),
+            func.sum(profit).filter(profit < 0).label("loss_profit"),
+            func.count().filter(profit == 0).label("break_even_count"),
+            func.max(profit).label("max_profit"),
+            func.min(profit).label("min_profit"),
+            func.sum(rr).filter(has_rr).label("rr_sum"),
+            func.count().filter(has_rr).label("rr_count"),
+            func.min(TradeEntity.id).label("first_trade_id"),
+            *[func.count().filter(c).label(f"duration_{i}_count") for i, c in enumerate(in_bucket)],
+            *[func.sum(profit).filter(c).label(f"duration_{i}_profit") for i, c in enumerate(in_bucket)],
+        ).where(*conditions).group_by(*key_columns)
+
+    @staticmethod
+    def _count_names() -> List[str]:
+        return ["trade_count", "win_count", "loss_count", "break_even_count", "rr_count"] + \
+            [f"duration_{i}_count" for i in range(NR_DURATION_BUCKETS)]
+
+    @staticmethod
+    def _sum_names() -> List[str]:
+        return ["profit_sum", "win_profit", "loss_profit", "rr_sum"] + \
+            [f"duration_{i}_profit" for i in range(NR_DURATION_BUCKETS)]
+
+    def _column_names(self) -> List[str]:
+        return [*KEY_FIELDS, "trade_count", "profit_sum", "win_count", "win_profit", "loss_count", "loss_profit",
+                "break_even_count", "max_profit", "min_profit", "rr_sum", "rr_count", "first_trade_id",
+                *[f"duration_{i}_count" for i in range(NR_DURATION_BUCKETS)],
+                *[f"duration_{i}_profit" for i in range(NR_DURATION_BUCKETS)]]
+
+    def _user_ids(self, conditions) -> List[int]:
+        return [user_id for (user_id,) in
+                self.db.query(TradeEntity.user_id).filter(*conditions).distinct().order_by(TradeEntity.user_id)]
+
+    def _lock_user(self, user_id: int) -> None:
+        # one user's aggregate writes run one transaction at a time, each sees the trades committed before it
+        self.db.execute(select(func.pg_advisory_xact_lock(func.hashtext("trade_aggregates"), user_id)))
+
+    @staticmethod
+    def _filtered_query(query, **filters):
+        # only filters on key columns can be answered from the aggregate rows
+        for field, value in filters.items():
+            attr_name, _, op = field.partition("__")
+            if attr_name not in KEY_FIELDS:
+                return None
+
+            column = getattr(TradeAggregateEntity, attr_name)
+            if not op:
+                query = query.filter(column.in_(value) if isinstance(value, list) else column == value)
+            elif op == "gte":
+                query = query.filter(column >= value)
+            elif op == "lte":
+                query = query.filter(column <= value)
+            elif op == "gt":
+                query = query.filter(column > value)
+            elif op == "lt":
+                query = query.filter(column < value)
+            elif op == "range" and isinstance(value, (tuple, list)) and len(value) == 2:
+                query = query.filter(column.between(value[0], value[1]))
+            elif op == "in" and isinstance(value, list):
+                query = query.filter(column.in_(value))
+            elif op == "neq":
+                query = query.filter(column != value)
+
+        return query
@@ -1,16 +1,37 @@
+from collections import namedtuple
+from datetime import time
+import numpy as np
+from sqlalchemy import func, case, cast, tuple_, Float, Numeric, String
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from persistence.dao.interfaces.trade_dao_interface import TradeDAOInterface
+from persistence.dao.repositories.trade_aggregate_repository import TradeAggregateRepository, KEY_FIELDS, \
+    aggregate_measures, risk_reward, trade_duration_seconds
+from persistence.entities.backtest_entity import BacktestEntity
 from persistence.entities.trade_entity import TradeEntity
 from persistence.dto.trade_dto import TradeDTO
 from persistence.entities.utils_entity import SourceType
 from persistence.mappers.trade_mapper import TradeMapper
+from persistence.utils.trade_columns import decode_trade_columns, filter_trade_columns, TRADE_TYPES, SESSION_TYPES
+
+
+# columns of the lean read path, in response order
+TRADE_ROW_FIELDS = (
+    "id", "user_id", "market", "volume", "type", "open_date", "open_time", "close_date", "close_time", "session",
+    "open_price", "close_price", "sl_price", "tp_price", "swap", "commission", "profit", "pips", "link_photo",
+    "source_type", "backtest_id"
+)
+
+# a lean row of a backtest in columnar storage, same fields and values as the rows read from the table
+TradeRow = namedtuple("TradeRow", TRADE_ROW_FIELDS)
 
 
 class TradeRepository(TradeDAOInterface):
     def __init__(self, db: Session):
         self.db = db
+        self.aggregates = TradeAggregateRepository(db)
 
 
     # Create & Delete
@@ -20,6 +41,9 @@ class TradeRepository(TradeDAOInterface):
             trade_entity.user_id = user_id
 
             self.db.add(trade_entity)
+            self.db.flush()
+            self.aggregates.add_trades(TradeEntity.id == trade_entity.id)
+
             self.db.commit()
             self.db.refresh(trade_entity)
             return TradeMapper.entity_to_dto(trade_entity)
@@ -27,12 +51,35 @@ class TradeRepository(TradeDAOInterface):
             self.db.rollback()
             raise e
 
+    def add_trades_bulk(self, trade_rows: List[Dict], user_id: int, backtest_id: Optional[int] = None,
+                        commit: bool = True) -> int:
+        # One executemany for all rows. With commit=False the caller owns the transaction.
+        try:
+            rows = [{**row, "user_id": user_id, "backtest_id": backtest_id} for row in trade_rows]
+            if rows:
+                self.db.bulk_insert_mappings(TradeEntity, rows)
+                # a backtest's trades are told apart by its id, other rows only by their keys
+                if backtest_id is not None:
+                    self.aggregates.add_trades(TradeEntity.backtest_id == backtest_id)
+                else:
+                    self.aggregates.refresh(tuple(row[field] for field in KEY_FIELDS) for row in rows)
+            if commit:
+                self.db.commit()
+            return len(rows)
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
     def delete_trade(self, trade_id: int) -> bool:
         try:
             trade = self.db.query(TradeEntity).filter(TradeEntity.id == trade_id).first()
             if not trade:
                 return False
+            key = self._trade_key(trade)
             self.db.delete(trade)
+            self.db.flush()
+            self.aggregates.refresh([key])
+
             self.db.commit()
             return True
         except Exception as e:
@@ -53,8 +100,11 @@ class TradeRepository(TradeDAOInterface):
             update_fields = {k: v for k, v in updated_trade_dto.dict().items() if
                              k not in ["id", "user_id", "source_type"] and v is not None}
 
+            old_key = self._trade_key(trade)
             for key, value in update_fields.items():
                 setattr(trade, key, value)
+            self.db.flush()
+            self.aggregates.refresh([old_key, self._trade_key(trade)])
 
             self.db.commit()
             self.db.refresh(trade)
@@ -64,6 +114,11 @@ class TradeRepository(TradeDAOInterface):
             raise e
 
 
+    @staticmethod
+    def _trade_key(trade: TradeEntity) -> Tuple:
+        return tuple(getattr(trade, field) for field in KEY_FIELDS)
+
+
     # Getters
     def get_trade_by_id(self, trade_id: int) -> Optional[TradeDTO]:
         try:
@@ -86,6 +141,10 @@ class TradeRepository(TradeDAOInterface):
 
     def get_trades_by_backtest(self, backtest_id: int) -> List[TradeDTO]:
         try:
+            columns = self._columnar_trades(None, SourceType.BACKTEST, {"backtest_id": backtest_id})
+            if columns is not None:
+                return [TradeDTO(**row._asdict()) for row in self._column_rows(columns)]
+
             trades = self.db.query(TradeEntity).filter(
                 TradeEntity.backtest_id == backtest_id,
                 TradeEntity.source_type == SourceType.BACKTEST
@@ -97,44 +156,287 @@ class TradeRepository(TradeDAOInterface):
 
     def get_trades_by_field(self, user_id: int, source: Optional[SourceType] = None, **filters) -> List[TradeDTO]:
         try:
-            query = self.db.query(TradeEntity).filter(TradeEntity.user_id == user_id)
-
-            if source:
-                query = query.filter(TradeEntity.source_type == source)
-
-            for field, value in filters.items():
-                if "__" in field:
-                    attr_name, op = field.split("__", 1)
-                    if not hasattr(TradeEntity, attr_name):
-                        continue
-
-                    column = getattr(TradeEntity, attr_name)
-
-                    if op == "gte":
-                        query = query.filter(column >= value)
-                    elif op == "lte":
-                        query = query.filter(column <= value)
-                    elif op == "gt":
-                        query = query.filter(column > value)
-                    elif op == "lt":
-                        query = query.filter(column < value)
-                    elif op == "range" and isinstance(value, (tuple, list)) and len(value) == 2:
-                        query = query.filter(column.between(value[0], value[1]))
-                    elif op == "in" and isinstance(value, list):
-                        query = query.filter(column.in_(value))
-                    elif op == "neq":
-                        query = query.filter(column != value)
-                else:
-                    if hasattr(TradeEntity, field):
-                        column = getattr(TradeEntity, field)
-                        if isinstance(value, list):
-                            query = query.filter(column.in_(value))
-                        else:
-                            query = query.filter(column == value)
-
-            trades = query.all()
+            columns = self._columnar_trades(user_id, source, filters)
+            if columns is not None:
+                return [TradeDTO(**row._asdict()) for row in self._column_rows(columns)]
+
+            query = self._filtered_query(self.db.query(TradeEntity), user_id, source, **filters)
+            trades = query.order_by(TradeEntity.id).all()
             return [TradeMapper.entity_to_dto(trade) for trade in trades]
 
         except Exception as e:
             self.db.rollback()
             raise e
+
+    def get_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None, **filters) -> List[Row]:
+        # Read-only rows of the TRADE_ROW_FIELDS columns, in trade order. No entities, no identity map.
+        try:
+            columns = self._columnar_trades(user_id, source, filters)
+            if columns is not None:
+                return self._column_rows(columns)
+
+            query = self._filtered_query(self._row_query(), user_id, source, **filters)
+            return query.order_by(TradeEntity.id).all()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def get_trade_rows_page(self, user_id: Optional[int], limit: int, after: Optional[Tuple] = None,
+                            source: Optional[SourceType] = None, **filters) -> List[Row]:
+        # Keyset page on (open_date, open_time, id): the rows after the last one of the previous page
+        try:
+            columns = self._columnar_trades(user_id, source, filters)
+            if columns is not None:
+                return self._column_keyset_rows(columns, after)[:limit]
+
+            return self._keyset_query(user_id, after, source, **filters).limit(limit).all()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def stream_trade_rows(self, user_id: Optional[int], source: Optional[SourceType] = None,
+                          **filters) -> Iterator[Row]:
+        # every matching row in keyset order, fetched in batches from a server-side cursor
+        try:
+            columns = self._columnar_trades(user_id, source, filters)
+            if columns is not None:
+                yield from self._column_keyset_rows(columns, None)
+                return
+
+            yield from self._keyset_query(user_id, None, source, **filters).yield_per(1000)
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def _row_query(self):
+        # numbers come as float8, the same values the DTOs' float fields hold
+        return self.db.query(*[
+            cast(column, Float).label(column.key) if isinstance(column.type, Numeric) else column
+            for column in (getattr(TradeEntity, field) for field in TRADE_ROW_FIELDS)
+        ])
+
+    def _keyset_query(self, user_id: Optional[int], after: Optional[Tuple], source: Optional[SourceType] = None,
+                      **filters):
+        keyset = (TradeEntity.open_date, TradeEntity.open_time, TradeEntity.id)
+        query = self._filtered_query(self._row_query(), user_id, source, **filters)
+        if after is not None:
+            query = query.filter(tuple_(*keyset) > tuple_(*after))
+        return query.order_by(*keyset)
+
+    def get_trade_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                             source: Optional[SourceType] = None, **filters) -> Dict:
+        # One scan with GROUPING SETS: the totals plus the groups by type, market, weekday and duration bucket.
+        # Groups come back in order of their first trade, as when they were built from the trade list.
+        try:
+            weekday = func.extract("isodow", TradeEntity.open_date)
+            duration = trade_duration_seconds()
+            bucket = case(
+                (TradeEntity.close_date.is_(None) | TradeEntity.close_time.is_(None), None),
+                *[(duration <= hours * 3600, label) for label, hours in duration_buckets if hours is not None],
+                else_=duration_buckets[-1][0]
+            )
+
+            profit = TradeEntity.profit
+            rr, has_rr = risk_reward()
+
+            query = self.db.query(
+                func.grouping(TradeEntity.type, TradeEntity.market, weekday, bucket),
+                TradeEntity.type, TradeEntity.market, weekday, bucket,
+                func.count(),
+                func.sum(profit),
+                func.count().filter(profit > 0),
+                func.sum(profit).filter(profit > 0),
+                func.count().filter(profit < 0),
+                func.sum(profit).filter(profit < 0),
+                func.count().filter(profit == 0),
+                func.max(profit),
+                func.min(profit),
+                func.sum(rr).filter(has_rr),
+                func.count().filter(has_rr),
+            )
+            query = self._filtered_query(query, user_id, source, **filters)
+            query = query.group_by(func.grouping_sets(
+                tuple_(), TradeEntity.type, TradeEntity.market, weekday, bucket
+            )).order_by(func.min(TradeEntity.id))
+
+            aggregates = {"totals": {}, "by_type": {}, "by_market": [], "by_weekday": [], "by_duration": {}}
+            for grouping, trade_type, market, day, duration_bucket, *values in query.all():
+                measures = aggregate_measures(values)
+                # grouping() sets a bit for every column left out of the row's grouping set
+                if grouping == 0b1111:
+                    aggregates["totals"] = measures
+                elif grouping == 0b0111:
+                    aggregates["by_type"][trade_type] = measures
+                elif grouping == 0b1011:
+                    aggregates["by_market"].append((market, measures))
+                elif grouping == 0b1101:
+                    aggregates["by_weekday"].append((int(day), measures))
+                elif duration_bucket is not None:
+                    aggregates["by_duration"][duration_bucket] = measures
+
+            return aggregates
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def get_summary_aggregates(self, user_id: int, duration_buckets: List[Tuple[str, Optional[int]]],
+                               source: Optional[SourceType] = None, **filters) -> Optional[Dict]:
+        return self.aggregates.get_aggregates(user_id, duration_buckets, source, **filters)
+
+    def get_trade_columns(self, user_id: int, source: Optional[SourceType] = None, **filters) -> Dict[str, list]:
+        # Column lists in trade order for the NumPy kernel: numbers as floats, the type as its name
+        # and open/close as epoch seconds
+        try:
+            columns = self._columnar_trades(user_id, source, filters)
+            if columns is not None:
+                return {
+                    "profit": self._nullable(columns["profit"]),
+                    "type": [TRADE_TYPES[code].name for code in columns["type"].tolist()],
+                    "market": [columns["market"]] * len(columns["number"]),
+                    "open_epoch": columns["open_epoch"].astype(np.float64).tolist(),
+                    "close_epoch": columns["close_epoch"].astype(np.float64).tolist(),
+                    **{name: self._nullable(columns[name]) for name in ("open_price", "sl_price", "tp_price")},
+                }
+
+            def epoch(trade_date, trade_time):
+                return cast(func.extract("epoch", trade_date + trade_time), Float)
+
+            query = self.db.query(
+                cast(TradeEntity.profit, Float),
+                cast(TradeEntity.type, String),
+                TradeEntity.market,
+                epoch(TradeEntity.open_date, TradeEntity.open_time),
+                epoch(TradeEntity.close_date, TradeEntity.close_time),
+                cast(TradeEntity.open_price, Float),
+                cast(TradeEntity.sl_price, Float),
+                cast(TradeEntity.tp_price, Float),
+            )
+            rows = self._filtered_query(query, user_id, source, **filters).order_by(TradeEntity.id).all()
+
+            names = ("profit", "type", "market", "open_epoch", "close_epoch", "open_price", "sl_price", "tp_price")
+            values = list(zip(*rows)) if rows else [()] * len(names)
+            return {name: list(column) for name, column in zip(names, values)}
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def stream_trade_profits(self, user_id: int, source: Optional[SourceType] = None,
+                             **filters) -> Iterator[Optional[float]]:
+        # only the profit column, in trade order, fetched in batches from a server-side cursor
+        try:
+            columns = self._columnar_trades(user_id, source, filters)
+            if columns is not None:
+                yield from self._nullable(columns["profit"])
+                return
+
+            query = self._filtered_query(self.db.query(TradeEntity.profit), user_id, source, **filters)
+            for (profit,) in query.order_by(TradeEntity.id).yield_per(10_000):
+                yield float(profit) if profit is not None else None
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    # Columnar backtests
+    def has_trade_columns(self, backtest_id: int) -> bool:
+        try:
+            return self.db.query(BacktestEntity.id).filter(
+                BacktestEntity.id == backtest_id,
+                BacktestEntity.trade_columns.isnot(None)
+            ).first() is not None
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def _columnar_trades(self, user_id: Optional[int], source: Optional[SourceType],
+                         filters: Dict) -> Optional[Dict[str, np.ndarray]]:
+        # the filtered trades of one backtest kept in columnar storage, None when its trades are rows of this table
+        backtest_id = filters.get("backtest_id")
+        if not isinstance(backtest_id, int):
+            return None
+
+        stored = self.db.query(BacktestEntity.user_id, BacktestEntity.trade_columns) \
+            .filter(BacktestEntity.id == backtest_id).first()
+        if stored is None or stored.trade_columns is None:
+            return None
+
+        columns = decode_trade_columns(stored.trade_columns, stored.user_id, backtest_id)
+        if user_id is not None:
+            filters = {**filters, "user_id": user_id}
+        return filter_trade_columns(columns, source, **filters)
+
+    def _column_rows(self, columns: Dict[str, np.ndarray]) -> List[TradeRow]:
+        # in trade order. Blob trades have no row id, they get -number: unique within the backtest
+        # and never the id of a trades row.
+        def dates_and_times(epochs: np.ndarray):
+            days, seconds = np.divmod(epochs, 86400)
+            times = [time(s // 3600, s // 60 % 60, s % 60) for s in seconds.tolist()]
+            return days.astype("datetime64[D]").tolist(), times
+
+        open_dates, open_times = dates_and_times(columns["open_epoch"])
+        close_dates, close_times = dates_and_times(columns["close_epoch"])
+        n_trades = len(open_dates)
+        return [TradeRow(*values) for values in zip(
+            (-columns["number"]).tolist(),
+            [columns["user_id"]] * n_trades,
+            [columns["market"]] * n_trades,
+            self._nullable(columns["volume"]),
+            [TRADE_TYPES[code] for code in columns["type"].tolist()],
+            open_dates, open_times, close_dates, close_times,
+            [SESSION_TYPES[code] for code in columns["session"].tolist()],
+            *[self._nullable(columns[name]) for name in ("open_price", "close_price", "sl_price", "tp_price",
+                                                         "swap", "commission", "profit", "pips")],
+            [None] * n_trades,
+            [SourceType.BACKTEST] * n_trades,
+            [columns["backtest_id"]] * n_trades,
+        )]
+
+    def _column_keyset_rows(self, columns: Dict[str, np.ndarray], after: Optional[Tuple]) -> List[TradeRow]:
+        rows = sorted(self._column_rows(columns), key=lambda row: (row.open_date, row.open_time, row.id))
+        if after is not None:
+            rows = [row for row in rows if (row.open_date, row.open_time, row.id) > tuple(after)]
+        return rows
+
+    @staticmethod
+    def _nullable(values: np.ndarray) -> list:
+        # NaN marks a missing number
+        return [None if value != value else value for value in values.tolist()]
+
+    def _filtered_query(self, query, user_id: Optional[int], source: Optional[SourceType] = None, **filters):
+        # without a user the filters alone select the trades, e.g. all trades of one backtest
+        if user_id is not None:
+            query = query.filter(TradeEntity.user_id == user_id)
+
+        if source:
+            query = query.filter(TradeEntity.source_type == source)
+
+        for field, value in filters.items():
+            if "__" in field:
+                attr_name, op = field.split("__", 1)
+                if not hasattr(TradeEntity, attr_name):
+                    continue
+
+                column = getattr(TradeEntity, attr_name)
+
+                if op == "gte":
+                    query = query.filter(column >= value)
+                elif op == "lte":
+                    query = query.filter(column <= value)
+                elif op == "gt":
+                    query = query.filter(column > value)
+                elif op == "lt":
+                    query = query.filter(column < value)
+                elif op == "range" and isinstance(value, (tuple, list)) and len(value) == 2:
+                    query = query.filter(column.between(value[0], value[1]))
+                elif op == "in" and isinstance(value, list):
+                    query = query.filter(column.in_(value))
+                elif op == "neq":
+                    query = query.filter(column != value)
+            else:
+                if hasattr(TradeEntity, field):
+                    column = getattr(TradeEntity, field)
+                    if isinstance(value, list):
+                        query = query.filter(column.in_(value))
+                    else:
+                        query = query.filter(column == value)
+
+        return query
@@ -1,12 +1,16 @@
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Integer, Float, JSON
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Integer, Float, JSON, Index, LargeBinary, text
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from database import Base
 
 from persistence.entities.strategy_entity import StrategyEntity
 
 class BacktestEntity(Base):
     __tablename__ = 'backtests'
+    __table_args__ = (
+        Index("ix_backtests_user", "user_id"),
+        Index("ix_backtests_strategy", "strategy_id", postgresql_where=text("strategy_id IS NOT NULL")),
+    )
 
     id           = Column(Integer, primary_key=True)
     user_id      = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'))
@@ -26,7 +30,14 @@ class BacktestEntity(Base):
     nr_trades       = Column(Integer, nullable=True)
     profit_factor   = Column(Float, nullable=True)
     expectancy      = Column(Float, nullable=True)
-    balance_curve   = Column(JSONB, nullable=True)
+    # the PREVIEW_POINTS level of the balance curve, the detail level and the full curve are binary and loaded
+    # only when asked for (see persistence.utils.balance_curve)
+    balance_curve        = Column(JSONB, nullable=True)
+    balance_curve_detail = deferred(Column(LargeBinary, nullable=True))
+    balance_curve_full   = deferred(Column(LargeBinary, nullable=True))
+
+    # the executed trades as one compressed columnar blob, set instead of trades rows in columnar storage
+    trade_columns   = deferred(Column(LargeBinary, nullable=True))
 
     created_at      = Column(TIMESTAMP, default="NOW()")
     name            = Column(String(150), nullable=True)
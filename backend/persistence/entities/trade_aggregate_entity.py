@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, String, Date, Numeric, Float, Enum, ForeignKey
+
+from database import Base
+
+from persistence.entities.utils_entity import TradeType, SourceType, SessionType
+
+
+# upper bounds in hours of the duration buckets, the last bucket is open ended
+DURATION_BUCKET_HOURS = (1, 4, 12, 24)
+NR_DURATION_BUCKETS = len(DURATION_BUCKET_HOURS) + 1
+
+
+class TradeAggregateEntity(Base):
+    __tablename__ = 'trade_aggregates'
+
+    # Key part
+    user_id          = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    source_type      = Column(Enum(SourceType), primary_key=True)
+    market           = Column(String(20), primary_key=True)
+    open_date        = Column(Date, primary_key=True)
+    type             = Column(Enum(TradeType), primary_key=True)
+    session          = Column(Enum(SessionType), primary_key=True)
+
+    # Counts and sums, a sum stays NULL while no trade of the group has a profit
+    trade_count      = Column(Integer, nullable=False)
+    profit_sum       = Column(Numeric(14, 2), nullable=True)
+    win_count        = Column(Integer, nullable=False)
+    win_profit       = Column(Numeric(14, 2), nullable=True)
+    loss_count       = Column(Integer, nullable=False)
+    loss_profit      = Column(Numeric(14, 2), nullable=True)
+    break_even_count = Column(Integer, nullable=False)
+    max_profit       = Column(Numeric(12, 2), nullable=True)
+    min_profit       = Column(Numeric(12, 2), nullable=True)
+    rr_sum           = Column(Float, nullable=True)
+    rr_count         = Column(Integer, nullable=False)
+    first_trade_id   = Column(Integer, nullable=False)
+
+    # Duration buckets, closed trades only
+    duration_0_count  = Column(Integer, nullable=False)
+    duration_1_count  = Column(Integer, nullable=False)
+    duration_2_count  = Column(Integer, nullable=False)
+    duration_3_count  = Column(Integer, nullable=False)
+    duration_4_count  = Column(Integer, nullable=False)
+    duration_0_profit = Column(Numeric(14, 2), nullable=True)
+    duration_1_profit = Column(Numeric(14, 2), nullable=True)
+    duration_2_profit = Column(Numeric(14, 2), nullable=True)
+    duration_3_profit = Column(Numeric(14, 2), nullable=True)
+    duration_4_profit = Column(Numeric(14, 2), nullable=True)
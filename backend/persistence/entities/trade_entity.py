@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Time, Numeric, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Time, Numeric, Enum, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -8,6 +8,14 @@ from persistence.entities.utils_entity import TradeType, SourceType, SessionType
 
 class TradeEntity(Base):
     __tablename__ = 'trades'
+    __table_args__ = (
+        # a user's trades by source in date order: listings, keyset pages, date ranges, statistics
+        Index("ix_trades_user_source_open", "user_id", "source_type", "open_date", "open_time", "id"),
+        # market filters with or without a date range
+        Index("ix_trades_user_market_open", "user_id", "market", "open_date"),
+        # the trades of a backtest, only backtest trades are indexed
+        Index("ix_trades_backtest", "backtest_id", postgresql_where=text("backtest_id IS NOT NULL")),
+    )
 
     # Identifying part
     id          = Column(Integer, primary_key=True, autoincrement=True)
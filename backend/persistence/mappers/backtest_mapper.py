@@ -1,5 +1,6 @@
 from persistence.entities.backtest_entity import BacktestEntity
 from persistence.dto.backtest_dto import BacktestDTO
+from persistence.utils.balance_curve import balance_curve_columns
 
 class BacktestMapper:
     @staticmethod
@@ -50,7 +51,7 @@ class BacktestMapper:
             nr_trades       = dto.nr_trades,
             profit_factor   = dto.profit_factor,
             expectancy      = dto.expectancy,
-            balance_curve   = getattr(dto, "balance_curve", None),
+            **balance_curve_columns(getattr(dto, "balance_curve", None)),
 
             created_at      = dto.created_at,
             name            = dto.name
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+# A backtest's balance curve is stored three times: the full curve as a binary float64 array (the first
+# trade number, then the balances), a DETAIL_POINTS level as binary trade numbers then balances, and a
+# PREVIEW_POINTS level as the JSON list the backtest responses carry. The levels are Largest-Triangle-
+# Three-Buckets downsamples: they keep the shape of the curve (peaks, drawdowns) and its first and last point.
+PREVIEW_POINTS = 200
+DETAIL_POINTS = 1000
+RESOLUTIONS = ("full", str(DETAIL_POINTS), str(PREVIEW_POINTS))
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    # indices of the n_out points kept, x is the position in the curve
+    n_points = len(values)
+    if n_out >= n_points or n_out < 3:
+        return np.arange(n_points)
+
+    every = (n_points - 2) / (n_out - 2)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n_points - 1
+
+    selected = 0
+    for bucket in range(n_out - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        # the next bucket's average is the third corner, after the last bucket that is the last point
+        next_end = min(int((bucket + 2) * every) + 1, n_points)
+        next_x = (end + next_end - 1) / 2
+        next_y = values[end:next_end].mean()
+
+        x = np.arange(start, end)
+        areas = np.abs((selected - next_x) * (values[start:end] - values[selected]) -
+                       (selected - x) * (next_y - values[selected]))
+        selected = start + int(np.argmax(areas))
+        kept[bucket + 1] = selected
+
+    return kept
+
+
+def balance_curve_columns(curve: Optional[List[Dict[str, float]]]) -> Dict[str, Any]:
+    # the column values of BacktestEntity for a curve of {"trade", "balance"} points
+    empty = {"balance_curve": curve, "balance_curve_detail": None, "balance_curve_full": None}
+    if not curve:
+        return empty
+
+    trades = np.array([point["trade"] for point in curve], dtype=np.int64)
+    # the binary form keeps only the balances, so the trades must count up by one
+    if np.any(np.diff(trades) != 1):
+        return empty
+
+    balances = np.array([point["balance"] for point in curve], dtype="<f8")
+    return {
+        "balance_curve": _points(trades[0], balances, lttb_indices(balances, PREVIEW_POINTS)),
+        "balance_curve_detail": _encode_level(trades[0], balances, lttb_indices(balances, DETAIL_POINTS)),
+        "balance_curve_full": np.concatenate([[trades[0]], balances]).astype("<f8").tobytes(),
+    }
+
+
+def decode_full_curve(blob: bytes) -> List[Dict[str, float]]:
+    # the first value is the trade number of the first point
+    values = np.frombuffer(blob, dtype="<f8")
+    return _points(int(values[0]), values[1:], np.arange(len(values) - 1))
+
+
+def decode_curve_level(blob: bytes) -> List[Dict[str, float]]:
+    trades, balances = np.frombuffer(blob, dtype="<f8").reshape(2, -1)
+    return [{"trade": trade, "balance": balance}
+            for trade, balance in zip(trades.astype(np.int64).tolist(), balances.tolist())]
+
+
+def _encode_level(first_trade: int, balances: np.ndarray, kept: np.ndarray) -> bytes:
+    return np.concatenate([kept + first_trade, balances[kept]]).astype("<f8").tobytes()
+
+
+def _points(first_trade: int, balances: np.ndarray, kept: np.ndarray) -> List[Dict[str, float]]:
+    return [{"trade": trade, "balance": balance}
+            for trade, balance in zip((kept + first_trade).tolist(), balances[kept].tolist())]
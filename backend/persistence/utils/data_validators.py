@@ -1,6 +1,7 @@
 import re
 from datetime import datetime, time
-from typing import Optional
+from typing import Optional, Tuple
+import numpy as np
 
 from business.bto.trade_bto import TradeBTO
 from persistence.entities.utils_entity import SessionType, StrategyType
@@ -138,6 +139,70 @@ def calculate_pips(trade_bto: TradeBTO) -> float:
         return price_diff
 
 
+# batch variants of the trade validators, over whole columns of trades
+
+def _utc_offset(timestamp: int) -> int:
+    return int((datetime.fromtimestamp(timestamp) - datetime.utcfromtimestamp(timestamp)).total_seconds())
+
+def local_date_and_seconds(timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Same local time as datetime.fromtimestamp. The UTC offset is resolved once per distinct hour when it is
+    # the same at the hour's first and last second. Hours with a transition inside (half-hour DST shifts like
+    # Lord Howe's, historic local mean time offsets) are resolved trade by trade.
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    hours, inverse = np.unique(timestamps // 3600, return_inverse=True)
+    first = np.array([_utc_offset(h * 3600) for h in hours.tolist()], dtype=np.int64)
+    last = np.array([_utc_offset(h * 3600 + 3599) for h in hours.tolist()], dtype=np.int64)
+
+    offsets = first[inverse]
+    changing = np.flatnonzero((first != last)[inverse])
+    offsets[changing] = [_utc_offset(ts) for ts in timestamps[changing].tolist()]
+
+    local = timestamps + offsets
+    return local // 86400, local % 86400
+
+def validate_trade_batch(open_local: np.ndarray, close_local: np.ndarray, types: np.ndarray,
+                         open_prices: np.ndarray, sl_prices: np.ndarray, tp_prices: np.ndarray) -> None:
+    invalid = np.flatnonzero(close_local <= open_local)
+    if len(invalid):
+        raise ValueError(f"Invalid trade #{invalid[0]}: close must be after open.")
+
+    # a missing or zero SL/TP is not checked, as in is_valid_price
+    has_sl = np.nan_to_num(sl_prices) != 0
+    has_tp = np.nan_to_num(tp_prices) != 0
+    buy = types == "buy"
+    sell = types == "sell"
+
+    checks = (
+        (sell & has_tp & (tp_prices >= open_prices), "Invalid SELL trade #{}: Take-Profit (TP) should be < open_price."),
+        (sell & has_sl & (sl_prices <= open_prices), "Invalid SELL trade #{}: Stop-Loss (SL) should be > open_price."),
+        (buy & has_tp & (tp_prices <= open_prices), "Invalid BUY trade #{}: Take-Profit (TP) should be > open_price."),
+        (buy & has_sl & (sl_prices >= open_prices), "Invalid BUY trade #{}: Stop-Loss (SL) should be < open_price."),
+    )
+    for mask, message in checks:
+        invalid = np.flatnonzero(mask)
+        if len(invalid):
+            raise ValueError(message.format(invalid[0]))
+
+def get_sessions_from_open_seconds(open_seconds: np.ndarray) -> np.ndarray:
+    # seconds since local midnight, same boundaries as get_session_from_open_time
+    return np.select(
+        [open_seconds < 10 * 3600, open_seconds < 14 * 3600, open_seconds < 21 * 3600],
+        [SessionType.ASIA, SessionType.LONDON, SessionType.NEW_YORK],
+        default=SessionType.UNKNOWN
+    )
+
+def calculate_pips_batch(open_prices: np.ndarray, close_prices: np.ndarray) -> np.ndarray:
+    price_diff = np.abs(close_prices - open_prices)
+    avg_price = (close_prices + open_prices) / 2
+
+    pips = np.select(
+        [avg_price < 10, avg_price < 1000, avg_price < 10000],
+        [price_diff * 10000, price_diff * 100, price_diff / 10],
+        default=price_diff
+    )
+    return np.nan_to_num(pips)
+
+
 # strategy validators
 
 def validate_strategy_name(name: str) -> None:
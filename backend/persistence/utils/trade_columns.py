@@ -0,0 +1,129 @@
+import io
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+
+from persistence.entities.utils_entity import TradeType, SourceType, SessionType
+
+
+# Columnar storage of a backtest's trades: one array per field, compressed into a single blob on the backtest row.
+# Numbers are rounded to the scale of their trades column, so a trade reads back as it would from the table.
+PRICE_FIELDS = ("open_price", "close_price", "sl_price", "tp_price")
+MONEY_FIELDS = ("volume", "swap", "commission", "profit", "pips")
+
+TRADE_TYPES = list(TradeType)
+SOURCE_TYPES = list(SourceType)
+SESSION_TYPES = list(SessionType)
+
+
+def encode_trade_columns(trade_rows: List[Dict]) -> bytes:
+    # trade_rows as prepared for TradeRepository.add_trades_bulk, all of one market
+    markets = {row["market"] for row in trade_rows}
+    if len(markets) > 1:
+        raise ValueError("Columnar trades must all be of the same market.")
+
+    def epoch(trade_date: date, trade_time) -> int:
+        return (trade_date - date(1970, 1, 1)).days * 86400 + trade_time.hour * 3600 + \
+            trade_time.minute * 60 + trade_time.second
+
+    def numbers(field: str, digits: int) -> np.ndarray:
+        return np.array([round(float(row[field]), digits) if row[field] is not None else np.nan
+                         for row in trade_rows], dtype=np.float64)
+
+    arrays = {
+        "market": np.array(markets.pop() if markets else ""),
+        "open_epoch": np.array([epoch(row["open_date"], row["open_time"]) for row in trade_rows], dtype=np.int64),
+        "close_epoch": np.array([epoch(row["close_date"], row["close_time"]) for row in trade_rows], dtype=np.int64),
+        "type": np.array([TRADE_TYPES.index(row["type"]) for row in trade_rows], dtype=np.int8),
+        "session": np.array([SESSION_TYPES.index(row["session"]) for row in trade_rows], dtype=np.int8),
+        **{field: numbers(field, 5) for field in PRICE_FIELDS},
+        **{field: numbers(field, 2) for field in MONEY_FIELDS},
+    }
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_trade_columns(blob: bytes, user_id: int, backtest_id: int) -> Dict[str, np.ndarray]:
+    # every array plus "number", the 1-based position of the trade in the backtest
+    with np.load(io.BytesIO(blob), allow_pickle=False) as stored:
+        columns = {name: stored[name] for name in stored.files}
+    columns["market"] = str(columns["market"])
+    columns["number"] = np.arange(1, len(columns["open_epoch"]) + 1)
+    columns["user_id"], columns["backtest_id"] = user_id, backtest_id
+    return columns
+
+
+def filter_trade_columns(columns: Dict[str, np.ndarray], source: Optional[SourceType] = None,
+                         **filters) -> Dict[str, np.ndarray]:
+    # The same filters TradeRepository applies in SQL, as a mask over the arrays. All trades are backtest
+    # trades of one user and one backtest, so source_type, user_id and backtest_id pass or drop them all.
+    n_trades = len(columns["number"])
+    mask = np.full(n_trades, source in (None, SourceType.BACKTEST))
+
+    for field, value in filters.items():
+        attr_name, _, op = field.partition("__")
+        if attr_name == "source_type":
+            kept = _codes(SourceType, SOURCE_TYPES, value)
+            mask &= SOURCE_TYPES.index(SourceType.BACKTEST) in (kept if isinstance(kept, list) else [kept])
+            continue
+        if attr_name in ("user_id", "backtest_id"):
+            mask &= columns[attr_name] in (value if isinstance(value, list) else [value])
+            continue
+        if attr_name in ("id", "link_photo"):
+            continue
+
+        values = _filter_values(columns, attr_name, n_trades)
+        if values is None:
+            continue
+        if attr_name == "type":
+            value = _codes(TradeType, TRADE_TYPES, value)
+        elif attr_name == "session":
+            value = _codes(SessionType, SESSION_TYPES, value)
+        elif attr_name in ("open_date", "close_date"):
+            value = _day_numbers(value)
+
+        if not op:
+            mask &= np.isin(values, value) if isinstance(value, list) else values == value
+        elif op == "gte":
+            mask &= values >= value
+        elif op == "lte":
+            mask &= values <= value
+        elif op == "gt":
+            mask &= values > value
+        elif op == "lt":
+            mask &= values < value
+        elif op == "range" and isinstance(value, (tuple, list)) and len(value) == 2:
+            mask &= (values >= value[0]) & (values <= value[1])
+        elif op == "in" and isinstance(value, list):
+            mask &= np.isin(values, value)
+        elif op == "neq":
+            mask &= values != value
+
+    return {name: array[mask] if isinstance(array, np.ndarray) and array.ndim else array
+            for name, array in columns.items()}
+
+
+def _filter_values(columns: Dict[str, np.ndarray], attr_name: str, n_trades: int) -> Optional[np.ndarray]:
+    if attr_name == "market":
+        return np.full(n_trades, columns["market"], dtype=object)
+    if attr_name == "open_date":
+        return columns["open_epoch"] // 86400
+    if attr_name == "close_date":
+        return columns["close_epoch"] // 86400
+    return columns.get(attr_name)
+
+
+def _codes(enum_type, members: list, value):
+    # filter values come as members or as member names, e.g. "BUY" from the statistic params
+    if isinstance(value, (list, tuple)):
+        return [_codes(enum_type, members, v) for v in value]
+    member = value if isinstance(value, enum_type) else enum_type[value]
+    return members.index(member)
+
+
+def _day_numbers(value):
+    if isinstance(value, (list, tuple)):
+        return [_day_numbers(v) for v in value]
+    return (value - date(1970, 1, 1)).days
@@ -1,23 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.exc import IntegrityError
 from business.bal.backtest_bal import BacktestBAL
 from business.bao.services.backtest_bao_service import BacktestBAOService
 from persistence.dal.backtest_dal import BacktestDAL
 from presentation.pao.services.backtest_pao_service import BacktestPAOService
 from presentation.pal.backtest_pal import BacktestPAL
+from business.utils.job_manager import JobLimitError
+from sqlalchemy.orm import Session
 from database import get_db
 
 router = APIRouter()
 
-db = next(get_db())
-backtest_dal = BacktestDAL(db)
-backtest_bao = BacktestBAOService(db, backtest_dal)
-backtest_bal = BacktestBAL(backtest_bao)
-backtest_pao = BacktestPAOService(backtest_bal)
-backtest_pal = BacktestPAL(backtest_pao)
+def get_backtest_pal(db: Session = Depends(get_db)) -> BacktestPAL:
+    # the stack is built per request around its own pooled session
+    backtest_dal = BacktestDAL(db)
+    backtest_bao = BacktestBAOService(db, backtest_dal)
+    backtest_bal = BacktestBAL(backtest_bao)
+    backtest_pao = BacktestPAOService(backtest_bal)
+    return BacktestPAL(backtest_pao)
 
 @router.post("/api/trademind/backtests/save")
-def save_backtest(backtest_data: dict):
+def save_backtest(backtest_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
     try:
         return backtest_pal.save_backtest(backtest_data)
     except IntegrityError:
@@ -30,7 +33,7 @@ def save_backtest(backtest_data: dict):
 
 
 @router.post("/api/trademind/backtests/preview")
-def run_backtest_preview(backtest_data: dict):
+def run_backtest_preview(backtest_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
     try:
         response = backtest_pal.run_backtest_preview(backtest_data)
         return response
@@ -40,8 +43,116 @@ def run_backtest_preview(backtest_data: dict):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/api/trademind/backtests/cache/stats")
+def get_cache_stats(backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    return backtest_pal.get_cache_stats()
+
+
+@router.post("/api/trademind/backtests/jobs", status_code=202)
+def submit_backtest_job(job_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        return backtest_pal.submit_backtest_job(job_data)
+    except JobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.get("/api/trademind/backtests/jobs/user/{user_id}")
+def get_backtest_jobs_by_user(user_id: int, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        return backtest_pal.get_backtest_jobs_by_user(user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.get("/api/trademind/backtests/jobs/{job_id}")
+def get_backtest_job(job_id: str, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    job = backtest_pal.get_backtest_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.get("/api/trademind/backtests/jobs/{job_id}/result")
+def get_backtest_job_result(job_id: str, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        result = backtest_pal.get_backtest_job_result(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return result
+
+
+@router.delete("/api/trademind/backtests/jobs/{job_id}")
+def cancel_backtest_job(job_id: str, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    job = backtest_pal.cancel_backtest_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.post("/api/trademind/backtests/portfolio/preview")
+def run_portfolio_preview(portfolio_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        return backtest_pal.run_portfolio_preview(portfolio_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print("ERROR in run_portfolio_preview:", str(e))
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.post("/api/trademind/backtests/optimize")
+def run_backtest_optimization(optimization_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        return backtest_pal.run_backtest_optimization(optimization_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print("ERROR in run_backtest_optimization:", str(e))
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.post("/api/trademind/backtests/walk-forward")
+def run_walk_forward(walk_forward_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        return backtest_pal.run_walk_forward(walk_forward_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print("ERROR in run_walk_forward:", str(e))
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.post("/api/trademind/backtests/monte-carlo")
+def run_monte_carlo_preview(monte_carlo_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        return backtest_pal.run_monte_carlo_preview(monte_carlo_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.post("/api/trademind/backtests/{backtest_id}/monte-carlo")
+def run_monte_carlo(backtest_id: int, monte_carlo_data: dict, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    try:
+        result = backtest_pal.run_monte_carlo(backtest_id, monte_carlo_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Backtest not found.")
+    return result
+
+
 @router.get("/api/trademind/backtests/{backtest_id}")
-def get_backtest_by_id(backtest_id: int):
+def get_backtest_by_id(backtest_id: int, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
     try:
         backtest = backtest_pal.get_backtest_by_id(backtest_id)
         if not backtest:
@@ -51,22 +162,36 @@ def get_backtest_by_id(backtest_id: int):
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
 
 
+@router.get("/api/trademind/backtests/{backtest_id}/balance-curve")
+def get_balance_curve(backtest_id: int, resolution: str = "full", backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
+    # resolution: full, 1000 or 200 points, the backtest responses carry the 200 points level
+    try:
+        curve = backtest_pal.get_balance_curve(backtest_id, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+    if curve is None:
+        raise HTTPException(status_code=404, detail="Backtest not found.")
+    return curve
+
+
 @router.get("/api/trademind/backtests/user/{user_id}")
-def get_backtests_by_user(user_id: int):
+def get_backtests_by_user(user_id: int, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
     try:
         return backtest_pal.get_backtests_by_user(user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
 
 @router.get("/api/trademind/backtests/strategy/{strategy_id}")
-def get_backtests_by_strategy(strategy_id: int):
+def get_backtests_by_strategy(strategy_id: int, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
     try:
         return backtest_pal.get_backtests_by_strategy(strategy_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
 
 @router.delete("/api/trademind/backtests/{backtest_id}")
-def delete_backtest(backtest_id: int):
+def delete_backtest(backtest_id: int, backtest_pal: BacktestPAL = Depends(get_backtest_pal)):
     try:
         success = backtest_pal.delete_backtest(backtest_id)
         if not success:
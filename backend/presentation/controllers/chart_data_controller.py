@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException
 from sqlalchemy.exc import DatabaseError
-from database import get_db
 
 from business.bal.chart_data_bal_service import ChartDataBAL
 from business.bao.services.chart_data_bao_service import ChartDataBAOService
@@ -9,7 +8,6 @@ from presentation.pal.chart_data_pal import ChartDataPAL
 
 router = APIRouter()
 
-db = next(get_db())
 chart_bao = ChartDataBAOService()
 chart_bal = ChartDataBAL(chart_bao)
 chart_pao = ChartDataPAOService(chart_bal)
@@ -25,3 +23,8 @@ def get_chart_data(payload: dict):
         raise HTTPException(status_code=500, detail="Database error while retrieving chart data.")
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+@router.get("/api/trademind/chart-data/store/stats")
+def get_store_stats():
+    return chart_pal.get_store_stats()
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from database import get_pool_stats
+
+router = APIRouter()
+
+
+@router.get("/api/trademind/health/db-pool")
+def get_db_pool_stats():
+    return get_pool_stats()
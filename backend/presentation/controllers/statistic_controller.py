@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.exc import IntegrityError, DatabaseError
 
 from configurations.jws_authentification import get_current_user
+from sqlalchemy.orm import Session
 from database import get_db
 
 from business.bal.statistic_bal import StatisticBAL
@@ -14,16 +15,17 @@ from presentation.pal.statistic_pal import StatisticPAL
 router = APIRouter()
 
 
-db = next(get_db())
-statistic_dal = StatisticDAL(db)
-statistic_bao = StatisticBAOService(db, statistic_dal)
-statistic_bal = StatisticBAL(statistic_bao)
-statistic_pao = StatisticPAOService(statistic_bal)
-statistic_pal = StatisticPAL(statistic_pao)
+def get_statistic_pal(db: Session = Depends(get_db)) -> StatisticPAL:
+    # the stack is built per request around its own pooled session
+    statistic_dal = StatisticDAL(db)
+    statistic_bao = StatisticBAOService(db, statistic_dal)
+    statistic_bal = StatisticBAL(statistic_bao)
+    statistic_pao = StatisticPAOService(statistic_bal)
+    return StatisticPAL(statistic_pao)
 
 
 @router.post("/api/trademind/statistics/create")
-def create_statistic(statistic_data: dict, current_user: dict = Depends(get_current_user)):
+def create_statistic(statistic_data: dict, current_user: dict = Depends(get_current_user), statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
     try:
         # statistic_data["user_id"] = current_user["user_id"]
         return statistic_pal.create_statistic(statistic_data)
@@ -36,7 +38,7 @@ def create_statistic(statistic_data: dict, current_user: dict = Depends(get_curr
 
 
 @router.get("/api/trademind/statistics/{statistic_id}")
-def get_statistic_by_id(statistic_id: int, current_user: dict = Depends(get_current_user)):
+def get_statistic_by_id(statistic_id: int, current_user: dict = Depends(get_current_user), statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
     try:
         statistic = statistic_pal.get_statistic_by_id(statistic_id)
         if not statistic:
@@ -47,7 +49,7 @@ def get_statistic_by_id(statistic_id: int, current_user: dict = Depends(get_curr
 
 
 @router.get("/api/trademind/statistics/user/{user_id}")
-def get_statistics_by_user(user_id: int, current_user: dict = Depends(get_current_user)):
+def get_statistics_by_user(user_id: int, current_user: dict = Depends(get_current_user), statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
     # if current_user["user_id"] != user_id:
     #     raise HTTPException(status_code=403, detail="Not authorized to view these statistics.")
     try:
@@ -60,7 +62,7 @@ def get_statistics_by_user(user_id: int, current_user: dict = Depends(get_curren
 
 
 @router.put("/api/trademind/statistics/update/{statistic_id}")
-def update_statistic(statistic_id: int, statistic_data: dict, current_user: dict = Depends(get_current_user)):
+def update_statistic(statistic_id: int, statistic_data: dict, current_user: dict = Depends(get_current_user), statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
     try:
         stat = statistic_pal.get_statistic_by_id(statistic_id)
         if not stat:
@@ -77,7 +79,7 @@ def update_statistic(statistic_id: int, statistic_data: dict, current_user: dict
 
 
 @router.delete("/api/trademind/statistics/{statistic_id}")
-def delete_statistic(statistic_id: int, current_user: dict = Depends(get_current_user)):
+def delete_statistic(statistic_id: int, current_user: dict = Depends(get_current_user), statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
     try:
         stat = statistic_pal.get_statistic_by_id(statistic_id)
         if not stat:
@@ -95,8 +97,13 @@ def delete_statistic(statistic_id: int, current_user: dict = Depends(get_current
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
 
 
+@router.get("/api/trademind/statistics/cache/stats")
+def get_cache_stats(statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
+    return statistic_pal.get_cache_stats()
+
+
 @router.post("/api/trademind/statistics/generate")
-def generate_statistic(statistic_data: dict, current_user: dict = Depends(get_current_user)):
+def generate_statistic(statistic_data: dict, current_user: dict = Depends(get_current_user), statistic_pal: StatisticPAL = Depends(get_statistic_pal)):
     try:
         # statistic_data["user_id"] = current_user["user_id"]
         return statistic_pal.generate_statistics(statistic_data)
@@ -6,20 +6,22 @@ from configurations.jws_authentification import get_current_user
 from persistence.dal.strategy_dal import StrategyDAL
 from presentation.pao.services.strategy_pao_service import StrategyPAOService
 from presentation.pal.strategy_pal import StrategyPAL
+from sqlalchemy.orm import Session
 from database import get_db
 
 router = APIRouter()
 
-db = next(get_db())
-strategy_dal = StrategyDAL(db)
-strategy_bao = StrategyBAOService(db, strategy_dal)
-strategy_bal = StrategyBAL(strategy_bao)
-strategy_pao = StrategyPAOService(strategy_bal)
-strategy_pal = StrategyPAL(strategy_pao)
+def get_strategy_pal(db: Session = Depends(get_db)) -> StrategyPAL:
+    # the stack is built per request around its own pooled session
+    strategy_dal = StrategyDAL(db)
+    strategy_bao = StrategyBAOService(db, strategy_dal)
+    strategy_bal = StrategyBAL(strategy_bao)
+    strategy_pao = StrategyPAOService(strategy_bal)
+    return StrategyPAL(strategy_pao)
 
 
 @router.post("/api/trademind/strategies/create")
-def create_strategy(strategy_data: dict, current_user: dict = Depends(get_current_user)):
+def create_strategy(strategy_data: dict, current_user: dict = Depends(get_current_user), strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     try:
         strategy_data["user_id"] = current_user["user_id"]
         return strategy_pal.create_strategy(strategy_data)
@@ -32,7 +34,7 @@ def create_strategy(strategy_data: dict, current_user: dict = Depends(get_curren
 
 
 @router.get("/api/trademind/strategies/strategy/{strategy_id}")
-def get_strategy_by_id(strategy_id: int, current_user: dict = Depends(get_current_user)):
+def get_strategy_by_id(strategy_id: int, current_user: dict = Depends(get_current_user), strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     try:
         strategy = strategy_pal.get_strategy_by_id(strategy_id)
         if not strategy:
@@ -43,7 +45,7 @@ def get_strategy_by_id(strategy_id: int, current_user: dict = Depends(get_curren
 
 
 @router.get("/api/trademind/strategies/user/{user_id}")
-def get_strategies_by_user(user_id: int, current_user: dict = Depends(get_current_user)):
+def get_strategies_by_user(user_id: int, current_user: dict = Depends(get_current_user), strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view these strategies.")
     try:
@@ -53,7 +55,7 @@ def get_strategies_by_user(user_id: int, current_user: dict = Depends(get_curren
 
 
 @router.get("/api/trademind/strategies/public")
-def get_public_strategies():
+def get_public_strategies(strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     try:
         return strategy_pal.get_public_strategies()
     except Exception as e:
@@ -61,7 +63,7 @@ def get_public_strategies():
 
 
 @router.get("/api/trademind/strategies/public/by-type/{strategy_type}")
-def get_public_strategy_by_type(strategy_type: str):
+def get_public_strategy_by_type(strategy_type: str, strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     try:
         strategy = strategy_pal.get_public_strategy_by_type(strategy_type)
         if not strategy:
@@ -75,7 +77,7 @@ def get_public_strategy_by_type(strategy_type: str):
 
 
 @router.put("/api/trademind/strategies/update/{strategy_id}")
-def update_strategy(strategy_id: int, strategy_data: dict):
+def update_strategy(strategy_id: int, strategy_data: dict, strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     try:
         updated = strategy_pal.update_strategy(strategy_id, strategy_data)
         if not updated:
@@ -88,7 +90,7 @@ def update_strategy(strategy_id: int, strategy_data: dict):
 
 
 @router.delete("/api/trademind/strategies/{strategy_id}")
-def delete_strategy(strategy_id: int):
+def delete_strategy(strategy_id: int, strategy_pal: StrategyPAL = Depends(get_strategy_pal)):
     try:
         success = strategy_pal.delete_strategy(strategy_id)
         if not success:
@@ -1,4 +1,6 @@
+from typing import Optional
 from fastapi import HTTPException, APIRouter, Query, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.exc import IntegrityError, DatabaseError
 
 from business.bal.trade_bal import TradeBAL
@@ -8,20 +10,41 @@ from persistence.dal.trade_dal import TradeDAL
 from persistence.entities.utils_entity import SourceType
 from presentation.pal.trade_pal import TradePAL
 from presentation.pao.services.trade_pao_service import TradePAOService
-from database import get_db
+from sqlalchemy.orm import Session
+from database import get_db, SessionLocal
 
 router = APIRouter()
 
-db = next(get_db())
-trade_dal = TradeDAL(db)
-trade_bao = TradeBAOService(trade_dal)
-trade_bal = TradeBAL(trade_bao)
-trade_pao = TradePAOService(trade_bal)
-trade_pal = TradePAL(trade_pao)
+TRADE_PAGE_DEFAULT_LIMIT = 100
+TRADE_PAGE_MAX_LIMIT = 1000
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+
+def get_trade_pal(db: Session = Depends(get_db)) -> TradePAL:
+    # the stack is built per request around its own pooled session
+    trade_dal = TradeDAL(db)
+    trade_bao = TradeBAOService(trade_dal)
+    trade_bal = TradeBAL(trade_bao)
+    trade_pao = TradePAOService(trade_bal)
+    return TradePAL(trade_pao)
+
+
+def export_trades_response(user_id: Optional[int], export_format: str, source: SourceType,
+                           filters: dict) -> StreamingResponse:
+    # the export is streamed after the request's session is closed, so it reads through its own one
+    def chunks():
+        db = SessionLocal()
+        try:
+            yield from get_trade_pal(db).export_trades(user_id, export_format, source, filters)
+        finally:
+            db.close()
+
+    return StreamingResponse(chunks(), media_type=EXPORT_MEDIA_TYPES[export_format],
+                             headers={"Content-Disposition": f'attachment; filename="trades.{export_format}"'})
 
 
 @router.post("/api/trademind/trades/add_trade")
-def add_trade(trade_data: dict, current_user: dict = Depends(get_current_user)):
+def add_trade(trade_data: dict, current_user: dict = Depends(get_current_user), trade_pal: TradePAL = Depends(get_trade_pal)):
     try:
         trade_data["user_id"] = current_user["user_id"]
         return trade_pal.add_trade(trade_data)
@@ -34,7 +57,7 @@ def add_trade(trade_data: dict, current_user: dict = Depends(get_current_user)):
 
 
 @router.put("/api/trademind/trades/update_trade/{trade_id}")
-def update_trade(trade_id: int, trade_data: dict, current_user: dict = Depends(get_current_user)):
+def update_trade(trade_id: int, trade_data: dict, current_user: dict = Depends(get_current_user), trade_pal: TradePAL = Depends(get_trade_pal)):
     try:
         trade_data["user_id"] = current_user["user_id"]
         updated_trade = trade_pal.update_trade(trade_id, trade_data)
@@ -48,7 +71,7 @@ def update_trade(trade_id: int, trade_data: dict, current_user: dict = Depends(g
 
 
 @router.delete("/api/trademind/trades/{trade_id}")
-def delete_trade(trade_id: int, current_user: dict = Depends(get_current_user)):
+def delete_trade(trade_id: int, current_user: dict = Depends(get_current_user), trade_pal: TradePAL = Depends(get_trade_pal)):
     try:
         success = trade_pal.delete_trade(trade_id)
         if not success:
@@ -61,40 +84,84 @@ def delete_trade(trade_id: int, current_user: dict = Depends(get_current_user)):
 
 
 @router.get("/api/trademind/trades/user/{user_id}")
-def get_trades_by_user(user_id: int, current_user: dict = Depends(get_current_user)):
+def get_trades_by_user(user_id: int,
+                       limit: Optional[int] = Query(None, ge=1, le=TRADE_PAGE_MAX_LIMIT),
+                       cursor: Optional[str] = None,
+                       export_format: Optional[str] = Query(None, alias="format", pattern=EXPORT_FORMAT_PATTERN),
+                       current_user: dict = Depends(get_current_user), trade_pal: TradePAL = Depends(get_trade_pal)):
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view these trades.")
 
+    if export_format:
+        return export_trades_response(user_id, export_format, SourceType.USER, {})
+
     try:
-        trades = trade_pal.get_trades_by_user(user_id)
+        # with limit or cursor a keyset page, otherwise the whole list
+        if limit or cursor:
+            page = trade_pal.get_trades_page(user_id, limit or TRADE_PAGE_DEFAULT_LIMIT, cursor, SourceType.USER, {})
+            return JSONResponse(page)
+
+        trades = trade_pal.get_trade_list(user_id, SourceType.USER, {})
         if not trades:
             raise HTTPException(status_code=404, detail="No trades found for this user.")
-        return trades
+        # the rows are already JSON values, so the response skips FastAPI's per-value encoding
+        return JSONResponse(trades)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
 
 @router.get("/api/trademind/trades/backtest/{backtest_id}")
-def get_trades_by_backtest(backtest_id: int, current_user: dict = Depends(get_current_user)):
+def get_trades_by_backtest(backtest_id: int,
+                           limit: Optional[int] = Query(None, ge=1, le=TRADE_PAGE_MAX_LIMIT),
+                           cursor: Optional[str] = None,
+                           export_format: Optional[str] = Query(None, alias="format", pattern=EXPORT_FORMAT_PATTERN),
+                           current_user: dict = Depends(get_current_user), trade_pal: TradePAL = Depends(get_trade_pal)):
+    filters = {"backtest_id": backtest_id}
+    if export_format:
+        return export_trades_response(None, export_format, SourceType.BACKTEST, filters)
+
     try:
-        trades = trade_pal.get_trades_by_backtest(backtest_id)
+        if limit or cursor:
+            page = trade_pal.get_trades_page(None, limit or TRADE_PAGE_DEFAULT_LIMIT, cursor, SourceType.BACKTEST,
+                                             filters)
+            return JSONResponse(page)
+
+        trades = trade_pal.get_trade_list(None, SourceType.BACKTEST, filters)
         if not trades:
             raise HTTPException(status_code=404, detail="No trades found for this backtest.")
-        return trades
+        # the rows are already JSON values, so the response skips FastAPI's per-value encoding
+        return JSONResponse(trades)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
 
 @router.post("/api/trademind/trades/user/{user_id}/filter")
-def filter_trades(user_id: int, filters: dict, current_user: dict = Depends(get_current_user)):
+def filter_trades(user_id: int, filters: dict,
+                  limit: Optional[int] = Query(None, ge=1, le=TRADE_PAGE_MAX_LIMIT),
+                  cursor: Optional[str] = None,
+                  export_format: Optional[str] = Query(None, alias="format", pattern=EXPORT_FORMAT_PATTERN),
+                  current_user: dict = Depends(get_current_user), trade_pal: TradePAL = Depends(get_trade_pal)):
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to filter these trades.")
 
+    if export_format:
+        return export_trades_response(user_id, export_format, SourceType.USER, filters)
+
     try:
-        trades = trade_pal.get_trades_by_field(user_id, SourceType.USER, **filters)
+        if limit or cursor:
+            page = trade_pal.get_trades_page(user_id, limit or TRADE_PAGE_DEFAULT_LIMIT, cursor, SourceType.USER,
+                                             filters)
+            return JSONResponse(page)
+
+        trades = trade_pal.get_trade_list(user_id, SourceType.USER, filters)
 
         if not trades:
             raise HTTPException(status_code=404, detail="No trades found matching the filters.")
 
-        return trades
+        # the rows are already JSON values, so the response skips FastAPI's per-value encoding
+        return JSONResponse(trades)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
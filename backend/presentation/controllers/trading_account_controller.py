@@ -7,22 +7,24 @@ from presentation.pal.trading_account_pal import TradingAccountPAL
 from presentation.pao.services.trading_account_pao_service import TradingAccountPAOService
 from configurations.jws_authentification import get_current_user
 
+from sqlalchemy.orm import Session
 from database import get_db
 
 
 router = APIRouter()
 
-db = next(get_db())
-account_dal = TradingAccountDAL(db)
-account_bao = TradingAccountBAOService(account_dal)
-account_bal = TradingAccountBAL(account_bao)
-account_pao = TradingAccountPAOService(account_bal)
-account_pal = TradingAccountPAL(account_pao)
+def get_account_pal(db: Session = Depends(get_db)) -> TradingAccountPAL:
+    # the stack is built per request around its own pooled session
+    account_dal = TradingAccountDAL(db)
+    account_bao = TradingAccountBAOService(account_dal)
+    account_bal = TradingAccountBAL(account_bao)
+    account_pao = TradingAccountPAOService(account_bal)
+    return TradingAccountPAL(account_pao)
 
 
 # Create & Delete
 @router.post("/api/trademind/trading_accounts/add_account")
-def register_trading_account(account_data: dict):
+def register_trading_account(account_data: dict, account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         # account_data["user_id"] = current_user["user_id"]
         new_account = account_pal.register_trading_account(account_data)
@@ -34,7 +36,7 @@ def register_trading_account(account_data: dict):
 
 
 @router.delete("/api/trademind/trading_accounts/delete_account/{account_id}")
-def delete_trading_account(account_id: int, current_user: dict = Depends(get_current_user)):
+def delete_trading_account(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         account = account_pal.get_credentials_by_id(account_id)
 
@@ -47,7 +49,7 @@ def delete_trading_account(account_id: int, current_user: dict = Depends(get_cur
 
 # Getters
 @router.get("/api/trademind/trading_accounts/{account_id}/get_account_info")
-def get_account_info_by_id(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_account_info_by_id(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     account_bto = account_pal.get_credentials_by_id(account_id)
     account = account_pal.get_account_info_by_id(account_id)
     if not account or account_bto.user_id != current_user["user_id"]:
@@ -56,7 +58,7 @@ def get_account_info_by_id(account_id: int, current_user: dict = Depends(get_cur
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/get_account_info/reload")
-def reload_account_info_by_id(account_id: int, current_user: dict = Depends(get_current_user)):
+def reload_account_info_by_id(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     account_bto = account_pal.get_credentials_by_id(account_id)
     account = account_pal.get_account_info_by_id(account_id, force_reload=True)
     if not account or account_bto.user_id != current_user["user_id"]:
@@ -65,7 +67,7 @@ def reload_account_info_by_id(account_id: int, current_user: dict = Depends(get_
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/trade_history")
-def get_trade_history(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_trade_history(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         account_bto = account_pal.get_credentials_by_id(account_id)
         trade_history = account_pal.get_trade_history_by_id(account_id)
@@ -77,7 +79,7 @@ def get_trade_history(account_id: int, current_user: dict = Depends(get_current_
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/active_trades")
-def get_active_trades(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_active_trades(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         account_bto = account_pal.get_credentials_by_id(account_id)
         active_trades = account_pal.get_active_trades_by_id(account_id)
@@ -89,7 +91,7 @@ def get_active_trades(account_id: int, current_user: dict = Depends(get_current_
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/performance")
-def get_account_performance(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_account_performance(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         account_bto = account_pal.get_credentials_by_id(account_id)
         performance_data = account_pal.get_account_performance(account_id)
@@ -101,7 +103,7 @@ def get_account_performance(account_id: int, current_user: dict = Depends(get_cu
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/stats")
-def get_account_stats(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_account_stats(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         account_bto = account_pal.get_credentials_by_id(account_id)
         stats = account_pal.get_account_stats(account_id)
@@ -113,7 +115,7 @@ def get_account_stats(account_id: int, current_user: dict = Depends(get_current_
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/trading_journal")
-def get_account_trading_journal(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_account_trading_journal(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     try:
         account_bto = account_pal.get_credentials_by_id(account_id)
         journal = account_pal.get_trade_history_by_id(account_id)
@@ -125,7 +127,7 @@ def get_account_trading_journal(account_id: int, current_user: dict = Depends(ge
 
 
 @router.get("/api/trademind/trading_accounts/{account_id}/credentials")
-def get_credentials(account_id: int, current_user: dict = Depends(get_current_user)):
+def get_credentials(account_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     account = account_pal.get_credentials_by_id(account_id)
     if not account or account.user_id != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="Not authorized to view credentials.")
@@ -134,7 +136,7 @@ def get_credentials(account_id: int, current_user: dict = Depends(get_current_us
 
 
 @router.get("/api/trademind/trading_accounts/brroker/{broker_name}")
-def get_accounts_by_broker(broker_name: str, current_user: dict = Depends(get_current_user)):
+def get_accounts_by_broker(broker_name: str, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     all_accounts = account_pal.get_accounts_by_broker(broker_name)
     user_accounts = [acc for acc in all_accounts if acc.user_id == current_user["user_id"]]
     return user_accounts
@@ -142,7 +144,7 @@ def get_accounts_by_broker(broker_name: str, current_user: dict = Depends(get_cu
 
 # Get all accounts
 @router.get("/api/trademind/trading_accounts/accounts/{user_id}")
-def get_user_accounts(user_id: int, current_user: dict = Depends(get_current_user)):
+def get_user_accounts(user_id: int, current_user: dict = Depends(get_current_user), account_pal: TradingAccountPAL = Depends(get_account_pal)):
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view these accounts.")
     accounts = account_pal.get_trading_accounts(user_id)
@@ -4,6 +4,7 @@ from business.bao.services.user_bao_service import UserBAOService
 from persistence.dal.user_dal import UserDAL
 from presentation.pao.services.user_pao_service import UserPAOService
 from business.bal.user_bal import UserBAL
+from sqlalchemy.orm import Session
 from database import get_db
 from presentation.pal.user_pal import UserPAL, PasswordRequest
 from configurations.jws_authentification import get_current_user
@@ -11,17 +12,17 @@ from configurations.jws_authentification import get_current_user
 
 router = APIRouter()
 
-db = next(get_db())
-
-user_dal = UserDAL(db)
-user_bao = UserBAOService(user_dal)
-user_bal = UserBAL(user_bao)
-user_pao = UserPAOService(user_bal)
-user_pal = UserPAL(user_pao)
+def get_user_pal(db: Session = Depends(get_db)) -> UserPAL:
+    # the stack is built per request around its own pooled session
+    user_dal = UserDAL(db)
+    user_bao = UserBAOService(user_dal)
+    user_bal = UserBAL(user_bao)
+    user_pao = UserPAOService(user_bal)
+    return UserPAL(user_pao)
 
 
 @router.post("/api/trademind/users/register")
-def register_user(user_data: dict):
+def register_user(user_data: dict, user_pal: UserPAL = Depends(get_user_pal)):
     try:
         return user_pal.register_user(user_data)
     except ValueError as e:
@@ -29,7 +30,7 @@ def register_user(user_data: dict):
 
 
 @router.post("/api/trademind/users/login")
-def login_user(user_data: dict):
+def login_user(user_data: dict, user_pal: UserPAL = Depends(get_user_pal)):
     try:
         return user_pal.login_user(user_data)
     except ValueError as e:
@@ -37,7 +38,7 @@ def login_user(user_data: dict):
 
 
 @router.get("/api/trademind/users/verify-email")
-def verify_email(token: str):
+def verify_email(token: str, user_pal: UserPAL = Depends(get_user_pal)):
     try:
         return user_pal.verify_user_email_by_token(token)
     except ValueError as e:
@@ -45,7 +46,7 @@ def verify_email(token: str):
 
 
 @router.post("/api/trademind/users/forgot-password")
-def forgot_password(user_data: dict):
+def forgot_password(user_data: dict, user_pal: UserPAL = Depends(get_user_pal)):
     try:
         email = user_data.get("email")
         if not email:
@@ -57,7 +58,7 @@ def forgot_password(user_data: dict):
 
 
 @router.put("/api/trademind/users/reset-password")
-def reset_password(user_data: dict):
+def reset_password(user_data: dict, user_pal: UserPAL = Depends(get_user_pal)):
     try:
         token = user_data.get("token")
         new_password = user_data.get("new_password")
@@ -72,7 +73,7 @@ def reset_password(user_data: dict):
 
 
 @router.put("/api/trademind/users/update-password")
-def update_password(user_data: dict, current_user: dict = Depends(get_current_user)):
+def update_password(user_data: dict, current_user: dict = Depends(get_current_user), user_pal: UserPAL = Depends(get_user_pal)):
     email_from_token = current_user.get("sub")
     email_from_request = user_data.get("email")
 
@@ -93,7 +94,7 @@ def update_password(user_data: dict, current_user: dict = Depends(get_current_us
 
 
 @router.get("/api/trademind/users/details/{user_id}")
-def get_user_details(user_id: int, current_user: dict = Depends(get_current_user)):
+def get_user_details(user_id: int, current_user: dict = Depends(get_current_user), user_pal: UserPAL = Depends(get_user_pal)):
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized.")
 
@@ -104,7 +105,7 @@ def get_user_details(user_id: int, current_user: dict = Depends(get_current_user
 
 
 @router.put("/api/trademind/users/{user_id}")
-def update_user_details(user_id: int, user_data: dict, current_user: dict = Depends(get_current_user)):
+def update_user_details(user_id: int, user_data: dict, current_user: dict = Depends(get_current_user), user_pal: UserPAL = Depends(get_user_pal)):
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized.")
 
@@ -117,7 +118,7 @@ def update_user_details(user_id: int, user_data: dict, current_user: dict = Depe
 
 
 @router.post("/api/trademind/users/password")
-def get_user_by_password(request: PasswordRequest):
+def get_user_by_password(request: PasswordRequest, user_pal: UserPAL = Depends(get_user_pal)):
     user_entity = user_pal.get_user_by_password(request.password)
 
     if not user_entity:
@@ -127,7 +128,7 @@ def get_user_by_password(request: PasswordRequest):
 
 
 @router.delete("/api/trademind/users/{email}")
-def delete_user(email: str):
+def delete_user(email: str, user_pal: UserPAL = Depends(get_user_pal)):
     try:
         user_pal.delete_user(email)
         return {"message": "User successfully deleted"}
@@ -136,7 +137,7 @@ def delete_user(email: str):
 
 
 @router.get("/api/trademind/users")
-def get_all_users():
+def get_all_users(user_pal: UserPAL = Depends(get_user_pal)):
     return user_pal.get_all_users()
 
 
@@ -11,9 +11,45 @@ class BacktestPAL:
     def run_backtest_preview(self, data: Dict) -> dict:
         return self.pao.run_backtest_preview(data)
 
+    def run_portfolio_preview(self, data: Dict) -> dict:
+        return self.pao.run_portfolio_preview(data)
+
+    def run_backtest_optimization(self, data: Dict) -> dict:
+        return self.pao.run_backtest_optimization(data)
+
+    def run_walk_forward(self, data: Dict) -> dict:
+        return self.pao.run_walk_forward(data)
+
+    def submit_backtest_job(self, data: Dict) -> Dict:
+        return self.pao.submit_backtest_job(data)
+
+    def get_backtest_job(self, job_id: str) -> Optional[Dict]:
+        return self.pao.get_backtest_job(job_id)
+
+    def get_backtest_job_result(self, job_id: str) -> Optional[dict]:
+        return self.pao.get_backtest_job_result(job_id)
+
+    def get_backtest_jobs_by_user(self, user_id: int) -> List[Dict]:
+        return self.pao.get_backtest_jobs_by_user(user_id)
+
+    def cancel_backtest_job(self, job_id: str) -> Optional[Dict]:
+        return self.pao.cancel_backtest_job(job_id)
+
+    def get_cache_stats(self) -> Dict:
+        return self.pao.get_cache_stats()
+
+    def run_monte_carlo(self, backtest_id: int, data: Dict) -> Optional[dict]:
+        return self.pao.run_monte_carlo(backtest_id, data)
+
+    def run_monte_carlo_preview(self, data: Dict) -> dict:
+        return self.pao.run_monte_carlo_preview(data)
+
     def get_backtest_by_id(self, backtest_id: int) -> Optional[Dict]:
         return self.pao.get_backtest_by_id(backtest_id)
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[Dict]:
+        return self.pao.get_balance_curve(backtest_id, resolution)
+
     def get_backtests_by_user(self, user_id: int) -> List[Dict]:
         return self.pao.get_backtests_by_user(user_id)
 
@@ -7,3 +7,6 @@ class ChartDataPAL:
 
     def get_chart_data(self, data: Dict) -> Dict:
         return self.chart_data_pao.get_chart_data(data)
+
+    def get_store_stats(self) -> Dict:
+        return self.chart_data_pao.get_store_stats()
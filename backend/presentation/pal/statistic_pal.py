@@ -24,3 +24,6 @@ class StatisticPAL:
 
     def generate_statistics(self, data: Dict) -> Dict:
         return self.pao.generate_statistics(data)
+
+    def get_cache_stats(self) -> Dict:
+        return self.pao.get_cache_stats()
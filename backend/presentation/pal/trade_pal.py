@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List, Optional
 
 from presentation.pao.services.trade_pao_service import TradePAOService
 from persistence.entities.utils_entity import SourceType
@@ -25,3 +25,14 @@ class TradePAL:
 
     def get_trades_by_backtest(self, backtest_id: int) -> List[dict]:
         return self.pao.get_trades_by_backtest(backtest_id)
+
+    def get_trade_list(self, user_id: Optional[int], source: SourceType, filters: dict) -> List[dict]:
+        return self.pao.get_trade_list(user_id, source, filters)
+
+    def get_trades_page(self, user_id: Optional[int], limit: int, cursor: Optional[str], source: SourceType,
+                        filters: dict) -> dict:
+        return self.pao.get_trades_page(user_id, limit, cursor, source, filters)
+
+    def export_trades(self, user_id: Optional[int], export_format: str, source: SourceType,
+                      filters: dict) -> Iterator[str]:
+        return self.pao.export_trades(user_id, export_format, source, filters)
@@ -4,9 +4,48 @@ class BacktestPAOInterface:
     def save_backtest(self, data: Dict) -> Dict:
         pass
 
+    def run_backtest_preview(self, data: Dict) -> dict:
+        pass
+
+    def run_portfolio_preview(self, data: Dict) -> dict:
+        pass
+
+    def run_backtest_optimization(self, data: Dict) -> dict:
+        pass
+
+    def run_walk_forward(self, data: Dict) -> dict:
+        pass
+
+    def submit_backtest_job(self, data: Dict) -> Dict:
+        pass
+
+    def get_backtest_job(self, job_id: str) -> Optional[Dict]:
+        pass
+
+    def get_backtest_job_result(self, job_id: str) -> Optional[dict]:
+        pass
+
+    def get_backtest_jobs_by_user(self, user_id: int) -> List[Dict]:
+        pass
+
+    def cancel_backtest_job(self, job_id: str) -> Optional[Dict]:
+        pass
+
+    def get_cache_stats(self) -> Dict:
+        pass
+
+    def run_monte_carlo(self, backtest_id: int, data: Dict) -> Optional[dict]:
+        pass
+
+    def run_monte_carlo_preview(self, data: Dict) -> dict:
+        pass
+
     def get_backtest_by_id(self, backtest_id: int) -> Optional[Dict]:
         pass
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[Dict]:
+        pass
+
     def get_backtests_by_user(self, user_id: int) -> List[Dict]:
         pass
 
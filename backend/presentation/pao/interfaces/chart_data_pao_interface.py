@@ -3,3 +3,6 @@ from typing import Dict
 class ChartDataPAOInterface:
     def get_chart_data(self, data: Dict) -> Dict:
         pass
+
+    def get_store_stats(self) -> Dict:
+        pass
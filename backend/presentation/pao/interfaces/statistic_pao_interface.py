@@ -19,3 +19,6 @@ class StatisticPAOInterface:
 
     def generate_statistics(self, data: Dict) -> Dict:
         pass
+
+    def get_cache_stats(self) -> Dict:
+        pass
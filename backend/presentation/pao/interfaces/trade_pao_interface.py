@@ -1,4 +1,5 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy.engine import Row
 
 from business.bto.trade_bto import TradeBTO
 from persistence.entities.utils_entity import SourceType
@@ -28,3 +29,17 @@ class TradePAOInterface:
 
     def get_trades_by_backtest(self, backtest_id: int) -> List[dict]:
         pass
+
+    def row_to_response(self, row: Row) -> Dict:
+        pass
+
+    def get_trade_list(self, user_id: Optional[int], source: SourceType, filters: dict) -> List[dict]:
+        pass
+
+    def get_trades_page(self, user_id: Optional[int], limit: int, cursor: Optional[str], source: SourceType,
+                        filters: dict) -> dict:
+        pass
+
+    def export_trades(self, user_id: Optional[int], export_format: str, source: SourceType,
+                      filters: dict) -> Iterator[str]:
+        pass
@@ -68,33 +68,153 @@ class BacktestPAOService(BacktestPAOInterface):
 
 
     def save_backtest(self, data: Dict) -> Dict:
-        bto_data = {k: v for k, v in data.items() if k not in ["metrics", "executed_trades"]}
-        bto = self.request_to_bto(bto_data)
+        # the result is taken from the server-side preview, the client only sends its token
+        for key in ["user_id", "preview_token"]:
+            if key not in data:
+                raise ValueError(f"Missing field: {key}")
+
+        saved_bto = self.bal.save_backtest_from_preview(data["preview_token"], data["user_id"], data.get("name"))
 
-        metrics = data.get("metrics")
-        executed_trades = data.get("executed_trades", [])
+        return self.bto_to_response(saved_bto)
 
-        if metrics:
-            bto.total_profit = metrics.get("total_profit")
-            bto.drawdown_max = metrics.get("drawdown_max")
-            bto.winrate = metrics.get("winrate")
-            bto.nr_trades = metrics.get("nr_trades")
-            bto.profit_factor = metrics.get("profit_factor")
-            bto.expectancy = metrics.get("expectancy")
-            bto.balance_curve = metrics.get("balance_curve")
+    def _positive_int_fields(self, data: Dict, keys: List[str]) -> None:
+        for key in keys:
+            if data.get(key) is not None and (not isinstance(data[key], int) or data[key] < 1):
+                raise ValueError(f"{key} must be a positive integer.")
 
-        saved_bto = self.bal.save_backtest(bto, executed_trades)
+    # Request parsing shared by the synchronous endpoints and the job queue
+    def _preview_args(self, data: Dict) -> tuple:
+        return (self.request_to_bto(data),)
 
-        return self.bto_to_response(saved_bto)
+    def _portfolio_args(self, data: Dict) -> tuple:
+        legs = data.get("legs")
+        if not isinstance(legs, list) or not legs:
+            raise ValueError("legs must be a non-empty list.")
 
-    def run_backtest_preview(self, data: Dict) -> dict:
+        leg_btos, leg_parameters = [], []
+        for leg in legs:
+            for key in ["symbol", "strategy_id"]:
+                if key not in leg:
+                    raise ValueError(f"Missing leg field: {key}")
+            parameters = leg.get("parameters") or {}
+            if not isinstance(parameters, dict):
+                raise ValueError("Leg parameters must be a dictionary.")
+
+            leg_btos.append(self.request_to_bto({**data, "symbol": leg["symbol"], "strategy_id": leg["strategy_id"]}))
+            leg_parameters.append(parameters)
+
+        return leg_btos, leg_parameters
+
+    def _optimization_args(self, data: Dict) -> tuple:
         bto = self.request_to_bto(data)
-        return self.bal.run_backtest_preview(bto)
+        self._positive_int_fields(data, ["top_n", "max_workers"])
+
+        optimization = {
+            "parameter_grid": data.get("parameter_grid"),
+            "sampling": data.get("sampling"),
+            "rank_by": data.get("rank_by"),
+            "top_n": data.get("top_n"),
+            "max_workers": data.get("max_workers")
+        }
+        return bto, optimization
+
+    def _walk_forward_args(self, data: Dict) -> tuple:
+        bto = self.request_to_bto(data)
+        for key in ["in_sample_days", "out_of_sample_days"]:
+            if key not in data:
+                raise ValueError(f"Missing field: {key}")
+        self._positive_int_fields(data, ["in_sample_days", "out_of_sample_days", "step_days", "max_workers"])
+
+        walk_forward = {
+            "parameter_grid": data.get("parameter_grid"),
+            "sampling": data.get("sampling"),
+            "rank_by": data.get("rank_by"),
+            "in_sample_days": data["in_sample_days"],
+            "out_of_sample_days": data["out_of_sample_days"],
+            "step_days": data.get("step_days"),
+            "anchored": bool(data.get("anchored", False)),
+            "max_workers": data.get("max_workers")
+        }
+        return bto, walk_forward
+
+    def run_backtest_preview(self, data: Dict) -> dict:
+        return self.bal.run_backtest_preview(*self._preview_args(data))
+
+    def run_portfolio_preview(self, data: Dict) -> dict:
+        return self.bal.run_portfolio_preview(*self._portfolio_args(data))
+
+    def run_backtest_optimization(self, data: Dict) -> dict:
+        return self.bal.run_backtest_optimization(*self._optimization_args(data))
+
+    def run_walk_forward(self, data: Dict) -> dict:
+        return self.bal.run_walk_forward(*self._walk_forward_args(data))
+
+    def submit_backtest_job(self, data: Dict) -> Dict:
+        parsers = {
+            "preview": self._preview_args,
+            "portfolio": self._portfolio_args,
+            "optimize": self._optimization_args,
+            "walk-forward": self._walk_forward_args,
+        }
+        for key in ["kind", "user_id"]:
+            if key not in data:
+                raise ValueError(f"Missing field: {key}")
+        if data["kind"] not in parsers:
+            raise ValueError(f"Invalid job kind '{data['kind']}', expected one of {list(parsers)}.")
+
+        args = parsers[data["kind"]](data)
+        return self.bal.submit_backtest_job(data["user_id"], data["kind"], args)
+
+    def get_cache_stats(self) -> Dict:
+        return self.bal.get_cache_stats()
+
+    def get_backtest_job(self, job_id: str) -> Optional[Dict]:
+        return self.bal.get_backtest_job(job_id)
+
+    def get_backtest_job_result(self, job_id: str) -> Optional[dict]:
+        return self.bal.get_backtest_job_result(job_id)
+
+    def get_backtest_jobs_by_user(self, user_id: int) -> List[Dict]:
+        return self.bal.get_backtest_jobs_by_user(user_id)
+
+    def cancel_backtest_job(self, job_id: str) -> Optional[Dict]:
+        return self.bal.cancel_backtest_job(job_id)
+
+    def _monte_carlo_options(self, data: Dict) -> Dict:
+        self._positive_int_fields(data, ["n_paths"])
+        if data.get("seed") is not None and not isinstance(data["seed"], int):
+            raise ValueError("seed must be an integer.")
+
+        return {
+            "n_paths": data.get("n_paths") or 1000,
+            "method": data.get("method") or "bootstrap",
+            "compounding": bool(data.get("compounding", True)),
+            "seed": data.get("seed")
+        }
+
+    def run_monte_carlo(self, backtest_id: int, data: Dict) -> Optional[dict]:
+        return self.bal.run_monte_carlo(backtest_id, self._monte_carlo_options(data))
+
+    def run_monte_carlo_preview(self, data: Dict) -> dict:
+        for key in ["executed_trades", "initial_balance"]:
+            if key not in data:
+                raise ValueError(f"Missing field: {key}")
+        if not isinstance(data["executed_trades"], list):
+            raise ValueError("executed_trades must be a list.")
+        if any("profit" not in t for t in data["executed_trades"]):
+            raise ValueError("Every executed trade needs a profit.")
+
+        return self.bal.run_monte_carlo_preview(
+            data["executed_trades"], float(data["initial_balance"]), self._monte_carlo_options(data)
+        )
 
     def get_backtest_by_id(self, backtest_id: int) -> Optional[Dict]:
         bto = self.bal.get_backtest_by_id(backtest_id)
         return self.bto_to_response(bto) if bto else None
 
+    def get_balance_curve(self, backtest_id: int, resolution: str) -> Optional[Dict]:
+        return self.bal.get_balance_curve(backtest_id, resolution)
+
     def get_backtests_by_user(self, user_id: int) -> List[Dict]:
         backtests = self.bal.get_backtests_by_user(user_id)
         return [self.bto_to_response(b) for b in backtests]
@@ -10,3 +10,6 @@ class ChartDataPAOService(ChartDataPAOInterface):
         if "symbol" not in data or "time_frame" not in data or "start_date" not in data or "end_date" not in data:
             raise ValueError("Missing required fields: symbol, time_frame, start_date, end_date.")
         return self.bal.get_chart_data(data)
+
+    def get_store_stats(self) -> Dict:
+        return self.bal.get_store_stats()
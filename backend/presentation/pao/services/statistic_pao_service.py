@@ -59,3 +59,6 @@ class StatisticPAOService(StatisticPAOInterface):
     def generate_statistics(self, data: Dict) -> Dict:
         bto = self.request_to_bto(data)
         return self.bal.generate_statistics(bto)
+
+    def get_cache_stats(self) -> Dict:
+        return self.bal.get_cache_stats()
@@ -1,4 +1,8 @@
-from typing import Dict, List
+import csv
+import io
+import json
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy.engine import Row
 
 from presentation.pao.interfaces.trade_pao_interface import TradePAOInterface
 from business.bal.trade_bal import TradeBAL
@@ -6,6 +10,10 @@ from business.bto.trade_bto import TradeBTO
 from persistence.entities.utils_entity import SourceType
 
 
+# rows written per chunk of a streamed export
+EXPORT_CHUNK_ROWS = 500
+
+
 class TradePAOService(TradePAOInterface):
     def __init__(self, bal: TradeBAL):
         self.bal = bal
@@ -99,3 +107,71 @@ class TradePAOService(TradePAOInterface):
     def get_trades_by_backtest(self, backtest_id: int) -> List[dict]:
         trades_bto = self.bal.get_trades_by_backtest(backtest_id)
         return [self.bto_to_response(trade) for trade in trades_bto]
+
+    def row_to_response(self, row: Row) -> Dict:
+        # Same dict as bto_to_response after FastAPI's encoding, built straight from a lean row.
+        # Unpacking follows TRADE_ROW_FIELDS and is much cheaper than attribute access on a Row.
+        (trade_id, user_id, market, volume, trade_type, open_date, open_time, close_date, close_time, session,
+         open_price, close_price, sl_price, tp_price, swap, commission, profit, pips, link_photo,
+         source_type, backtest_id) = row
+        return {
+            "id": trade_id,
+            "user_id": user_id,
+
+            "market": market,
+            "volume": volume,
+            "type": trade_type.value,
+
+            "open_date": open_date.isoformat(),
+            "open_time": open_time.isoformat(),
+            "close_date": close_date.isoformat() if close_date is not None else None,
+            "close_time": close_time.isoformat() if close_time is not None else None,
+            "session": session.value if session is not None else None,
+
+            "open_price": open_price,
+            "close_price": close_price,
+            "sl_price": sl_price,
+            "tp_price": tp_price,
+
+            "swap": swap,
+            "commission": commission,
+            "profit": profit,
+            "pips": pips,
+
+            "link_photo": link_photo,
+
+            "source_type": source_type.value,
+            "backtest_id": backtest_id,
+        }
+
+    def get_trade_list(self, user_id: Optional[int], source: SourceType, filters: dict) -> List[dict]:
+        return [self.row_to_response(row) for row in self.bal.get_trade_rows(user_id, source, **filters)]
+
+    def get_trades_page(self, user_id: Optional[int], limit: int, cursor: Optional[str], source: SourceType,
+                        filters: dict) -> dict:
+        rows, next_cursor = self.bal.get_trades_page(user_id, limit, cursor, source, **filters)
+        return {"items": [self.row_to_response(row) for row in rows], "next_cursor": next_cursor}
+
+    def export_trades(self, user_id: Optional[int], export_format: str, source: SourceType,
+                      filters: dict) -> Iterator[str]:
+        # NDJSON or CSV text in chunks, only one chunk of trades is held at a time
+        rows = (self.row_to_response(row) for row in self.bal.stream_trades(user_id, source, **filters))
+        buffer = io.StringIO()
+        writer = None
+
+        for nr, row in enumerate(rows, start=1):
+            if export_format == "csv":
+                if writer is None:
+                    writer = csv.writer(buffer)
+                    writer.writerow(row.keys())
+                writer.writerow(row.values())
+            else:
+                buffer.write(json.dumps(row) + "\n")
+
+            if nr % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
@@ -0,0 +1,19 @@
+import sys
+from database import SessionLocal
+from init_db import init_db
+from persistence.dao.repositories.trade_aggregate_repository import TradeAggregateRepository
+
+
+# Backfill of the trade_aggregates table, for everyone or for one user:
+#   python rebuild_trade_aggregates.py [user_id]
+def rebuild_trade_aggregates(user_id=None):
+    init_db()
+    db = SessionLocal()
+    try:
+        rows = TradeAggregateRepository(db).rebuild(user_id)
+        print(f"Rebuilt {rows} trade aggregate rows" + (f" for user {user_id}." if user_id is not None else "."))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_trade_aggregates(int(sys.argv[1]) if len(sys.argv) > 1 else None)
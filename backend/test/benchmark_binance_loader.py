@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Binance kline downloads against a local stub of /api/v3/klines, no network needed. The stub answers like
+# Binance (string prices, at most `limit` klines from startTime, endTime inclusive, used weight header)
+# after a fixed delay that stands in for the round trip. The page-by-page pd.concat loop the loader used
+# to run is timed against the pooled, concurrent BinanceLoader, their candles are compared, and the stub
+# counts the TCP connections each one opened. From backend/:
+#   python -m test.benchmark_binance_loader [days of 1m candles...] [--latency 0.05]
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import numpy as np
+import pandas as pd
+import requests
+
+from business.utils.chart_data_loader import BinanceLoader
+
+STEP_MS = {"1m": 60_000, "1h": 3_600_000, "1d": 86_400_000}
+
+
+class StubKlines(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+    requests_served = 0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubKlines.lock:
+            StubKlines.connections += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/api/v3/klines":
+            return self.reply(404, {"code": -1, "msg": "Not found"})
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if query.get("interval") not in STEP_MS:
+            return self.reply(400, {"code": -1120, "msg": "Invalid interval."})
+
+        step = STEP_MS[query["interval"]]
+        first = -(-int(query["startTime"]) // step) * step
+        opens = np.arange(first, int(query["endTime"]) + 1, step)[:int(query.get("limit", 500))]
+        # a deterministic walk, so every client sees the same prices for the same candle
+        close = 30000 + 500 * np.sin(opens / 3.7e8) + 40 * np.cos(opens / 1.1e6)
+        klines = [[t, f"{c - 3:.2f}", f"{c + 7:.2f}", f"{c - 9:.2f}", f"{c:.2f}", f"{v:.5f}", t + step - 1,
+                   "0", 100, "0", "0", "0"]
+                  for t, c, v in zip(opens.tolist(), close.tolist(), (opens % 997 / 13).tolist())]
+
+        time.sleep(self.latency)
+        with StubKlines.lock:
+            StubKlines.requests_served += 1
+        self.reply(200, klines)
+
+    def reply(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", "2")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_fetch(base_url: str, symbol: str, interval: str, start: str, end: str, limit: int = 1000) -> pd.DataFrame:
+    # the loader before the pooled fetcher: one bare request per page, the frame grown with pd.concat
+    start_ts = int(datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+    end_ts = int(datetime.strptime(end, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+    df_all = pd.DataFrame()
+    while start_ts < end_ts:
+        params = {"symbol": symbol.upper(), "interval": interval, "startTime": start_ts, "endTime": end_ts,
+                  "limit": limit}
+        response = requests.get(base_url + "/api/v3/klines", params=params)
+        if response.status_code != 200:
+            raise Exception(f"Binance API error: {response.status_code} - {response.json().get('msg', '')}")
+        data = response.json()
+        if not data:
+            break
+        df = pd.DataFrame(data, columns=[
+            "open_time", "open", "high", "low", "close", "volume", "close_time", "quote_asset_volume",
+            "number_of_trades", "taker_buy_base_volume", "taker_buy_quote_volume", "ignore"
+        ])
+        df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
+        df = df.set_index("open_time")
+        df = df[["open", "high", "low", "close", "volume"]].astype(float)
+        df_all = pd.concat([df_all, df])
+        start_ts = data[-1][0] + 1
+    return df_all.sort_index()
+
+
+def measure(call):
+    requests_before, connections_before = StubKlines.requests_served, StubKlines.connections
+    started = time.perf_counter()
+    result = call()
+    return (result, time.perf_counter() - started, StubKlines.requests_served - requests_before,
+            StubKlines.connections - connections_before)
+
+
+def main(days_list, latency: float):
+    StubKlines.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubKlines)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    loader = BinanceLoader(base_url=base_url)
+
+    print(f"stub latency {latency * 1000:.0f} ms, concurrency {loader.max_concurrency}\n")
+    print(f"{'1m candles':>12s} {'pages':>6s} {'legacy s':>9s} {'conns':>6s} {'loader s':>9s} {'conns':>6s} "
+          f"{'speedup':>8s}  same")
+    for days in days_list:
+        end = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        start, end = (end - timedelta(days=days)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+        legacy, legacy_s, pages, legacy_conns = measure(lambda: legacy_fetch(base_url, "BTCUSDT", "1m", start, end))
+        (df, candles), loader_s, _, loader_conns = measure(
+            lambda: loader.get_historical_data("BTCUSDT", "1m", start, end))
+
+        # the legacy loop also returned the candle at the end midnight, the loader's end is exclusive
+        legacy = legacy[legacy.index < pd.Timestamp(end)]
+        same = legacy.index.equals(df.index) and np.array_equal(legacy.to_numpy(), df.to_numpy())
+        print(f"{len(candles):12,d} {pages:6d} {legacy_s:9.2f} {legacy_conns:6d} {loader_s:9.2f} {loader_conns:6d} "
+              f"{legacy_s / loader_s:7.1f}x  {same}")
+        if not same:
+            raise AssertionError(f"{days} days: the loader's candles differ from the legacy loop's")
+
+    # the app's interval names map to Binance's
+    _, hourly = loader.get_historical_data("BTCUSDT", "60m", "2023-12-01", "2024-01-01")
+    _, daily = loader.get_historical_data("BTCUSDT", "daily", "2023-01-01", "2024-01-01")
+    print(f"\n60m: {len(hourly)} candles, daily: {len(daily)} candles")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    latency = 0.05
+    if "--latency" in args:
+        at = args.index("--latency")
+        latency = float(args[at + 1])
+        del args[at:at + 2]
+    main([int(days) for days in args] or [7, 30, 365], latency)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Chart and backtest candle loads through the local candle store against a recorded fixture, offline.
+# The fixture is replayed by a fetcher that sleeps like a provider round trip, counts its calls and
+# answers exactly what the provider recorded for the asked range. Every load is checked against the
+# fixture, then cold, warm, extended and overlapping ranges are timed, and a second store on the
+# same directory checks that nothing is refetched after a restart. From backend/:
+#   python -m test.benchmark_candle_store [fixture.npz] [latency_s]
+# Record a fixture once, with network access:
+#   python -m test.benchmark_candle_store record yahoo EURUSD=X 60m 2023-01-01 2024-01-01 fixture.npz
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+
+from business.utils.candle_series import CandleSeries
+from business.utils.candle_store import CandleStore, COLUMNS
+from business.utils.chart_data_loader import BinanceLoader, YahooFinanceLoader, StoredCandleLoader
+
+DAY = 86400
+
+
+def date_ts(value: str) -> int:
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def synthetic_fixture(days: int = 365, step: int = 3600) -> CandleSeries:
+    # hourly candles ending at the current hour, weekends left out like a forex feed
+    rng = np.random.default_rng(11)
+    end = int(time.time()) // step * step
+    times = np.arange(end - days * DAY, end + step, step)
+    times = times[(times // DAY + 4) % 7 < 5]
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0008, len(times))), 5)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0004, len(times)))
+    return CandleSeries(times, open_, np.maximum(open_, close) + wick, np.minimum(open_, close) - wick, close,
+                        rng.integers(100, 5000, len(times)).astype(float))
+
+
+class RecordedFetcher:
+    def __init__(self, fixture: CandleSeries, latency: float):
+        self.fixture = fixture
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch_candles(self, symbol: str, interval: str, start_ts: int, end_ts: int) -> CandleSeries:
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((start_ts, end_ts))
+        part = self.fixture.between(start_ts, end_ts - 1)
+        # a provider answers with fresh arrays, not views of its data
+        return CandleSeries(*(np.array(getattr(part, name)) for name in COLUMNS))
+
+    def get_historical_data(self, symbol, interval="1m", start=None, end=None):
+        raise AssertionError("dated loads must go through the store")
+
+    @staticmethod
+    def to_dataframe(candles: CandleSeries):
+        return YahooFinanceLoader.to_dataframe(candles)
+
+
+def same_candles(a: CandleSeries, b: CandleSeries) -> bool:
+    return len(a) == len(b) and all(np.array_equal(getattr(a, name), getattr(b, name)) for name in COLUMNS)
+
+
+def timed_load(loader: StoredCandleLoader, fetcher: RecordedFetcher, fixture: CandleSeries, interval: str, start: str,
+               end: str):
+    calls_before = len(fetcher.calls)
+    started = time.perf_counter()
+    _, candles = loader.get_historical_data("EURUSD=X", interval, start, end)
+    elapsed = time.perf_counter() - started
+
+    expected = fixture.between(date_ts(start), date_ts(end) - 1)
+    if not same_candles(candles, expected):
+        raise AssertionError(f"{start}..{end}: {len(candles)} candles, the fixture has {len(expected)}")
+    return elapsed, len(fetcher.calls) - calls_before, len(candles)
+
+
+def day(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def run(fixture: CandleSeries, interval: str, latency: float):
+    # days from the fixture's span, the last one is still being formed for a fixture that ends now
+    first_day = int(fixture.time[0]) // DAY * DAY + DAY
+    last_day = int(fixture.time[-1]) // DAY * DAY
+    span = (last_day - first_day) // DAY
+
+    def at(fraction: float) -> str:
+        return day(first_day + int(span * fraction) * DAY)
+
+    scenarios = [
+        ("cold, first half", at(0), at(0.5)),
+        ("warm, same range", at(0), at(0.5)),
+        ("warm, inner part", at(0.1), at(0.2)),
+        ("extended to 3/4", at(0), at(0.75)),
+        ("overlapping the stored range", at(0.7), at(0.95)),
+        ("to the last day, unsettled tail", at(0.8), day(last_day + DAY)),
+        ("to the last day again", at(0.8), day(last_day + DAY)),
+    ]
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        fetcher = RecordedFetcher(fixture, latency)
+        store = CandleStore(root_dir)
+        loader = StoredCandleLoader(fetcher, "fixture", store)
+
+        print(f"{'load':35s} {'ms':>9s} {'fetches':>8s} {'candles':>8s}")
+        for name, start, end in scenarios:
+            elapsed, fetches, n_candles = timed_load(loader, fetcher, fixture, interval, start, end)
+            print(f"{name:35s} {elapsed * 1000:9.2f} {fetches:8d} {n_candles:8d}")
+
+        # the same range from 8 threads at once: one fetch, the rest wait for it
+        loader_cold = StoredCandleLoader(RecordedFetcher(fixture, latency), "fixture-concurrent", store)
+        with ThreadPoolExecutor(8) as pool:
+            started = time.perf_counter()
+            list(pool.map(lambda _: timed_load(loader_cold, loader_cold.loader, fixture, interval, *scenarios[0][1:]),
+                          range(8)))
+        print(f"{'8 concurrent cold loads':35s} {(time.perf_counter() - started) * 1000:9.2f} "
+              f"{len(loader_cold.loader.calls):8d}")
+
+        # a new process sees the same store
+        restarted = StoredCandleLoader(RecordedFetcher(fixture, latency), "fixture", CandleStore(root_dir))
+        elapsed, fetches, n_candles = timed_load(restarted, restarted.loader, fixture, interval, *scenarios[3][1:])
+        print(f"{'after restart':35s} {elapsed * 1000:9.2f} {fetches:8d} {n_candles:8d}")
+
+        print("\ncoverage:", [(day(s), day(e)) for s, e in store.get_coverage("fixture", "EURUSD=X", interval)])
+        print("stats:", store.get_stats())
+
+
+def record(provider: str, symbol: str, interval: str, start: str, end: str, out_path: str):
+    loader = BinanceLoader() if provider == "binance" else YahooFinanceLoader()
+    candles = loader.fetch_candles(symbol, interval, date_ts(start), date_ts(end))
+    np.savez(out_path, interval=interval, **{name: getattr(candles, name) for name in COLUMNS})
+    print(f"Recorded {len(candles):,d} {symbol} {interval} candles to {out_path}")
+
+
+def load_fixture(path: str):
+    with np.load(path) as stored:
+        return CandleSeries(*(stored[name] for name in COLUMNS)), str(stored["interval"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "record":
+        if len(sys.argv) != 8:
+            sys.exit("usage: python -m test.benchmark_candle_store record <yahoo|binance> <symbol> <interval> "
+                     "<start> <end> <fixture.npz>")
+        record(*sys.argv[2:8])
+    else:
+        fixture, interval = load_fixture(sys.argv[1]) if len(sys.argv) > 1 and os.path.exists(sys.argv[1]) \
+            else (synthetic_fixture(), "60m")
+        run(fixture, interval, float(sys.argv[2]) if len(sys.argv) > 2 else 0.5)
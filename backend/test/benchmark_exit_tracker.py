@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# Replays seeded synthetic backtests through the executor as it was before ExitTracker, which rescanned every bar
+# since entry on each new bar, and through BacktestExecutor.simulate_trades. The executed trades and metrics must
+# be identical. Some bars are widened until they reach both SL and TP, so same-bar ties are decided by the open,
+# signals are dense enough for reversal exits, and every series ends with an open position.
+# Run from backend/:  python -m test.benchmark_exit_tracker [size] [seeds]
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+import numpy as np
+
+from business.utils.backtest.backtest_executor import BacktestExecutor
+from business.utils.backtest.sl_calculator import StopLossContext
+from business.utils.candle_series import CandleSeries
+from test.benchmark_indicators import synthetic_candles
+
+RISK_REWARD_RATIOS = (1.0, 2.0, 3.0)
+
+
+def spiked_candles(size: int, seed: int) -> CandleSeries:
+    candles = synthetic_candles(size, seed)
+    rng = np.random.default_rng(seed + 1000)
+    spike = np.where(rng.random(size) < 0.03, rng.uniform(5, 40, size), 0) * 0.0004
+    return CandleSeries(candles.time, candles.open, candles.high + spike, candles.low - spike, candles.close)
+
+
+def synthetic_signals(candles: CandleSeries, seed: int) -> List[Dict]:
+    # a signal every ~40 bars, some bars get two, the last bar always gets one
+    rng = np.random.default_rng(seed + 2000)
+    bars = np.sort(np.append(rng.choice(len(candles), len(candles) // 40), len(candles) - 1))
+    return [{"trade_id": n + 1, "action": "BUY" if rng.random() < 0.5 else "SELL",
+             "timestamp": int(candles.time[i]), "price": float(candles.close[i]), "profit": 0}
+            for n, i in enumerate(bars.tolist())]
+
+
+class RescanExecutor(BacktestExecutor):
+    # simulate_trades and _check_exit_conditions as they were before ExitTracker, apart from the entries
+    # taking their SL from the shared StopLossContext. exit_kinds counts how the trades were closed.
+    def simulate_trades(self, signals: List[Dict], candles: List[Dict], timeframe: str, symbol: str) -> Dict:
+        executed_trades = []
+        self.timeframe = timeframe
+        self.sl_context = StopLossContext(candles, symbol)
+        self.exit_kinds = Counter()
+        times = [candle["time"] for candle in candles]
+
+        position = None
+        entry_price, entry_index = None, None
+        sl_price, tp_price = None, None
+
+        signal_pointer = 0
+        current_signal = signals[signal_pointer] if signals else None
+
+        for i in range(len(candles)):
+            candle_time = candles[i]["time"]
+
+            if position is not None:
+                hit_tp, hit_sl = self._check_exit_conditions(candles, entry_index, i, sl_price, tp_price, position)
+                if hit_tp or hit_sl:
+                    self.exit_kinds[self._hit_kind(candles[i], sl_price, tp_price, position, hit_tp)] += 1
+                    exit_price = candles[i]["close"]
+                    exit_action = "SELL" if position == "BUY" else "BUY"
+                    profit = self._calculate_profit(exit_price, entry_price, sl_price, tp_price, hit_tp, hit_sl, position)
+
+                    executed_trades.append(
+                        self._record_trade(
+                            times, entry_index, i,
+                            entry_action=position,
+                            exit_action=exit_action,
+                            entry_price=entry_price,
+                            exit_price=exit_price,
+                            sl_price=sl_price,
+                            tp_price=tp_price,
+                            profit=profit,
+                        )
+                    )
+
+                    self._update_metrics(profit)
+                    position = entry_price = entry_index = sl_price = tp_price = None
+
+            if current_signal and candle_time >= current_signal["timestamp"]:
+                action = current_signal["action"]
+                price = current_signal["price"]
+
+                if position is None:
+                    position, entry_price, entry_index, sl_price, tp_price = self._enter_position(action, price, i)
+
+                elif position != action:
+                    self.exit_kinds["reversal"] += 1
+                    exit_price = price
+                    hit_tp, hit_sl = self._check_exit_conditions(candles, entry_index, i, sl_price, tp_price, position)
+                    profit = self._calculate_profit(exit_price, entry_price, sl_price, tp_price, hit_tp, hit_sl, position)
+                    exit_action = "SELL" if position == "BUY" else "BUY"
+
+                    executed_trades.append(
+                        self._record_trade(
+                            times, entry_index, i,
+                            entry_action=position,
+                            exit_action=exit_action,
+                            entry_price=entry_price,
+                            exit_price=exit_price,
+                            sl_price=sl_price,
+                            tp_price=tp_price,
+                            profit=profit,
+                        )
+                    )
+
+                    self._update_metrics(profit)
+
+                    position, entry_price, entry_index, sl_price, tp_price = self._enter_position(action, price, i)
+
+                signal_pointer += 1
+                current_signal = signals[signal_pointer] if signal_pointer < len(signals) else None
+
+        if position is not None:
+            self.exit_kinds["end of data"] += 1
+            exit_index = len(candles) - 1
+            exit_price = candles[exit_index]["close"]
+            hit_tp, hit_sl = self._check_exit_conditions(candles, entry_index, exit_index, sl_price, tp_price, position)
+            profit = self._calculate_profit(exit_price, entry_price, sl_price, tp_price, hit_tp, hit_sl, position)
+            exit_action = "SELL" if position == "BUY" else "BUY"
+
+            executed_trades.append(
+                self._record_trade(
+                    times, entry_index, exit_index,
+                    entry_action=position,
+                    exit_action=exit_action,
+                    entry_price=entry_price,
+                    exit_price=exit_price,
+                    sl_price=sl_price,
+                    tp_price=tp_price,
+                    profit=profit,
+                )
+            )
+            self._update_metrics(profit)
+
+        metrics = self._calculate_final_metrics()
+
+        return {
+            "metrics": metrics,
+            "executed_trades": executed_trades,
+        }
+
+    def _check_exit_conditions(
+            self, candles: List[Dict], entry_index: int, current_index: int,
+            sl_price: float, tp_price: float, position: str
+    ):
+        hit_tp, hit_sl = False, False
+
+        for j in range(entry_index + 1, current_index + 1):
+            o = candles[j]["open"]
+            h = candles[j]["high"]
+            l = candles[j]["low"]
+            c = candles[j]["close"]
+
+            if position == "BUY":
+                if l <= sl_price and h >= tp_price:
+                    if abs(o - sl_price) < abs(o - tp_price):
+                        return False, True  # SL first
+                    else:
+                        return True, False  # TP first
+                elif l <= sl_price:
+                    return False, True
+                elif h >= tp_price:
+                    return True, False
+
+            else:  # SELL
+                if h >= sl_price and l <= tp_price:
+                    if abs(o - sl_price) < abs(o - tp_price):
+                        return False, True  # SL first
+                    else:
+                        return True, False  # TP first
+                elif h >= sl_price:
+                    return False, True
+                elif l <= tp_price:
+                    return True, False
+        return hit_tp, hit_sl
+
+    @staticmethod
+    def _hit_kind(candle: Dict, sl_price: float, tp_price: float, position: str, hit_tp: bool) -> str:
+        if position == "BUY":
+            tie = candle["low"] <= sl_price and candle["high"] >= tp_price
+        else:
+            tie = candle["high"] >= sl_price and candle["low"] <= tp_price
+        return ("SL/TP tie, " if tie else "") + ("TP" if hit_tp else "SL")
+
+
+def first_difference(old: List[Dict], new: List[Dict]) -> str:
+    for n, (old_trade, new_trade) in enumerate(zip(old, new)):
+        if old_trade != new_trade:
+            return f"trade {n}:\n  rescan  {old_trade}\n  tracker {new_trade}"
+    return f"{len(old)} trades from the rescan, {len(new)} from the tracker"
+
+
+def main(size: int, seeds: int):
+    kinds = Counter()
+    print(f"{'seed':>4s} {'rr':>4s} {'trades':>7s} {'rescan s':>9s} {'tracker s':>10s}")
+    for seed in range(seeds):
+        candles = spiked_candles(size, seed)
+        candle_dicts = candles.to_dicts()
+        signals = synthetic_signals(candles, seed)
+
+        for rr in RISK_REWARD_RATIOS:
+            rescan = RescanExecutor(10_000.0, 1.0, rr)
+            started = time.perf_counter()
+            expected = rescan.simulate_trades(signals, candle_dicts, "1m", "EURUSD")
+            rescan_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            result = BacktestExecutor(10_000.0, 1.0, rr).simulate_trades(signals, candles, "1m", "EURUSD")
+            tracker_s = time.perf_counter() - started
+
+            print(f"{seed:4d} {rr:4.1f} {len(result['executed_trades']):7d} {rescan_s:9.2f} {tracker_s:10.2f}")
+            if result["executed_trades"] != expected["executed_trades"]:
+                raise AssertionError(f"seed {seed}, rr {rr}: " +
+                                     first_difference(expected["executed_trades"], result["executed_trades"]))
+            if result["metrics"] != expected["metrics"]:
+                raise AssertionError(f"seed {seed}, rr {rr}: the metrics differ")
+            kinds.update(rescan.exit_kinds)
+
+    print("\nexits:", dict(sorted(kinds.items())))
+    for kind in ("SL/TP tie, SL", "SL/TP tie, TP", "reversal", "end of data"):
+        if not kinds[kind]:
+            raise AssertionError(f"no '{kind}' exit was exercised")
+    print("identical")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000, int(sys.argv[2]) if len(sys.argv) > 2 else 3)
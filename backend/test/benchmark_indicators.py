@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# Runs the per-bar loops of the indicator strategies as they were before the indicator module against the
+# vectorized strategies, times both and compares the full (time, action) signal lists. Bollinger, RSI,
+# MA envelope and EMA must match the old loops signal for signal. SMA and MACD crossovers no longer fire
+# where the two lines are mathematically equal: the old loops are also run on the prices as exact integers
+# (scaled so every average is exact), which decides each tie exactly, and the strategies must match that run.
+# Run from backend/:  python -m test.benchmark_indicators [sizes...]
+import math
+import sys
+import time
+from typing import Dict, List
+import numpy as np
+
+from business.utils.candle_series import CandleSeries
+from business.utils.strategies.sma_crossover_strategy import SMACrossoverStrategy
+from business.utils.strategies.ema_crossover_strategy import EMACrossoverStrategy
+from business.utils.strategies.bollinger_bands_strategy import BollingerBandsStrategy
+from business.utils.strategies.rsi_strategy_strategy import RSIStrategy
+from business.utils.strategies.ma_envelope_strategy import MovingAverageEnvelopeStrategy
+from business.utils.strategies.macd_crossover_strategy import MACDCrossoverStrategy
+
+PRICE_DECIMALS = 5
+
+
+def synthetic_candles(size: int, seed: int = 7) -> CandleSeries:
+    rng = np.random.default_rng(seed)
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0004, size)), PRICE_DECIMALS)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0002, size))
+    return CandleSeries(
+        time=1_600_000_000 + 60 * np.arange(size),
+        open=open_,
+        high=np.maximum(open_, close) + wick,
+        low=np.minimum(open_, close) - wick,
+        close=close,
+    )
+
+
+# generate_trades of the strategies before the indicator module, from the closes and times lists on.
+# Two changes are marked: SMA crossover skipped i == long_period, and MACD raised TypeError on the first signal.
+def loop_sma_crossover(closes: List, times: List[int], parameters: Dict) -> List[Dict]:
+    short_period = parameters.get("short_period", 5)
+    long_period = parameters.get("long_period", 20)
+    trades = []
+    position = None
+
+    for i in range(len(closes)):
+        if i <= long_period:  # was i < long_period: the previous long SMA of i == long_period summed an empty slice
+            continue
+        short_sma = sum(closes[i - short_period:i]) / short_period
+        long_sma = sum(closes[i - long_period:i]) / long_period
+
+        prev_short_sma = sum(closes[i - short_period - 1:i - 1]) / short_period
+        prev_long_sma = sum(closes[i - long_period - 1:i - 1]) / long_period
+
+        if prev_short_sma < prev_long_sma and short_sma > long_sma:
+            if position != "long":
+                trades.append({"action": "BUY", "timestamp": times[i]})
+                position = "long"
+        elif prev_short_sma > prev_long_sma and short_sma < long_sma:
+            if position != "short":
+                trades.append({"action": "SELL", "timestamp": times[i]})
+                position = "short"
+    return trades
+
+
+def loop_ema_crossover(closes: List, times: List[int], parameters: Dict) -> List[Dict]:
+    short_period = parameters.get("short_period", 5)
+    long_period = parameters.get("long_period", 20)
+    trades = []
+    position = None
+
+    def calculate_ema(period: int) -> List[float]:
+        ema = [None] * len(closes)
+        multiplier = 2 / (period + 1)
+
+        for i in range(period - 1, len(closes)):
+            if i == period - 1:
+                sma = sum(closes[:period]) / period
+                ema[i] = sma
+            else:
+                if ema[i - 1] is not None:
+                    ema[i] = (closes[i] - ema[i - 1]) * multiplier + ema[i - 1]
+        return ema
+
+    short_ema = calculate_ema(short_period)
+    long_ema = calculate_ema(long_period)
+
+    for i in range(1, len(closes)):
+        if (
+            short_ema[i - 1] is None or long_ema[i - 1] is None or
+            short_ema[i] is None or long_ema[i] is None
+        ):
+            continue
+
+        if short_ema[i - 1] < long_ema[i - 1] and short_ema[i] > long_ema[i]:
+            if position != "long":
+                trades.append({"action": "BUY", "timestamp": times[i]})
+                position = "long"
+        elif short_ema[i - 1] > long_ema[i - 1] and short_ema[i] < long_ema[i]:
+            if position != "short":
+                trades.append({"action": "SELL", "timestamp": times[i]})
+                position = "short"
+    return trades
+
+
+def loop_bollinger(closes: List, times: List[int], parameters: Dict) -> List[Dict]:
+    period = parameters.get("period", 20)
+    deviation = parameters.get("deviation", 2)
+    trades = []
+
+    for i in range(period, len(closes)):
+        sma = sum(closes[i - period:i]) / period
+        std_dev = (sum([(x - sma) ** 2 for x in closes[i - period:i]]) / period) ** 0.5
+
+        upper_band = sma + deviation * std_dev
+        lower_band = sma - deviation * std_dev
+        price = closes[i]
+
+        if price < lower_band:
+            trades.append({"action": "BUY", "timestamp": times[i]})
+        elif price > upper_band:
+            trades.append({"action": "SELL", "timestamp": times[i]})
+    return trades
+
+
+def loop_rsi(closes: List, times: List[int], parameters: Dict) -> List[Dict]:
+    period = parameters.get("period", 14)
+    overbought = parameters.get("overbought", 70)
+    oversold = parameters.get("oversold", 30)
+    trades = []
+    gains = []
+    losses = []
+
+    for i in range(1, len(closes)):
+        delta = closes[i] - closes[i - 1]
+        gains.append(max(delta, 0))
+        losses.append(abs(min(delta, 0)))
+
+        if i < period:
+            continue
+
+        avg_gain = sum(gains[i - period:i]) / period
+        avg_loss = sum(losses[i - period:i]) / period
+        if avg_loss == 0:
+            rsi = 100
+        else:
+            rs = avg_gain / avg_loss
+            rsi = 100 - (100 / (1 + rs))
+
+        if rsi > overbought:
+            trades.append({"action": "SELL", "timestamp": times[i]})
+        elif rsi < oversold:
+            trades.append({"action": "BUY", "timestamp": times[i]})
+    return trades
+
+
+def loop_ma_envelope(closes: List, times: List[int], parameters: Dict) -> List[Dict]:
+    period = parameters.get("period", 20)
+    percent = parameters.get("percent", 0.02)
+    trades = []
+
+    for i in range(period, len(closes)):
+        sma = sum(closes[i - period:i]) / period
+        upper = sma * (1 + percent)
+        lower = sma * (1 - percent)
+        price = closes[i]
+
+        if price > upper:
+            trades.append({"action": "SELL", "timestamp": times[i]})
+        elif price < lower:
+            trades.append({"action": "BUY", "timestamp": times[i]})
+    return trades
+
+
+def loop_macd_crossover(closes: List, times: List[int], parameters: Dict) -> List[Dict]:
+    fast_period = parameters.get("fast_period", 12)
+    slow_period = parameters.get("slow_period", 26)
+    signal_period = parameters.get("signal_period", 9)
+    macd = []
+    signal = []
+    trades = []
+    position = None
+
+    for i in range(len(closes)):
+        if i < slow_period:
+            macd.append(None)
+            signal.append(None)
+            continue
+
+        fast_ema = sum(closes[i - fast_period:i]) / fast_period
+        slow_ema = sum(closes[i - slow_period:i]) / slow_period
+        macd_val = fast_ema - slow_ema
+        macd.append(macd_val)
+
+        if i >= slow_period + signal_period:
+            signal_val = sum(macd[i - signal_period + 1:i + 1]) / signal_period
+            signal.append(signal_val)
+
+            if signal[i - 1] is None:  # added: comparing with the missing first signal raised TypeError
+                continue
+            if macd[i - 1] < signal[i - 1] and macd[i] > signal[i]:
+                if position != "long":
+                    trades.append({"action": "BUY", "timestamp": times[i]})
+                    position = "long"
+            elif macd[i - 1] > signal[i - 1] and macd[i] < signal[i]:
+                if position != "short":
+                    trades.append({"action": "SELL", "timestamp": times[i]})
+                    position = "short"
+        else:
+            signal.append(None)
+    return trades
+
+
+# (name, old loop, strategy, parameters, periods whose averages are compared; None when no ties are decided)
+CASES = [
+    ("SMA crossover", loop_sma_crossover, SMACrossoverStrategy, {}, (5, 20)),
+    ("EMA crossover", loop_ema_crossover, EMACrossoverStrategy, {}, None),
+    ("Bollinger bands", loop_bollinger, BollingerBandsStrategy, {}, None),
+    ("RSI", loop_rsi, RSIStrategy, {}, None),
+    ("MA envelope", loop_ma_envelope, MovingAverageEnvelopeStrategy, {"percent": 0.0005}, None),
+    ("MACD crossover", loop_macd_crossover, MACDCrossoverStrategy, {}, (12, 26, 9)),
+]
+
+
+def exact_closes(closes: List[float], periods) -> List[int]:
+    # prices as integers in multiples of every period, so each average and MACD line is an exact integer
+    # and the loops compare the mathematical values
+    multiple = math.lcm(*periods)
+    return [round(close * 10 ** PRICE_DECIMALS) * multiple for close in closes]
+
+
+def signal_list(trades: List[Dict]) -> List:
+    return [(trade["timestamp"], trade["action"]) for trade in trades]
+
+
+def first_difference(expected: List, actual: List) -> str:
+    for n, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return f"signal {n}: expected {a}, got {b}"
+    return f"{len(expected)} signals expected, got {len(actual)}"
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    for size in sizes:
+        candles = synthetic_candles(size)
+        closes, times = candles.close.tolist(), candles.time.tolist()
+        print(f"\n{size:,} bars")
+        print(f"{'strategy':18s} {'loop (s)':>10s} {'vector (s)':>11s} {'speedup':>9s} {'signals':>8s} "
+              f"{'ties':>5s}")
+        for name, loop_fn, strategy_cls, params, periods in CASES:
+            loop_trades, loop_time = timed(loop_fn, closes, times, params)
+            signals, vector_time = timed(strategy_cls().generate_trades, candles, params)
+            loop_signals, signals = signal_list(loop_trades), signal_list(signals)
+
+            expected, ties = loop_signals, 0
+            if periods:
+                # the float loop fires on rounding noise where the exact loop sees a tie
+                expected = signal_list(loop_fn(exact_closes(closes, periods), times, params))
+                ties = len(set(loop_signals) ^ set(expected))
+            print(f"{name:18s} {loop_time:10.3f} {vector_time:11.4f} {loop_time / vector_time:8.0f}x "
+                  f"{len(signals):8d} {ties:5d}")
+
+            if signals != expected:
+                raise AssertionError(f"{name}, {size:,} bars: {first_difference(expected, signals)}")
+            if name == "SMA crossover" and not ties:
+                raise AssertionError(f"{name}, {size:,} bars: no tie was exercised")
+    print("\nall signals match")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# Times the Monte Carlo simulation for a given number of paths x trades. The target is well under a second
+# for 10,000 x 5,000, on one core both methods take ~0.5-0.65 s.
+# Run from backend/:  python -m test.benchmark_monte_carlo [n_paths] [n_trades]
+import sys
+import time
+import numpy as np
+
+from business.utils.backtest.monte_carlo import simulate, SIMULATION_METHODS
+
+
+def synthetic_profits(n_trades: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    wins = rng.random(n_trades) < 0.4
+    return np.round(np.where(wins, 200.0, -100.0) * rng.uniform(0.5, 1.0, n_trades), 2)
+
+
+def main(n_paths: int, n_trades: int):
+    profits = synthetic_profits(n_trades)
+    print(f"{n_paths:,} paths x {n_trades:,} trades")
+    print(f"{'method':10s} {'compounding':>12s} {'seconds':>9s}")
+    for method in SIMULATION_METHODS:
+        for compounding in (True, False):
+            start = time.perf_counter()
+            simulate(profits, 10_000.0, n_paths, method, compounding, seed=1)
+            print(f"{method:10s} {str(compounding):>12s} {time.perf_counter() - start:9.3f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 10_000, args[1] if len(args) > 1 else 5_000)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Times the statistics metrics on synthetic trades: the per-trade Python pass over TradeBTOs
+# against the columnar NumPy kernel, and checks both give the same metrics.
+# Run from backend/:  python -m test.benchmark_statistics [n_trades ...]
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+
+from business.bao.services.statistic_bao_service import StatisticBAOService, DURATION_BUCKETS
+from business.bto.trade_bto import TradeBTO
+from business.utils.trade_metrics import trade_arrays, calculate_trade_metrics
+from persistence.entities.utils_entity import TradeType
+
+MARKETS = ["EURUSD", "GBPUSD", "XAUUSD", "US30", "BTCUSD"]
+EPOCH = datetime(1970, 1, 1)
+
+
+def synthetic_columns(n_trades: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    open_epoch = 1_704_067_200 + np.sort(rng.integers(0, 365 * 86400, n_trades))
+    close_epoch = open_epoch + rng.integers(60, 3 * 86400, n_trades)
+    open_price = np.round(rng.uniform(1, 2000, n_trades), 5)
+    direction = np.where(rng.random(n_trades) < 0.5, 1, -1)
+
+    return {
+        "profit": np.round(rng.normal(5, 100, n_trades), 2).tolist(),
+        "type": [TradeType.BUY.name if d > 0 else TradeType.SELL.name for d in direction],
+        "market": [MARKETS[i] for i in rng.integers(0, len(MARKETS), n_trades)],
+        "open_epoch": open_epoch.astype(float).tolist(),
+        "close_epoch": close_epoch.astype(float).tolist(),
+        "open_price": open_price.tolist(),
+        "sl_price": np.round(open_price - direction * rng.uniform(0.001, 5, n_trades), 5).tolist(),
+        "tp_price": np.round(open_price + direction * rng.uniform(0.001, 10, n_trades), 5).tolist(),
+    }
+
+
+def to_trade_btos(columns: dict) -> list:
+    trades = []
+    for i in range(len(columns["profit"])):
+        opened = EPOCH + timedelta(seconds=columns["open_epoch"][i])
+        closed = EPOCH + timedelta(seconds=columns["close_epoch"][i])
+        trades.append(TradeBTO(
+            id=i + 1, user_id=1, market=columns["market"][i], volume=1, type=TradeType[columns["type"][i]],
+            open_date=opened.date(), open_time=opened.time(), close_date=closed.date(), close_time=closed.time(),
+            open_price=columns["open_price"][i], sl_price=columns["sl_price"][i], tp_price=columns["tp_price"][i],
+            profit=columns["profit"][i]
+        ))
+    return trades
+
+
+def main(sizes):
+    service = StatisticBAOService(None, None)
+    print(f"{'trades':>10s} {'python s':>9s} {'numpy s':>9s} {'speedup':>8s}  same")
+    for n_trades in sizes:
+        columns = synthetic_columns(n_trades)
+        trades = to_trade_btos(columns)
+
+        start = time.perf_counter()
+        expected = service._calculate_metrics(trades, "benchmark", {})["metrics"]
+        python_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        metrics = calculate_trade_metrics(trade_arrays(columns), DURATION_BUCKETS)
+        numpy_seconds = time.perf_counter() - start
+
+        print(f"{n_trades:10,d} {python_seconds:9.3f} {numpy_seconds:9.3f} {python_seconds / numpy_seconds:7.1f}x  "
+              f"{metrics == expected}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
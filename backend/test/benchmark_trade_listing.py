@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Times the two read paths of the trade list endpoints on an in-memory SQLite trades table:
+# ORM entities mapped entity -> DTO -> BTO -> response dict and encoded by FastAPI, against the lean
+# column projection mapped row -> response dict. Checks both give the same response bytes.
+# Run from backend/:  python -m test.benchmark_trade_listing [n_trades ...]
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import init_db  # registers the entities
+from business.bal.trade_bal import TradeBAL
+from business.bao.services.trade_bao_service import TradeBAOService
+from persistence.dal.trade_dal import TradeDAL
+from persistence.entities.trade_entity import TradeEntity
+from persistence.entities.utils_entity import TradeType, SourceType, SessionType
+from presentation.pao.services.trade_pao_service import TradePAOService
+
+MARKETS = ["EURUSD", "GBPUSD", "XAUUSD", "US30", "BTCUSD"]
+
+
+def synthetic_rows(n_trades: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(n_trades):
+        opened = start + timedelta(minutes=int(rng.integers(0, 365 * 24 * 60)))
+        closed = opened + timedelta(minutes=int(rng.integers(1, 3 * 24 * 60)))
+        open_price = round(float(rng.uniform(1, 2000)), 5)
+        rows.append({
+            "user_id": 1, "market": MARKETS[i % len(MARKETS)], "volume": round(float(rng.uniform(0.01, 5)), 2),
+            "type": TradeType.BUY if i % 2 else TradeType.SELL,
+            "open_date": opened.date(), "open_time": opened.time(), "close_date": closed.date(),
+            "close_time": closed.time(), "session": SessionType.LONDON,
+            "open_price": open_price, "close_price": round(open_price * 1.001, 5),
+            "sl_price": round(open_price * 0.99, 5), "tp_price": round(open_price * 1.02, 5),
+            "swap": 0.0, "commission": -3.5, "profit": round(float(rng.normal(5, 100)), 2), "pips": 12.5,
+            "link_photo": None, "source_type": SourceType.USER, "backtest_id": None,
+        })
+    return rows
+
+
+def main(sizes):
+    print(f"{'trades':>10s} {'orm s':>8s} {'lean s':>8s} {'orm us/row':>11s} {'lean us/row':>12s} {'speedup':>8s}  same")
+    for n_trades in sizes:
+        engine = create_engine("sqlite://")
+        TradeEntity.__table__.create(engine)
+        db = sessionmaker(bind=engine)()
+        db.bulk_insert_mappings(TradeEntity, synthetic_rows(n_trades))
+        db.commit()
+
+        pao = TradePAOService(TradeBAL(TradeBAOService(TradeDAL(db))))
+
+        start = time.perf_counter()
+        body = JSONResponse(jsonable_encoder(pao.get_trades_by_field(1, SourceType.USER, {}))).body
+        orm_seconds = time.perf_counter() - start
+        db.expunge_all()
+
+        start = time.perf_counter()
+        lean_body = JSONResponse(pao.get_trade_list(1, SourceType.USER, {})).body
+        lean_seconds = time.perf_counter() - start
+
+        print(f"{n_trades:10,d} {orm_seconds:8.3f} {lean_seconds:8.3f} {orm_seconds / n_trades * 1e6:11.1f} "
+              f"{lean_seconds / n_trades * 1e6:12.1f} {orm_seconds / lean_seconds:7.1f}x  {body == lean_body}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# Load test for the per-request DB sessions: sends the same read request from a growing number of client
+# threads against a running server and prints throughput, latency and the connection pool counters.
+# With one shared session throughput stays flat as threads are added, with pooled sessions it scales.
+# Start the server first (python main.py), then from backend/:
+#   python -m test.load_test_db_pool [base_url] [requests_per_level] [path]
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+THREAD_LEVELS = (1, 2, 4, 8, 16, 32)
+
+
+def timed_get(session: requests.Session, url: str) -> float:
+    start = time.perf_counter()
+    response = session.get(url, timeout=30)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def run_level(url: str, threads: int, n_requests: int):
+    # one HTTP session per client thread, so the client side never serializes
+    sessions = [requests.Session() for _ in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda i: timed_get(sessions[i % threads], url), range(n_requests)))
+        elapsed = time.perf_counter() - start
+
+    for session in sessions:
+        session.close()
+    return n_requests / elapsed, np.percentile(latencies, [50, 95]) * 1000
+
+
+def main(base_url: str, n_requests: int, path: str):
+    url = base_url.rstrip("/") + path
+    stats_url = base_url.rstrip("/") + "/api/trademind/health/db-pool"
+
+    timed_get(requests.Session(), url)
+    print(f"GET {url}, {n_requests} requests per level")
+    print(f"{'threads':>7s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'speedup':>8s}")
+
+    baseline = None
+    for threads in THREAD_LEVELS:
+        throughput, (p50, p95) = run_level(url, threads, n_requests)
+        baseline = baseline or throughput
+        print(f"{threads:7d} {throughput:9.1f} {p50:8.1f} {p95:8.1f} {throughput / baseline:7.2f}x")
+
+    print("pool:", requests.get(stats_url, timeout=30).json())
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        args[0] if args else "http://127.0.0.1:8000",
+        int(args[1]) if len(args) > 1 else 500,
+        args[2] if len(args) > 2 else "/api/trademind/strategies/public"
+    )
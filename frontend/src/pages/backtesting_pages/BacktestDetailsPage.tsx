@@ -32,14 +32,30 @@ interface BacktestDetails {
     nr_trades: number;
     profit_factor: number | null;
     expectancy: number;
-    balance_curve?: { trade: number; balance: number }[];
+    balance_curve?: BalancePoint[];
 }
 
+interface BalancePoint {
+    trade: number;
+    balance: number;
+}
+
+interface BalanceCurveResponse {
+    backtest_id: number;
+    resolution: string;
+    nr_points: number;
+    balance_curve: BalancePoint[];
+}
+
+// the backtest itself carries a 200 points preview of the curve, the chart loads the 1000 points level
+const BALANCE_CURVE_RESOLUTION = "1000";
+
 const BacktestDetailsPage: React.FC = () => {
     const user = useAuth();
     const { backtestId } = useParams<{ backtestId: string }>();
     const [backtest, setBacktest] = useState<BacktestDetails | null>(null);
     const [trades, setTrades] = useState<Trade[]>([]);
+    const [balanceCurve, setBalanceCurve] = useState<BalancePoint[] | null>(null);
     const [loading, setLoading] = useState(true);
     const [result, setResult] = useState<any>(null);
 
@@ -48,13 +64,20 @@ const BacktestDetailsPage: React.FC = () => {
         const fetchBacktestData = async () => {
             if (!user?.id) return;
             try {
-                const [backtestRes, tradesRes] = await Promise.all([
+                const [backtestRes, tradesRes, curveRes] = await Promise.all([
                     api.get(`/api/trademind/backtests/${backtestId}`),
                     api.get(`/api/trademind/trades/backtest/${backtestId}`),
+                    api.get<BalanceCurveResponse>(`/api/trademind/backtests/${backtestId}/balance-curve`, {
+                        params: { resolution: BALANCE_CURVE_RESOLUTION },
+                    }).catch((err) => {
+                        console.error("Failed to fetch balance curve, showing the preview", err);
+                        return null;
+                    }),
                 ]);
 
                 setBacktest(backtestRes.data);
                 setTrades(tradesRes.data);
+                setBalanceCurve(curveRes?.data?.balance_curve ?? null);
 
 
                 const payload = {
@@ -126,7 +149,7 @@ const BacktestDetailsPage: React.FC = () => {
                         />
                     </div>
 
-                        <BalanceCurveChart data={backtest?.balance_curve || []} />
+                        <BalanceCurveChart data={balanceCurve ?? backtest.balance_curve ?? []} />
                     </StatBoxWrapper>
 
                     <StatBoxWrapper title="Trades">
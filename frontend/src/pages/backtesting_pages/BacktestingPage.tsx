@@ -87,6 +87,7 @@ const BacktestingPage: React.FC = () => {
     const [candles, setCandles] = useState<Candle[]>([]);
     const [trades, setTrades] = useState<PageExecutedTrade[]>([]);
     const [metrics, setMetrics] = useState<any>(null);
+    const [previewToken, setPreviewToken] = useState<string | null>(null);
     const [availableStrategies, setAvailableStrategies] = useState<{ id: number; name: string }[]>([]);
     const [strategyType, setStrategyType] = useState<"public" | "personal">("public");
     const [userStrategies, setUserStrategies] = useState<{ id: number; name: string }[]>([]);
@@ -146,6 +147,7 @@ const BacktestingPage: React.FC = () => {
             const res = await api.post("/api/trademind/backtests/preview", payload);
             setTrades(res.data.executed_trades);
             setMetrics(res.data.metrics);
+            setPreviewToken(res.data.preview_token);
             console.log(res.data);
         } catch (err) {
             console.error("Error running backtest:", err);
@@ -161,6 +163,7 @@ const BacktestingPage: React.FC = () => {
     const fetchChartData = () => {
         setTrades([]);
         setMetrics(null);
+        setPreviewToken(null);
         setCandles([]);
 
         setChartError(null);
@@ -228,24 +231,22 @@ const BacktestingPage: React.FC = () => {
             setSaveMessage("User not authenticated.");
             return;
         }
+        if (!previewToken) {
+            setSaveStatus("error");
+            setSaveMessage("Run the backtest before saving it.");
+            return;
+        }
 
         try {
+            // the server keeps the previewed result, only its token is sent back
             const payload = {
                 user_id: user.id,
-                strategy_id: parseInt(strategy_id),
-                symbol,
-                time_frame: timeframe,
-                start_date: startDate,
-                end_date: endDate,
-                initial_balance,
-                risk_per_trade,
-                risk_reward_ratio: riskReward,
-                metrics,
-                executed_trades: trades
+                preview_token: previewToken
             };
 
             const res = await api.post("/api/trademind/backtests/save", payload);
             console.log("Saved backtest:", res.data);
+            setPreviewToken(null);
             setSaveStatus("success");
             setSaveMessage("Backtest saved successfully!");
         } catch (err) {